@@ -0,0 +1,424 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from circuit_breaker import CircuitBreaker
+from credentials import CredentialManager
+from dead_tokens import DeadTokenRegistry, skipped_result
+from fcm_errors import AUTH, CIRCUIT_OPEN, SendResult, classify_exception, classify_response
+from fcm_service import FCM_API_URL, FCM_SEND_URL, build_condition_message, build_topic_message, notification_fields
+from message_template import MessageTemplate, dumps
+from metrics import HTTP_SECONDS, INFLIGHT, SENDS_TOTAL, TOKEN_SECONDS
+from rate_limiter import RateLimiter
+from retry import RetryPolicy
+from validation import ValidationError, invalid_result, is_valid_token, validate_fields, validate_message
+
+
+class AsyncFCMService:
+    """asyncio 기반 FCM HTTP v1 푸시 알림 서비스
+
+    소수의 HTTP/2 연결 위에 수천 개의 요청을 멀티플렉싱하여 전송합니다.
+    동시 전송 수는 세마포어로 제한하며, 액세스 토큰 캐시는 FCMService와 공유할 수 있습니다.
+    응답 분류, 재시도, 속도 제한, 사용 불가 토큰 기록, 회로 차단, 지표는 FCMService와 같은 방식으로 적용되고
+    같은 RateLimiter/DeadTokenRegistry/CircuitBreaker를 넘기면 동기 전송과 한도와 상태를 공유합니다.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        service_account_key_path: str,
+        credentials: Optional[CredentialManager] = None,
+        max_concurrency: int = 1000,
+        max_connections: int = 4,
+        http2: bool = True,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+        api_url: str = FCM_API_URL,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        dead_tokens: Optional[DeadTokenRegistry] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        비동기 FCM 서비스 초기화
+
+        Args:
+            project_id: Firebase 프로젝트 ID
+            service_account_key_path: 서비스 계정 키 파일 경로
+            credentials: 공유할 자격 증명 관리자 (선택사항, 없으면 새로 생성)
+            max_concurrency: 동시에 진행할 최대 요청 수
+            max_connections: fcm.googleapis.com으로 열어둘 최대 연결 수
+            http2: HTTP/2 멀티플렉싱 사용 여부
+            connect_timeout: 연결 타임아웃(초)
+            read_timeout: 응답 읽기 타임아웃(초)
+            client: 사용할 httpx.AsyncClient (선택사항, 테스트용 MockTransport 주입 등)
+            api_url: FCM API 주소 (기본값: fcm.googleapis.com, 로컬 에뮬레이터 주소 등)
+            retry_policy: 재시도 정책 (선택사항, 기본값: 최대 5회 지수 백오프)
+            rate_limiter: 전송 속도 제한기 (선택사항, FCMService와 공유 가능)
+            dead_tokens: 사용 불가 토큰 레지스트리 (선택사항, 다중 전송 시 기록된 토큰은 건너뜀)
+            circuit_breaker: FCM 장애 시 즉시 실패 처리할 회로 차단기 (선택사항)
+        """
+        self.project_id = project_id
+        self.service_account_key_path = service_account_key_path
+        self.api_url = api_url.rstrip("/")
+        self.base_url = FCM_SEND_URL.format(api_url=self.api_url, project_id=project_id)
+        self.credentials = credentials or CredentialManager(service_account_key_path)
+        self.max_concurrency = max_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.dead_tokens = dead_tokens
+        self.circuit_breaker = circuit_breaker
+
+        self.client = client or httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+        # 이벤트 루프에 묶이지 않도록 첫 사용 시 생성
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _get_access_token(self) -> str:
+        """캐시된 액세스 토큰 획득 (갱신이 필요할 때만 스레드에서 한 번 갱신)"""
+        token = self.credentials.peek_token()
+        if token is not None:
+            return token
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+
+        async with self._token_lock:
+            # 대기하는 동안 다른 코루틴이 갱신했을 수 있음
+            token = self.credentials.peek_token()
+            if token is not None:
+                return token
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.credentials.get_token)
+
+    async def _post_message(self, body: bytes, access_token: str) -> httpx.Response:
+        """인증 헤더를 붙여 FCM API로 인코딩된 메시지 전송"""
+        # HTTP 요청 헤더
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+        # FCM API 호출
+        return await self.client.post(self.base_url, content=body, headers=headers)
+
+    async def _send_once(self, body: bytes, device_token: Optional[str] = None) -> SendResult:
+        """
+        인코딩된 메시지를 한 번 전송하고 응답을 분류 (예외를 던지지 않음, FCMService._send_once와 같은 순서)
+
+        Args:
+            body: 인코딩된 {"message": {...}} 본문
+            device_token: 대상 디바이스 토큰 (사용 불가 토큰 기록용, 선택사항)
+
+        Returns:
+            SendResult: 분류된 전송 결과
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                access_token = await self._get_access_token()
+            except Exception as e:
+                SENDS_TOTAL.inc(("TOKEN_ERROR",))
+                return SendResult(False, error_code="TOKEN_ERROR", error_class=AUTH, error_message=str(e))
+            TOKEN_SECONDS.observe(time.perf_counter() - started)
+
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                SENDS_TOTAL.inc((CIRCUIT_OPEN,))
+                return self.circuit_breaker.rejected_result()
+
+            result = await self._post_and_classify(body, access_token)
+
+        if result.error_class == AUTH:
+            # 토큰이 폐기되었을 수 있으므로 다음 시도에서 새로 발급
+            self.credentials.invalidate()
+        if self.rate_limiter:
+            await self.rate_limiter.on_result_async(result)
+        if self.dead_tokens is not None and device_token:
+            self.dead_tokens.record(device_token, result)
+        return result
+
+    async def _post_and_classify(self, body: bytes, access_token: str) -> SendResult:
+        """속도 제한을 적용해 FCM API를 호출하고 응답 분류 (HTTP 지표와 회로 차단기에 기록)"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async()
+
+        INFLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = await self._post_message(body, access_token)
+        except Exception as e:
+            result = classify_exception(e)
+            code = result.error_code
+        else:
+            result = classify_response(response.status_code, response.content, response.headers)
+            code = "OK" if result.success else (result.error_code or str(result.status_code))
+        finally:
+            INFLIGHT.dec()
+
+        elapsed = time.perf_counter() - started
+        HTTP_SECONDS.observe(elapsed, (code,))
+        SENDS_TOTAL.inc((code,))
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(result, elapsed)
+        return result
+
+    async def _send_with_retry(
+        self,
+        body: bytes,
+        device_token: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ) -> SendResult:
+        """재시도 가능한 오류는 백오프 후 재시도하며 전송 (대기 중에는 다른 코루틴이 전송)"""
+        policy = retry_policy or self.retry_policy
+        attempt = 0
+        while True:
+            result = await self._send_once(body, device_token)
+            attempt += 1
+            result.attempts = attempt
+            if not policy.should_retry(result, attempt):
+                return result
+            await asyncio.sleep(policy.backoff(attempt, result.retry_after))
+
+    def _log_result(self, result: SendResult, label: str = "FCM"):
+        if result.success:
+            print(f"{label} 전송 성공: {result.message_id}")
+        else:
+            print(
+                f"{label} 전송 실패: {result.status_code} - {result.error_code} "
+                f"({result.error_class}, 시도 {result.attempts}회) {result.error_message}"
+            )
+
+    async def send_message(self, message: Dict, retry_policy: Optional[RetryPolicy] = None) -> SendResult:
+        """
+        FCM 메시지 전송 (재시도 가능한 오류는 백오프 후 재시도)
+
+        Args:
+            message: {"message": {...}} 형태의 FCM 메시지
+            retry_policy: 재시도 정책 (선택사항, 기본값: 서비스 설정)
+
+        Returns:
+            SendResult: 분류된 전송 결과
+        """
+        try:
+            validate_message(message)
+        except ValidationError as e:
+            return invalid_result(e)
+        return await self._send_with_retry(dumps(message), message["message"].get("token"), retry_policy)
+
+    def compile_template(
+        self,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        android: bool = True
+    ) -> MessageTemplate:
+        """
+        알림 내용을 한 번만 직렬화한 메시지 템플릿 생성
+
+        Raises:
+            ValidationError: 제목/내용/data 형식이 잘못되었거나 페이로드가 4KB를 넘는 경우
+        """
+        fields = notification_fields(title, body, data, android)
+        validate_fields(fields)
+        return MessageTemplate(fields, title, body, data)
+
+    async def send_template(self, template: MessageTemplate, device_token: str) -> SendResult:
+        """
+        템플릿으로 단일 디바이스에 전송 (잘못된 토큰은 FCM 호출 없이 실패 처리)
+
+        Args:
+            template: 메시지 템플릿
+            device_token: 대상 디바이스 토큰
+
+        Returns:
+            SendResult: 분류된 전송 결과
+        """
+        if not is_valid_token(device_token):
+            return invalid_result(ValidationError("device_token", "공백 없는 비어있지 않은 문자열이어야 합니다."))
+        return await self._send_with_retry(template.render_token(device_token), device_token)
+
+    async def send_notification(
+        self,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        단일 디바이스에 푸시 알림 전송
+
+        Args:
+            device_token: 대상 디바이스 토큰
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+
+        Returns:
+            bool: 전송 성공 여부 (제목/내용/data가 잘못되었으면 전송하지 않고 False)
+        """
+        try:
+            template = self.compile_template(title, body, data)
+        except ValidationError as e:
+            self._log_result(invalid_result(e))
+            return False
+        result = await self.send_template(template, device_token)
+        self._log_result(result)
+        return result.success
+
+    async def send_template_results(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        deadline: Optional[float] = None
+    ) -> List[Optional[SendResult]]:
+        """
+        템플릿으로 여러 디바이스에 동시 전송하고 토큰별 SendResult 반환
+
+        Args:
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            deadline: 전체 제한 시간(초) (선택사항)
+
+        Returns:
+            List[Optional[SendResult]]: 입력 순서대로의 결과 (제한 시간 초과로 시도하지 않은 토큰은 None)
+        """
+        results: List[Optional[SendResult]] = [None] * len(device_tokens)
+        indices: List[int] = list(range(len(device_tokens)))
+        if self.dead_tokens is not None:
+            indices, skipped = self.dead_tokens.partition(device_tokens)
+            for i in skipped:
+                results[i] = skipped_result()
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        next_index = iter(indices)
+
+        # 토큰 수만큼 태스크를 만들지 않고 고정된 수의 워커가 순서대로 가져감
+        async def worker():
+            for i in next_index:
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    return
+                results[i] = await self.send_template(template, device_tokens[i])
+
+        workers = min(self.max_concurrency, len(indices))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def send_notification_to_multiple(
+        self,
+        device_tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Optional[bool]]:
+        """
+        여러 디바이스에 동시 푸시 알림 전송
+
+        Args:
+            device_tokens: 대상 디바이스 토큰 리스트
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+            deadline: 전체 제한 시간(초) (선택사항)
+
+        Returns:
+            Dict[str, Optional[bool]]: 각 토큰별 전송 결과 (입력 순서 유지, 제한 시간 초과로 시도하지 않은 토큰은 None,
+                제목/내용/data가 잘못되었으면 전송하지 않고 모두 False)
+        """
+        try:
+            template = self.compile_template(title, body, data)
+        except ValidationError as e:
+            self._log_result(invalid_result(e))
+            return {token: False for token in device_tokens}
+        results = await self.send_template_results(template, device_tokens, deadline)
+        outcomes = [result.success if result is not None else None for result in results]
+        success_count = sum(1 for outcome in outcomes if outcome)
+        print(f"다중 전송: {len(device_tokens)}개 중 {success_count}개 성공")
+        return dict(zip(device_tokens, outcomes))
+
+    async def send_notification_to_topic(
+        self,
+        topic: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        토픽에 푸시 알림 전송
+
+        Args:
+            topic: 대상 토픽
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+
+        Returns:
+            bool: 전송 성공 여부
+        """
+        result = await self.send_message(build_topic_message(topic, title, body, data))
+        self._log_result(result, "토픽 알림")
+        return result.success
+
+    async def send_notification_to_condition(
+        self,
+        condition: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        토픽 조건식에 맞는 디바이스에 푸시 알림 전송
+
+        Args:
+            condition: 토픽 조건식 (예: "'a' in topics && 'b' in topics")
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+
+        Returns:
+            bool: 전송 성공 여부
+        """
+        result = await self.send_message(build_condition_message(condition, title, body, data))
+        self._log_result(result, "조건 알림")
+        return result.success
+
+    async def aclose(self):
+        """HTTP 연결 정리"""
+        await self.client.aclose()
+
+
+# 사용 예시
+if __name__ == "__main__":
+    async def main():
+        async with AsyncFCMService(
+            project_id="my-notification-4d6dc",
+            service_account_key_path="firebase-service-account-key.json"
+        ) as fcm_service:
+            results = await fcm_service.send_notification_to_multiple(
+                device_tokens=["token1", "token2", "token3"],
+                title="Python 비동기 테스트",
+                body="asyncio + HTTP/2로 보낸 메시지입니다! 🐍"
+            )
+            success_count = sum(1 for success in results.values() if success)
+            print(f"{len(results)}개 중 {success_count}개 전송 성공")
+
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+import itertools
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Tuple
+
+from validation import MAX_CONDITION_TOPICS
+
+
+def topic_expression(topic: str) -> str:
+    """토픽 구독 여부 조건식 ('topic' in topics)"""
+    return f"'{topic}' in topics"
+
+
+def all_topics_condition(topics: Sequence[str]) -> str:
+    """
+    모든 토픽을 구독한 디바이스 대상 조건식
+
+    Args:
+        topics: 토픽 이름 리스트
+
+    Returns:
+        str: "'a' in topics && 'b' in topics" 형태의 조건식
+    """
+    return " && ".join(topic_expression(topic) for topic in topics)
+
+
+def any_topics_condition(topics: Sequence[str]) -> str:
+    """
+    토픽 중 하나라도 구독한 디바이스 대상 조건식 (여러 토픽을 구독해도 한 번만 받음)
+
+    Args:
+        topics: 토픽 이름 리스트
+
+    Returns:
+        str: "'a' in topics || 'b' in topics" 형태의 조건식
+    """
+    return " || ".join(topic_expression(topic) for topic in topics)
+
+
+class AudiencePlan:
+    """대상 디바이스를 토픽/조건 전송과 개별 토큰 전송으로 나눈 전송 계획"""
+
+    __slots__ = ("targets", "members", "tokens")
+
+    def __init__(
+        self,
+        targets: List[Tuple[str, str]],
+        members: List[List[str]],
+        tokens: List[str]
+    ):
+        """
+        Args:
+            targets: (topic 또는 condition, 값) 리스트
+            members: targets와 같은 순서로, 각 전송이 도달하는 대상 토큰 리스트
+            tokens: 개별 전송할 토큰 리스트
+        """
+        self.targets = targets
+        self.members = members
+        self.tokens = tokens
+
+    @property
+    def calls(self) -> int:
+        """FCM 호출 수 (재시도 제외)"""
+        return len(self.targets) + len(self.tokens)
+
+    def summary(self) -> Dict[str, int]:
+        """계획 요약 (토픽/조건 전송 수, 그 전송으로 도달하는 토큰 수, 개별 전송 수)"""
+        return {
+            "targets": len(self.targets),
+            "coveredTokens": sum(len(members) for members in self.members),
+            "tokens": len(self.tokens),
+            "calls": self.calls
+        }
+
+
+class AudiencePlanner:
+    """알려진 토픽 구독 정보로 대상 디바이스에 보낼 가장 적은 FCM 호출 조합을 계산
+
+    토픽(또는 두 토픽의 교집합 조건)의 구독자가 모두 대상에 포함될 때만 토픽/조건 전송을 사용하므로
+    대상이 아닌 디바이스에는 보내지 않습니다. 서로 겹치지 않는 후보만 큰 것부터 고르고, 고른 후보들은
+    최대 5개 토픽까지 || 조건으로 묶어 호출 수를 더 줄입니다. 나머지 토큰은 개별 전송합니다.
+    """
+
+    def __init__(
+        self,
+        memberships: Mapping[str, Iterable[str]],
+        min_members: int = 100,
+        max_pair_topics: int = 32
+    ):
+        """
+        플래너 초기화 (구독 정보는 한 번만 집합으로 변환해 여러 계획에 재사용)
+
+        Args:
+            memberships: 토픽 이름 -> 구독 중인 디바이스 토큰들
+            min_members: 토픽/조건 전송으로 처리할 최소 토큰 수 (이보다 작으면 개별 전송)
+            max_pair_topics: && 조건 후보를 찾을 때 살펴볼 최대 토픽 수 (대상과 많이 겹치는 순)
+        """
+        self.memberships: Dict[str, FrozenSet[str]] = {
+            topic: frozenset(tokens) for topic, tokens in memberships.items()
+        }
+        self.min_members = min_members
+        self.max_pair_topics = max_pair_topics
+
+    def _candidates(self, audience: FrozenSet[str]) -> List[Tuple[Tuple[str, ...], FrozenSet[str]]]:
+        """대상 밖으로 새지 않는 (토픽 조합, 도달 토큰) 후보"""
+        candidates = []
+        partial = []
+        for topic, members in self.memberships.items():
+            if len(members) < self.min_members:
+                continue
+            if members <= audience:
+                candidates.append(((topic,), members))
+            else:
+                overlap = len(members & audience)
+                if overlap >= self.min_members:
+                    partial.append((overlap, topic))
+
+        # 단독으로는 대상 밖까지 닿는 토픽도 두 토픽을 모두 구독한 디바이스로 좁히면 쓸 수 있음
+        partial.sort(reverse=True)
+        topics = [topic for _, topic in partial[:self.max_pair_topics]]
+        for first, second in itertools.combinations(topics, 2):
+            members = self.memberships[first] & self.memberships[second]
+            if len(members) >= self.min_members and members <= audience:
+                candidates.append(((first, second), members))
+        return candidates
+
+    def plan(self, device_tokens: Sequence[str]) -> AudiencePlan:
+        """
+        대상 디바이스 전송 계획 생성
+
+        Args:
+            device_tokens: 대상 디바이스 토큰 리스트
+
+        Returns:
+            AudiencePlan: 토픽/조건 전송과 개별 전송 목록
+        """
+        audience = frozenset(device_tokens)
+        covered = set()
+        chosen: List[Tuple[Tuple[str, ...], FrozenSet[str]]] = []
+        # 한 디바이스가 두 전송을 모두 받지 않도록 이미 고른 후보와 겹치는 후보는 제외
+        for terms, members in sorted(self._candidates(audience), key=lambda item: len(item[1]), reverse=True):
+            if members.isdisjoint(covered):
+                chosen.append((terms, members))
+                covered |= members
+
+        # 토픽 수 합계가 MAX_CONDITION_TOPICS 이하가 되도록 후보들을 || 조건으로 묶음
+        groups: List[List[Tuple[Tuple[str, ...], FrozenSet[str]]]] = []
+        for candidate in sorted(chosen, key=lambda item: len(item[0]), reverse=True):
+            for group in groups:
+                if sum(len(terms) for terms, _ in group) + len(candidate[0]) <= MAX_CONDITION_TOPICS:
+                    group.append(candidate)
+                    break
+            else:
+                groups.append([candidate])
+
+        targets: List[Tuple[str, str]] = []
+        members_by_target: List[List[str]] = []
+        for group in groups:
+            if len(group) == 1 and len(group[0][0]) == 1:
+                targets.append(("topic", group[0][0][0]))
+            elif len(group) == 1:
+                targets.append(("condition", all_topics_condition(group[0][0])))
+            else:
+                targets.append(("condition", " || ".join(
+                    f"({all_topics_condition(terms)})" if len(terms) > 1 else topic_expression(terms[0])
+                    for terms, _ in group
+                )))
+            members_by_target.append([token for _, members in group for token in members])
+
+        tokens = [token for token in device_tokens if token not in covered]
+        return AudiencePlan(targets, members_by_target, tokens)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+전송 경로별 처리량/지연 시간 벤치마크
+
+로컬 FCM 에뮬레이터(fcm_emulator.py)를 별도 프로세스로 띄우고 FCMService의 각 전송 메서드와
+Flask 엔드포인트를 수신자 수별로 실행해 초당 메시지 수, 요청 지연 시간(p50/p95/p99),
+메시지당 CPU 시간, 최대 메모리(RSS)를 JSON으로 출력합니다.
+각 실행은 새 프로세스에서 측정하므로 메모리/CPU 값이 서로 섞이지 않습니다.
+
+사용 예시:
+    python benchmark.py --output bench.json
+    python benchmark.py --scenarios send-multiple,flask-send-multiple --sizes 1000,100000 \\
+        --latency uniform:5,15 --baseline bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import requests
+
+from transport import InMemoryTransport, Transport, TransportResponse
+
+SCENARIOS = ("send", "send-multiple", "send-topic", "flask-send", "flask-send-multiple")
+DEFAULT_SIZES = (1, 1000, 100000, 1000000)
+
+PROJECT_ID = "benchmark-project"
+TITLE = "벤치마크"
+BODY = "전송 경로 성능 측정"
+
+
+class TimingTransport(Transport):
+    """요청별 왕복 시간을 기록하는 전송 계층 래퍼"""
+
+    def __init__(self, inner: Transport):
+        self.inner = inner
+        # array.append는 GIL 안에서 원자적이므로 여러 전송 스레드가 락 없이 기록
+        self.latencies = array("d")
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> TransportResponse:
+        started = time.perf_counter()
+        try:
+            return self.inner.post(url, body, headers)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+    def warmup(self, url: str, connections: int = 1) -> Optional[int]:
+        return self.inner.warmup(url, connections)
+
+    def close(self):
+        self.inner.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """정렬된 값에서 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _cpu_seconds() -> float:
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _tokens(count: int, invalid_rate: float) -> List[str]:
+    invalid_every = int(1 / invalid_rate) if invalid_rate > 0 else 0
+    return [
+        f"invalid-{i:07d}" if invalid_every and (i + 1) % invalid_every == 0 else f"bench-{i:07d}"
+        for i in range(count)
+    ]
+
+
+def _run_threads(concurrency: int, items: List, send) -> int:
+    """concurrency개 스레드가 공유 이터레이터에서 항목을 가져가 전송 (성공 수 반환)"""
+    shared: Iterator = iter(items)
+    successes = [0] * concurrency
+
+    def _worker(slot: int):
+        # list 이터레이터의 next()는 GIL 안에서 원자적
+        for item in shared:
+            if send(item):
+                successes[slot] += 1
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(min(concurrency, max(len(items), 1)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(successes)
+
+
+def run_scenario(config: Dict) -> Dict:
+    """
+    시나리오 하나를 현재 프로세스에서 실행하고 측정값 반환 (벤치마크 워커 프로세스에서 호출)
+
+    Args:
+        config: scenario, recipients, api_url, key_path, backend, concurrency, invalid_rate
+
+    Returns:
+        Dict: 처리량, 지연 시간 백분위수, 메시지당 CPU 시간, 최대 RSS
+    """
+    scenario = config["scenario"]
+    recipients = config["recipients"]
+    concurrency = config["concurrency"]
+    tokens = _tokens(recipients, config["invalid_rate"])
+
+    # 전송 로그 출력 비용은 포함하되 결과 JSON과 섞이지 않도록 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if scenario.startswith("flask-"):
+            os.environ.update({
+                "FCM_API_URL": config["api_url"],
+                "FCM_PROJECT_ID": PROJECT_ID,
+                "FCM_SERVICE_ACCOUNT_KEY": config["key_path"],
+                "FCM_DEAD_TOKENS_FILE": ""
+            })
+            import flask_app
+
+            service = flask_app.fcm_service
+            client = flask_app.app.test_client()
+        else:
+            from fcm_service import FCMService
+
+            service = FCMService(PROJECT_ID, config["key_path"], max_workers=concurrency, api_url=config["api_url"])
+
+        inner = InMemoryTransport() if config["backend"] == "memory" else service.transport
+        timing = TimingTransport(inner)
+        service.transport = timing
+
+        # 토큰 발급과 첫 연결은 측정에서 제외
+        service.send_notification("bench-warmup", TITLE, BODY)
+        del timing.latencies[:]
+
+        cpu_started = _cpu_seconds()
+        started = time.perf_counter()
+
+        if scenario == "send":
+            success = _run_threads(concurrency, tokens, lambda token: service.send_notification(token, TITLE, BODY))
+        elif scenario == "send-topic":
+            # 토픽 전송은 수신자 수와 관계없이 요청 하나이므로 recipients번 전송
+            topics = [f"bench-topic-{i % 100}" for i in range(recipients)]
+            success = _run_threads(
+                concurrency, topics, lambda topic: service.send_notification_to_topic(topic, TITLE, BODY)
+            )
+        elif scenario == "send-multiple":
+            results = service.send_notification_to_multiple(tokens, TITLE, BODY, max_workers=concurrency)
+            success = sum(1 for ok in results.values() if ok)
+        elif scenario == "flask-send":
+            clients = threading.local()
+
+            def _send(token: str) -> bool:
+                if not hasattr(clients, "client"):
+                    clients.client = flask_app.app.test_client()
+                response = clients.client.post("/send", json={"deviceToken": token, "title": TITLE, "body": BODY})
+                return response.status_code == 200
+
+            success = _run_threads(concurrency, tokens, _send)
+        elif scenario == "flask-send-multiple":
+            response = client.post("/send-multiple", json={
+                "deviceTokens": tokens,
+                "title": TITLE,
+                "body": BODY,
+                "maxConcurrency": concurrency
+            })
+            success = sum(1 for ok in response.get_json().get("results", {}).values() if ok)
+        else:
+            raise ValueError(f"알 수 없는 시나리오입니다: {scenario}")
+
+        elapsed = time.perf_counter() - started
+        cpu = _cpu_seconds() - cpu_started
+        service.close()
+
+    latencies = sorted(timing.latencies)
+    return {
+        "scenario": scenario,
+        "recipients": recipients,
+        "requests": len(latencies),
+        "success": success,
+        "failed": recipients - success,
+        "seconds": round(elapsed, 3),
+        "messagesPerSecond": round(recipients / elapsed, 1) if elapsed > 0 else None,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+        },
+        "cpuMsPerMessage": round(cpu * 1000 / recipients, 4),
+        "peakRssMb": _peak_rss_mb()
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def run_emulator(latency: str, errors: List[str], key_path: str) -> Iterator[str]:
+    """에뮬레이터를 별도 프로세스로 실행 (벤치마크 프로세스의 CPU/메모리 측정에서 제외)"""
+    port = _free_port()
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fcm_emulator.py"),
+        "--port", str(port), "--latency", latency, "--write-key", key_path
+    ]
+    for error in errors:
+        command += ["--error", error]
+
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if os.path.exists(key_path) and requests.get(f"{url}/stats", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("에뮬레이터를 시작하지 못했습니다.")
+            time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    기준 결과 대비 처리량 감소/p99 증가가 허용 범위를 넘는 항목 목록
+
+    Args:
+        results: 이번 실행 결과
+        baseline: 이전 벤치마크 JSON
+        tolerance: 허용 비율 (0.1이면 10%)
+
+    Returns:
+        List[str]: 회귀 설명 (없으면 빈 리스트)
+    """
+    previous = {(item["scenario"], item["recipients"]): item for item in baseline.get("results", [])}
+    regressions = []
+    for item in results:
+        before = previous.get((item["scenario"], item["recipients"]))
+        if before is None:
+            continue
+        name = f"{item['scenario']}@{item['recipients']}"
+        if before["messagesPerSecond"] and item["messagesPerSecond"] < before["messagesPerSecond"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: 처리량 {before['messagesPerSecond']} -> {item['messagesPerSecond']} msg/s"
+            )
+        if before["latencyMs"]["p99"] and item["latencyMs"]["p99"] > before["latencyMs"]["p99"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p99 {before['latencyMs']['p99']} -> {item['latencyMs']['p99']} ms"
+            )
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FCM 전송 경로 처리량/지연 시간 벤치마크 (JSON 출력)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"실행할 시나리오 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="수신자 수 목록 (쉼표 구분)")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시 전송 수")
+    parser.add_argument("--backend", choices=("emulator", "memory"), default="emulator",
+                        help="emulator: 로컬 에뮬레이터로 HTTP 전송, memory: 네트워크 없이 클라이언트 경로만 측정")
+    parser.add_argument("--latency", default="constant:0", help="에뮬레이터 응답 지연 분포 (fcm_emulator.py 형식)")
+    parser.add_argument("--error", action="append", default=[], metavar="CODE=RATE", help="에뮬레이터 오류 주입 비율")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="UNREGISTERED로 응답할 토큰 비율")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (기본값: 표준 출력)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON (회귀 시 종료 코드 1)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="회귀로 판단할 허용 비율")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오입니다: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fcm-bench-") as directory:
+        key_path = os.path.join(directory, "emulator-key.json")
+        with run_emulator(args.latency, args.error, key_path) as api_url:
+            for scenario in scenarios:
+                for size in sizes:
+                    print(f"⏱️  {scenario} / 수신자 {size}명 측정 중...", file=sys.stderr)
+                    # 실행마다 새 프로세스를 사용해 최대 RSS와 CPU 시간을 분리
+                    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                        result = executor.submit(run_scenario, {
+                            "scenario": scenario,
+                            "recipients": size,
+                            "api_url": api_url,
+                            "key_path": key_path,
+                            "backend": args.backend,
+                            "concurrency": args.concurrency,
+                            "invalid_rate": args.invalid_rate
+                        }).result()
+                    print(
+                        f"   {result['messagesPerSecond']} msg/s, p99 {result['latencyMs']['p99']} ms, "
+                        f"CPU {result['cpuMsPerMessage']} ms/msg, RSS {result['peakRssMb']} MB",
+                        file=sys.stderr
+                    )
+                    results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+            "backend": args.backend,
+            "latency": args.latency,
+            "errors": args.error,
+            "invalidRate": args.invalid_rate,
+            "concurrency": args.concurrency
+        },
+        "results": results
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ 성능 회귀: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("✅ 기준 결과 대비 회귀 없음", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import threading
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fcm_errors import SendResult
+
+# /send-multiple 응답 형태
+SUMMARY = "summary"
+FAILURES = "failures"
+FULL = "full"
+SHAPES = (SUMMARY, FAILURES, FULL)
+
+# 오류 코드 문자열 <-> 작은 정수 (프로세스 전체에서 공유)
+_code_ids: Dict[str, int] = {}
+_codes: List[str] = []
+_codes_lock = threading.Lock()
+
+
+def intern_code(code: Optional[str]) -> int:
+    """오류 코드를 정수 ID로 변환 (처음 보는 코드는 새 ID 할당)"""
+    code = code or "UNKNOWN"
+    code_id = _code_ids.get(code)
+    if code_id is None:
+        with _codes_lock:
+            code_id = _code_ids.get(code)
+            if code_id is None:
+                code_id = len(_codes)
+                _codes.append(code)
+                _code_ids[code] = code_id
+    return code_id
+
+
+def code_name(code_id: int) -> str:
+    """정수 ID를 오류 코드 문자열로 변환"""
+    return _codes[code_id]
+
+
+class BulkResult:
+    """다중 전송 결과의 압축 표현
+
+    토큰별 결과 객체나 토큰 문자열을 보관하지 않고 성공 수, 실패한 입력 인덱스(uint32 배열),
+    실패별 오류 코드 ID(uint16 배열), 시도하지 않은 인덱스만 저장합니다.
+    토큰별 상세 결과는 요청한 토큰 리스트를 넘겨 필요할 때만 만듭니다.
+    """
+
+    __slots__ = ("total", "success_count", "failed_indices", "failed_codes", "not_attempted", "message_ids")
+
+    def __init__(self, total: int, keep_message_ids: bool = False):
+        """
+        Args:
+            total: 전체 토큰 수
+            keep_message_ids: 성공한 전송의 FCM 메시지 ID 보관 여부 (full 응답에 필요)
+        """
+        self.total = total
+        self.success_count = 0
+        self.failed_indices = array("I")
+        self.failed_codes = array("H")
+        self.not_attempted = array("I")
+        self.message_ids: Optional[List[Optional[str]]] = [None] * total if keep_message_ids else None
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Sequence[Optional[SendResult]],
+        keep_message_ids: bool = False
+    ) -> "BulkResult":
+        """
+        입력 순서대로의 전송 결과 리스트를 압축
+
+        Args:
+            results: 토큰별 결과 (시도하지 않은 토큰은 None)
+            keep_message_ids: 성공한 전송의 FCM 메시지 ID 보관 여부
+
+        Returns:
+            BulkResult: 압축된 결과
+        """
+        bulk = cls(len(results), keep_message_ids)
+        for i, result in enumerate(results):
+            bulk.add(i, result)
+        return bulk
+
+    def add(self, index: int, result: Optional[SendResult]):
+        """index번째 토큰의 결과 기록"""
+        if result is None:
+            self.not_attempted.append(index)
+        elif result.success:
+            self.success_count += 1
+            if self.message_ids is not None:
+                self.message_ids[index] = result.message_id
+        else:
+            self.failed_indices.append(index)
+            self.failed_codes.append(intern_code(result.error_code))
+
+    @property
+    def failure_count(self) -> int:
+        return len(self.failed_indices)
+
+    def error_counts(self) -> Dict[str, int]:
+        """오류 코드별 실패 수"""
+        counts: Dict[int, int] = {}
+        for code_id in self.failed_codes:
+            counts[code_id] = counts.get(code_id, 0) + 1
+        return {code_name(code_id): count for code_id, count in counts.items()}
+
+    def failures(self) -> Dict[str, List[int]]:
+        """오류 코드 -> 실패한 토큰의 입력 인덱스 리스트"""
+        grouped: Dict[str, List[int]] = {}
+        for index, code_id in zip(self.failed_indices, self.failed_codes):
+            grouped.setdefault(code_name(code_id), []).append(index)
+        return grouped
+
+    def failed_tokens(self, device_tokens: Sequence[str]) -> Iterator[Tuple[str, str]]:
+        """(실패한 토큰, 오류 코드)를 입력 순서대로 생성"""
+        for index, code_id in zip(self.failed_indices, self.failed_codes):
+            yield device_tokens[index], code_name(code_id)
+
+    def outcomes(self, device_tokens: Sequence[str]) -> Dict[str, Optional[bool]]:
+        """토큰별 성공 여부 (시도하지 않은 토큰은 None, send_template_to_multiple과 같은 형태)"""
+        outcomes: Dict[str, Optional[bool]] = dict.fromkeys(device_tokens, True)
+        for index in self.failed_indices:
+            outcomes[device_tokens[index]] = False
+        for index in self.not_attempted:
+            outcomes[device_tokens[index]] = None
+        return outcomes
+
+    def details(self, device_tokens: Sequence[str]) -> Iterator[Dict]:
+        """토큰별 상세 결과 (token, success, messageId, errorCode)를 입력 순서대로 생성"""
+        errors = dict(zip(self.failed_indices, self.failed_codes))
+        skipped = set(self.not_attempted)
+        for index, token in enumerate(device_tokens):
+            code_id = errors.get(index)
+            yield {
+                "token": token,
+                "success": None if index in skipped else code_id is None,
+                "messageId": self.message_ids[index] if self.message_ids is not None else None,
+                "errorCode": code_name(code_id) if code_id is not None else None
+            }
+
+    def summary(self) -> Dict:
+        """성공/실패/미시도 수와 오류 코드별 실패 수"""
+        return {
+            "total": self.total,
+            "successCount": self.success_count,
+            "failureCount": self.failure_count,
+            "notAttempted": len(self.not_attempted),
+            "errorCounts": self.error_counts()
+        }
+
+    def to_dict(self, shape: str = SUMMARY, device_tokens: Optional[Sequence[str]] = None) -> Dict:
+        """
+        JSON 응답용 딕셔너리
+
+        Args:
+            shape: summary(개수만), failures(오류 코드별 실패 인덱스 추가), full(토큰별 상세 결과 추가)
+            device_tokens: full 형태에 필요한 요청 토큰 리스트
+
+        Returns:
+            Dict: 응답 본문
+        """
+        body = self.summary()
+        if shape == FAILURES:
+            body["failures"] = self.failures()
+            body["notAttemptedIndices"] = self.not_attempted.tolist()
+        elif shape == FULL:
+            body["results"] = list(self.details(device_tokens))
+        return body
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+파일 기반 대량 전송(캠페인) CLI
+
+토큰 파일(한 줄에 토큰 하나)을 메모리 맵으로 읽어 전송하고, 주기적으로 체크포인트
+(바이트 오프셋 + 결과 카운터)를 기록합니다. 중단된 캠페인은 같은 명령으로 다시 실행하면
+마지막 체크포인트 이후부터 이어서 전송합니다.
+
+사용 예시:
+    python campaign.py tokens.txt --title "공지" --body "점검 안내" --concurrency 64
+"""
+
+import argparse
+import json
+import mmap
+import os
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from fcm_service import FCM_API_URL, FCMService
+from message_template import MessageTemplate
+
+
+def _fsync_dir(path: str):
+    """파일 생성/교체가 디스크에 반영되도록 상위 디렉터리 fsync (지원하지 않는 플랫폼은 건너뜀)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def iter_token_lines(path: str, start_offset: int = 0) -> Iterator[Tuple[int, int, str]]:
+    """
+    메모리 맵으로 토큰 파일을 줄 단위로 읽음 (파일 전체를 메모리에 올리지 않음)
+
+    Args:
+        path: 토큰 파일 경로
+        start_offset: 읽기 시작할 바이트 오프셋
+
+    Yields:
+        Tuple[int, int, str]: (줄 시작 오프셋, 다음 줄 시작 오프셋, 토큰)
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or start_offset >= size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                position = start_offset
+                while position < size:
+                    newline = mm.find(b"\n", position)
+                    end = size if newline == -1 else newline
+                    # bytes 복사 없이 맵에서 바로 디코딩
+                    token = str(view[position:end], "utf-8").strip()
+                    next_position = end + 1
+                    if token:
+                        yield position, next_position, token
+                    position = next_position
+            finally:
+                view.release()
+
+
+class CampaignRunner:
+    """체크포인트로 재개 가능한 파일 기반 대량 전송"""
+
+    def __init__(
+        self,
+        fcm_service: FCMService,
+        input_path: str,
+        template: MessageTemplate,
+        results_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 1000,
+        max_workers: Optional[int] = None,
+        checkpoint_every: int = 10000
+    ):
+        """
+        캠페인 초기화
+
+        Args:
+            fcm_service: FCM 서비스
+            input_path: 토큰 파일 경로
+            template: 메시지 템플릿
+            results_path: 결과 파일 경로 (기본값: <입력 파일>.results)
+            checkpoint_path: 체크포인트 파일 경로 (기본값: <입력 파일>.checkpoint)
+            batch_size: 한 번에 전송할 토큰 수
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            checkpoint_every: 체크포인트 기록 간격 (토큰 수)
+        """
+        self.fcm_service = fcm_service
+        self.input_path = input_path
+        self.template = template
+        self.results_path = results_path or f"{input_path}.results"
+        self.checkpoint_path = checkpoint_path or f"{input_path}.checkpoint"
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.checkpoint_every = checkpoint_every
+
+        self.offset = 0
+        self.counters: Dict[str, int] = {"sent": 0, "success": 0, "failed": 0}
+
+    def load_checkpoint(self) -> bool:
+        """
+        체크포인트가 있으면 오프셋과 카운터 복원
+
+        Returns:
+            bool: 복원했으면 True
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("input_size") != os.path.getsize(self.input_path):
+            raise ValueError("토큰 파일이 체크포인트 이후 변경되었습니다. --restart로 처음부터 다시 실행하세요.")
+        self.offset = checkpoint["offset"]
+        self.counters = checkpoint["counters"]
+        return True
+
+    def _save_checkpoint(self, results):
+        """
+        결과 파일을 디스크에 반영한 뒤 체크포인트를 원자적으로 교체
+
+        체크포인트가 가리키는 오프셋까지의 결과는 항상 디스크에 있어야 하므로 결과 파일을 먼저 fsync하고,
+        교체한 체크포인트도 디렉터리를 fsync해 중단 후에 옛 체크포인트로 돌아가지 않도록 합니다.
+        """
+        results.flush()
+        os.fsync(results.fileno())
+        checkpoint = {
+            "input": os.path.abspath(self.input_path),
+            "input_size": os.path.getsize(self.input_path),
+            "offset": self.offset,
+            "counters": self.counters,
+            "updated_at": time.time()
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        _fsync_dir(self.checkpoint_path)
+
+    def _completed_after_checkpoint(self) -> Set[int]:
+        """
+        마지막 체크포인트 이후 결과 파일에 이미 기록된 토큰 오프셋 (중단 직전 전송분 재전송 방지)
+
+        기록된 결과는 카운터에도 반영합니다.
+        """
+        done: Set[int] = set()
+        if not os.path.exists(self.results_path):
+            return done
+        valid_end = 0
+        with open(self.results_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 기록 중 중단된 마지막 줄 (다음 기록과 이어 붙지 않도록 아래에서 잘라냄)
+                    break
+                valid_end += len(line)
+                offset, _, status = line.rstrip(b"\n").partition(b"\t")
+                if not status or not offset.isdigit() or int(offset) < self.offset:
+                    continue
+                done.add(int(offset))
+                self.counters["sent"] += 1
+                self.counters["success" if status == b"OK" else "failed"] += 1
+        if valid_end < os.path.getsize(self.results_path):
+            with open(self.results_path, "r+b") as f:
+                f.truncate(valid_end)
+        return done
+
+    def run(self) -> Dict[str, int]:
+        """
+        캠페인 실행 (체크포인트 이후부터)
+
+        Returns:
+            Dict[str, int]: 전송/성공/실패 카운터
+        """
+        done = self._completed_after_checkpoint()
+        if done:
+            print(f"♻️  체크포인트 이후 이미 전송된 토큰 {len(done)}개 건너뜀")
+
+        # send_stream은 입력 순서대로 결과를 내보내므로 읽은 순서대로 오프셋을 짝지음
+        pending_offsets = deque()
+
+        def recipients():
+            for start, end, token in iter_token_lines(self.input_path, self.offset):
+                if start in done:
+                    continue
+                pending_offsets.append((start, end))
+                yield token, self.template
+
+        started = time.monotonic()
+        sent_now = 0
+        since_checkpoint = 0
+        with open(self.results_path, "ab") as results:
+            stream = self.fcm_service.send_stream(recipients(), self.batch_size, self.max_workers)
+            for _, result in stream:
+                start, end = pending_offsets.popleft()
+                status = "OK" if result.success else (result.error_code or "ERROR")
+                results.write(f"{start}\t{status}\n".encode("ascii"))
+                self.counters["sent"] += 1
+                self.counters["success" if result.success else "failed"] += 1
+                self.offset = end
+                sent_now += 1
+                since_checkpoint += 1
+
+                if since_checkpoint >= self.checkpoint_every:
+                    self._save_checkpoint(results)
+                    since_checkpoint = 0
+                    elapsed = time.monotonic() - started
+                    print(
+                        f"📊 {self.counters['sent']}개 전송 (성공 {self.counters['success']}, "
+                        f"실패 {self.counters['failed']}) - {sent_now / max(elapsed, 1e-9):.0f}개/초"
+                    )
+
+            self.offset = os.path.getsize(self.input_path)
+            self._save_checkpoint(results)
+
+        return self.counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파일 기반 FCM 대량 전송 (체크포인트 재개 지원)")
+    parser.add_argument("tokens", help="토큰 파일 경로 (한 줄에 토큰 하나)")
+    parser.add_argument("--title", required=True, help="알림 제목")
+    parser.add_argument("--body", required=True, help="알림 내용")
+    parser.add_argument("--data", default="{}", help="추가 데이터 (JSON 문자열)")
+    parser.add_argument("--project-id", default="my-notification-4d6dc", help="Firebase 프로젝트 ID")
+    parser.add_argument("--key", default="firebase-service-account-key.json", help="서비스 계정 키 파일 경로")
+    parser.add_argument("--api-url", default=FCM_API_URL, help="FCM API 주소 (로컬 에뮬레이터 사용 시)")
+    parser.add_argument("--concurrency", type=int, default=32, help="최대 동시 전송 수 (워커 프로세스 사용 시 프로세스당)")
+    parser.add_argument("--processes", type=int, default=1, help="워커 프로세스 수 (0이면 CPU 코어 수)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="한 번에 읽어 전송할 토큰 수")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="체크포인트 기록 간격 (토큰 수)")
+    parser.add_argument("--results", help="결과 파일 경로 (기본값: <토큰 파일>.results)")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 경로 (기본값: <토큰 파일>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 전송")
+    args = parser.parse_args()
+
+    fcm_service = FCMService(
+        project_id=args.project_id,
+        service_account_key_path=args.key,
+        max_workers=args.concurrency,
+        processes=args.processes or os.cpu_count() or 1,
+        api_url=args.api_url
+    )
+    runner = CampaignRunner(
+        fcm_service,
+        args.tokens,
+        fcm_service.compile_template(args.title, args.body, json.loads(args.data)),
+        results_path=args.results,
+        checkpoint_path=args.checkpoint,
+        batch_size=args.batch_size,
+        checkpoint_every=args.checkpoint_every
+    )
+
+    if args.restart:
+        for path in (runner.checkpoint_path, runner.results_path):
+            if os.path.exists(path):
+                os.remove(path)
+    elif runner.load_checkpoint():
+        print(f"♻️  체크포인트에서 재개: 오프셋 {runner.offset}, {runner.counters['sent']}개 전송됨")
+
+    print(f"🚀 캠페인 시작: {args.tokens}")
+    try:
+        counters = runner.run()
+    finally:
+        fcm_service.close()
+    print(f"🎉 캠페인 완료: {counters['sent']}개 중 {counters['success']}개 성공, {counters['failed']}개 실패")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List
+
+from fcm_errors import CIRCUIT_OPEN, RETRYABLE, SendResult
+
+# 회로 상태
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 지표용 상태 값
+STATE_VALUES: Dict[str, int] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 전송하지 않은 작업 (큐 워커가 작업을 백로그로 되돌림)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"FCM 회로 차단 중 ({retry_after:.1f}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """FCM 장애 시 전송을 즉시 실패 처리하는 회로 차단기
+
+    최근 window초 동안의 전송 중 재시도 가능한 오류(5xx, 네트워크 오류, 타임아웃) 비율이나
+    slow_call_seconds 이상 걸린 요청 비율이 기준을 넘으면 회로를 열고, open_seconds 동안은
+    FCM을 호출하지 않고 CIRCUIT_OPEN 결과를 바로 돌려줍니다. 이후 half_open_probes개의 요청만
+    시험 삼아 보내 모두 정상이면 회로를 닫고, 하나라도 실패하면 대기 시간을 두 배로 늘려 다시 엽니다.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate: float = 0.8,
+        window: float = 10.0,
+        min_calls: int = 20,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+        half_open_probes: int = 5
+    ):
+        """
+        회로 차단기 초기화
+
+        Args:
+            failure_rate: 회로를 여는 재시도 가능한 오류 비율 (0~1)
+            slow_call_seconds: 느린 요청으로 볼 응답 시간(초)
+            slow_call_rate: 회로를 여는 느린 요청 비율 (0~1)
+            window: 비율을 계산할 최근 구간(초)
+            min_calls: 비율을 판단하기 위한 구간 내 최소 요청 수
+            open_seconds: 회로를 연 뒤 시험 요청을 보내기까지 대기 시간(초)
+            max_open_seconds: 시험 요청이 연속 실패할 때 늘어나는 대기 시간의 상한(초)
+            half_open_probes: 회로를 닫기 위해 연속으로 성공해야 하는 시험 요청 수
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        # 1초 단위 구간: [초, 요청 수, 실패 수, 느린 요청 수]
+        self._buckets: Deque[List[int]] = deque()
+        self._calls = 0
+        self._failures = 0
+        self._slow = 0
+        self._open_duration = open_seconds
+        self._open_until = 0.0
+        self._probe_slots = 0
+        self._probe_successes = 0
+
+        self._trips = 0
+        self._rejected = 0
+
+    def allow(self) -> bool:
+        """
+        지금 FCM을 호출해도 되는지 판단 (열린 회로의 대기 시간이 지나면 시험 요청 허용)
+
+        Returns:
+            bool: 호출해도 되면 True
+        """
+        # 닫힌 상태에서는 락 없이 통과
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() < self._open_until:
+                    self._rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probe_slots = self.half_open_probes
+                self._probe_successes = 0
+                print("FCM 회로 반개방: 시험 요청 전송")
+            if self.state == HALF_OPEN:
+                if self._probe_slots > 0:
+                    self._probe_slots -= 1
+                    return True
+                self._rejected += 1
+                return False
+            return True
+
+    def record(self, result: SendResult, elapsed: float):
+        """
+        전송 결과 반영
+
+        Args:
+            result: 전송 결과
+            elapsed: FCM 요청 왕복 시간(초)
+        """
+        failed = not result.success and result.error_class == RETRYABLE
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._trip(min(self._open_duration * 2, self.max_open_seconds))
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._close()
+                return
+            if self.state == OPEN:
+                # 회로가 열리기 전에 보낸 요청의 늦은 결과
+                return
+
+            now = time.monotonic()
+            second = int(now)
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, 0, 0, 0])
+            bucket = self._buckets[-1]
+            bucket[1] += 1
+            bucket[2] += failed
+            bucket[3] += slow
+            self._calls += 1
+            self._failures += failed
+            self._slow += slow
+
+            while self._buckets and self._buckets[0][0] <= now - self.window:
+                _, calls, failures, slow_calls = self._buckets.popleft()
+                self._calls -= calls
+                self._failures -= failures
+                self._slow -= slow_calls
+
+            if self._calls >= self.min_calls and (
+                self._failures >= self._calls * self.failure_rate
+                or self._slow >= self._calls * self.slow_call_rate
+            ):
+                self._trip(self.open_seconds)
+
+    def _trip(self, duration: float):
+        """회로 열기 (lock 보유 상태에서 호출)"""
+        print(
+            f"FCM 회로 차단: {duration:.0f}초 동안 즉시 실패 처리 "
+            f"(최근 {self._calls}건 중 오류 {self._failures}건, 느린 요청 {self._slow}건)"
+        )
+        self.state = OPEN
+        self._open_duration = duration
+        self._open_until = time.monotonic() + duration
+        self._trips += 1
+        self._reset_window()
+
+    def _close(self):
+        """회로 닫기 (lock 보유 상태에서 호출)"""
+        print("FCM 회로 복구: 정상 전송 재개")
+        self.state = CLOSED
+        self._open_duration = self.open_seconds
+        self._reset_window()
+
+    def _reset_window(self):
+        self._buckets.clear()
+        self._calls = self._failures = self._slow = 0
+
+    def is_open(self) -> bool:
+        """대기 시간이 남은 열린 상태인지 여부 (시험 요청을 보낼 수 있게 되면 False)"""
+        return self.state == OPEN and time.monotonic() < self._open_until
+
+    def retry_after(self) -> float:
+        """다시 시도해 볼 수 있을 때까지 남은 시간(초) (닫힌 상태면 0)"""
+        if self.state == CLOSED:
+            return 0.0
+        if self.state == HALF_OPEN:
+            # 시험 요청 결과를 기다리는 중
+            return 1.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def rejected_result(self) -> SendResult:
+        """회로가 열려 보내지 않은 요청의 결과 (재시도 정책은 이 결과를 재시도하지 않음)"""
+        retry_after = self.retry_after()
+        return SendResult(
+            False,
+            0,
+            error_code=CIRCUIT_OPEN,
+            error_class=RETRYABLE,
+            error_message=f"FCM 회로 차단 중 ({retry_after:.1f}초 후 재시도)",
+            retry_after=retry_after,
+            attempts=0
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """
+        회로 상태 통계 반환
+
+        Returns:
+            Dict[str, float]: 상태, 구간 내 요청/오류/느린 요청 수, 회로가 열린 횟수, 즉시 실패 처리한 요청 수
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": self._calls,
+                "failures": self._failures,
+                "slow_calls": self._slow,
+                "trips": self._trips,
+                "rejected": self._rejected,
+                "retry_after": round(self.retry_after(), 1)
+            }
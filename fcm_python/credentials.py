@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FCM_SCOPES = ['https://www.googleapis.com/auth/firebase.messaging']
+
+
+class CredentialManager:
+    """서비스 계정 키를 한 번만 로드하고 OAuth 2.0 액세스 토큰을 캐싱하는 관리자
+
+    토큰은 만료 직전(refresh_margin 초 전)까지 재사용되며, 백그라운드 스레드가
+    만료 전에 미리 갱신하므로 전송 경로에서 토큰 갱신을 기다리지 않습니다.
+    여러 스레드(Flask 워커)가 하나의 인스턴스를 공유해도 안전합니다.
+    cache_path를 지정하면 같은 호스트의 여러 프로세스가 파일 하나로 토큰을 공유하므로
+    토큰 엔드포인트는 프로세스 수와 관계없이 한 번만 호출됩니다.
+    """
+
+    def __init__(
+        self,
+        service_account_key_path: str,
+        scopes: Optional[List[str]] = None,
+        refresh_margin: float = 300.0,
+        background_refresh: bool = True,
+        retry_interval: float = 10.0,
+        cache_path: Optional[str] = None,
+        token_uri: Optional[str] = None
+    ):
+        """
+        자격 증명 관리자 초기화
+
+        Args:
+            service_account_key_path: 서비스 계정 키 파일 경로
+            scopes: OAuth 2.0 스코프 (기본값: firebase.messaging)
+            refresh_margin: 만료 몇 초 전에 토큰을 갱신할지
+            background_refresh: 백그라운드 선제 갱신 사용 여부
+            retry_interval: 백그라운드 갱신 실패 시 재시도 간격(초)
+            cache_path: 프로세스 간 토큰 공유 파일 경로 (선택사항, POSIX 전용)
+            token_uri: 토큰 엔드포인트 URL (선택사항, 기본값: 키 파일의 token_uri, 에뮬레이터용)
+        """
+        if cache_path is not None and fcntl is None:
+            raise RuntimeError("프로세스 간 토큰 공유는 POSIX 환경에서만 지원됩니다.")
+
+        self.service_account_key_path = service_account_key_path
+        self.scopes = scopes or FCM_SCOPES
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.retry_interval = retry_interval
+        self.cache_path = cache_path
+        self.token_uri = token_uri
+
+        self._credentials = None
+        # 인증 오류로 폐기한 토큰 (공유 파일에 남아 있어도 다시 사용하지 않음)
+        self._revoked: Optional[str] = None
+        # (토큰, 만료 시각(monotonic)) - 튜플 단위로 교체하여 락 없이 읽을 수 있음
+        self._cached: Optional[Tuple[str, float]] = None
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._shared_reads = 0
+        self._background_refreshes = 0
+        self._failures = 0
+
+    def load(self):
+        """
+        서비스 계정 키 파일을 읽어 둠 (토큰 발급 없이 키 설정만 확인, 워밍업용)
+
+        Raises:
+            OSError: 키 파일을 읽을 수 없는 경우
+            ValueError: 키 파일 형식이 잘못된 경우
+        """
+        self._load_credentials()
+
+    def _load_credentials(self):
+        """서비스 계정 키 파일을 한 번만 읽어 Credentials 객체 생성"""
+        if self._credentials is None:
+            # google.auth는 import만 100ms 이상 걸리므로 처음 토큰이 필요할 때 로드 (콜드 스타트 단축)
+            from google.oauth2 import service_account
+
+            self._credentials = service_account.Credentials.from_service_account_file(
+                self.service_account_key_path,
+                scopes=self.scopes
+            )
+            if self.token_uri:
+                self._credentials = self._credentials.with_token_uri(self.token_uri)
+        return self._credentials
+
+    def _fetch(self) -> Tuple[str, float]:
+        """토큰 엔드포인트에서 새 액세스 토큰 발급 (토큰, 남은 유효 시간(초))"""
+        from google.auth.transport.requests import Request
+
+        credentials = self._load_credentials()
+        credentials.refresh(Request())
+
+        expires_in = 3600.0
+        if credentials.expiry is not None:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            expires_in = (credentials.expiry - now).total_seconds()
+
+        with self._stats_lock:
+            self._refreshes += 1
+        return credentials.token, expires_in
+
+    def _refresh(self) -> Tuple[str, float]:
+        """새 액세스 토큰을 받아 캐시에 저장 (refresh_lock 보유 상태에서 호출)"""
+        if self.cache_path is None:
+            token, expires_in = self._fetch()
+        else:
+            token, expires_in = self._refresh_shared()
+        cached = (token, time.monotonic() + expires_in)
+        self._cached = cached
+        return cached
+
+    def _refresh_shared(self) -> Tuple[str, float]:
+        """
+        공유 파일의 토큰을 읽고, 없거나 곧 만료되면 발급받아 파일에 기록
+
+        파일 잠금을 잡은 프로세스만 토큰 엔드포인트를 호출하고, 나머지는 기록된 토큰을 읽습니다.
+        """
+        fd = os.open(self.cache_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 65536)
+            entry = json.loads(raw) if raw else None
+            now = time.time()
+            if entry and entry["token"] != self._revoked and entry["expires_at"] - now > self.refresh_margin:
+                with self._stats_lock:
+                    self._shared_reads += 1
+                return entry["token"], entry["expires_at"] - now
+
+            token, expires_in = self._fetch()
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, json.dumps({"token": token, "expires_at": now + expires_in}).encode("utf-8"), 0)
+            return token, expires_in
+        finally:
+            os.close(fd)
+
+    def _is_fresh(self, cached: Optional[Tuple[str, float]]) -> bool:
+        return cached is not None and time.monotonic() < cached[1] - self.refresh_margin
+
+    def peek_token(self) -> Optional[str]:
+        """
+        갱신 없이 즉시 사용할 수 있는 토큰 반환 (블로킹 없음)
+
+        Returns:
+            Optional[str]: 사용 가능한 토큰, 동기 갱신이 필요하면 None
+        """
+        cached = self._cached
+        if self._is_fresh(cached):
+            with self._stats_lock:
+                self._hits += 1
+            return cached[0]
+
+        if cached is not None and time.monotonic() < cached[1] and self._refresher is not None:
+            # 아직 만료 전이면 기존 토큰을 사용하고 갱신은 백그라운드에 맡김
+            with self._stats_lock:
+                self._hits += 1
+            self._wake_refresher()
+            return cached[0]
+
+        return None
+
+    def get_token(self) -> str:
+        """
+        캐시된 액세스 토큰 반환
+
+        캐시가 유효하면 즉시 반환하고, 만료 여유 구간에 들어간 토큰은 그대로 반환하면서
+        백그라운드 갱신을 요청합니다. 토큰이 없거나 완전히 만료된 경우에만 동기적으로 갱신합니다.
+
+        Returns:
+            str: OAuth 2.0 액세스 토큰
+        """
+        token = self.peek_token()
+        if token is not None:
+            return token
+
+        with self._refresh_lock:
+            # 다른 스레드가 먼저 갱신했는지 다시 확인
+            cached = self._cached
+            if self._is_fresh(cached):
+                with self._stats_lock:
+                    self._hits += 1
+                return cached[0]
+
+            with self._stats_lock:
+                self._misses += 1
+            cached = self._refresh()
+
+        if self.background_refresh:
+            self._start_refresher()
+        return cached[0]
+
+    def _start_refresher(self):
+        """백그라운드 갱신 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        with self._refresh_lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._stop_event.clear()
+            self._wake_event.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop,
+                name="fcm-token-refresher",
+                daemon=True
+            )
+            self._refresher.start()
+
+    def _wake_refresher(self):
+        """백그라운드 스레드가 즉시 갱신 여부를 다시 판단하도록 깨움"""
+        self._wake_event.set()
+
+    def _refresh_loop(self):
+        """만료 refresh_margin 초 전에 토큰을 선제적으로 갱신하는 루프"""
+        while not self._stop_event.is_set():
+            cached = self._cached
+            wait = 0.0
+            if cached is not None:
+                wait = max(0.0, cached[1] - self.refresh_margin - time.monotonic())
+
+            if wait > 0:
+                self._wake_event.wait(wait)
+                self._wake_event.clear()
+                continue
+
+            try:
+                with self._refresh_lock:
+                    if not self._is_fresh(self._cached):
+                        self._refresh()
+                        with self._stats_lock:
+                            self._background_refreshes += 1
+                if not self._is_fresh(self._cached):
+                    # 토큰 수명이 refresh_margin보다 짧은 경우 연속 갱신 방지
+                    self._wake_event.wait(self.retry_interval)
+                    self._wake_event.clear()
+            except Exception as e:
+                with self._stats_lock:
+                    self._failures += 1
+                print(f"액세스 토큰 백그라운드 갱신 실패: {str(e)}")
+                self._wake_event.wait(self.retry_interval)
+                self._wake_event.clear()
+
+    def invalidate(self):
+        """캐시된 토큰 폐기 (인증 오류 응답을 받았을 때 다음 요청에서 새로 발급)"""
+        cached = self._cached
+        if cached is not None:
+            self._revoked = cached[0]
+        self._cached = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        토큰 캐시 통계 반환
+
+        Returns:
+            Dict[str, float]: 캐시 적중/미스, 갱신/공유 파일 읽기 횟수, 남은 유효 시간(초)
+        """
+        cached = self._cached
+        with self._stats_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "refreshes": self._refreshes,
+                "shared_reads": self._shared_reads,
+                "background_refreshes": self._background_refreshes,
+                "failures": self._failures,
+                "expires_in": round(cached[1] - time.monotonic(), 1) if cached else 0.0
+            }
+
+    def close(self):
+        """백그라운드 갱신 스레드 종료"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=1.0)
+            self._refresher = None
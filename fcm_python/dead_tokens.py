@@ -0,0 +1,322 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from fcm_errors import PERMANENT, SendResult
+
+# 레코드 헤더: 토큰 다이제스트(16바이트), 사유 코드, 기록 시각(초), 토큰 길이
+_RECORD_HEADER = struct.Struct("<16sBIH")
+
+REASON_CODES: Dict[str, int] = {
+    "MANUAL": 0,
+    "UNREGISTERED": 1,
+    "INVALID_ARGUMENT": 2,
+    "NOT_FOUND": 3
+}
+REASON_NAMES: Dict[int, str] = {code: name for name, code in REASON_CODES.items()}
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def is_dead_token_result(result: SendResult) -> bool:
+    """
+    토큰 자체가 더 이상 유효하지 않다는 응답인지 판단
+
+    INVALID_ARGUMENT는 페이로드 오류일 수도 있으므로 토큰 관련 메시지인 경우만 포함합니다.
+    """
+    if result.error_code in ("UNREGISTERED", "NOT_FOUND"):
+        return True
+    if result.error_code == "INVALID_ARGUMENT":
+        return "registration token" in (result.error_message or "").lower()
+    return False
+
+
+def skipped_result() -> SendResult:
+    """사용 불가로 기록되어 FCM 호출 없이 건너뛴 토큰의 결과"""
+    return SendResult(
+        False,
+        error_code="UNREGISTERED",
+        error_class=PERMANENT,
+        error_message="사용 불가로 기록된 토큰",
+        attempts=0
+    )
+
+
+class DeadTokenRegistry:
+    """UNREGISTERED/유효하지 않은 토큰을 기록해 다음 전송에서 건너뛰는 영속 레지스트리
+
+    디스크에는 추가 전용 바이너리 레코드로 저장하고, 메모리에는 16바이트 다이제스트 집합만
+    유지하므로 토큰 조회는 O(1)입니다.
+    여러 프로세스가 같은 파일을 쓸 수 있습니다. 추가와 압축(purge)은 파일 잠금으로 직렬화합니다(POSIX).
+    인덱스에 반영한 파일 위치(바이트)를 기억해 두고 다른 프로세스가 추가한 레코드는 다음 추가/분류 때
+    잠금을 잡고 그 위치 뒤만 읽어 반영합니다. 다른 프로세스가 압축해 파일이 교체되면 새 파일을 다시 열어
+    인덱스를 처음부터 다시 읽습니다.
+    """
+
+    def __init__(self, path: str = "fcm_dead_tokens.bin"):
+        """
+        레지스트리 초기화 (기존 파일이 있으면 로드)
+
+        Args:
+            path: 레지스트리 파일 경로
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._digests = set()
+        # 다이제스트 인덱스에 반영한 파일 위치 (이 뒤는 다른 프로세스가 추가한 레코드)
+        self._indexed = 0
+        self._file = open(path, "ab")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        with self._lock:
+            self._lock_file()
+            try:
+                # 잘린 레코드 정리는 다른 프로세스가 쓰는 중이 아닐 때만
+                self._load()
+            finally:
+                self._unlock_file()
+
+    def _load(self):
+        """
+        인덱스에 반영한 위치 뒤의 레코드를 다이제스트 인덱스에 추가 (파일 잠금 보유 상태에서 호출)
+
+        잠금을 잡고 쓰므로 끝에 잘린 레코드는 중단된 프로세스가 남긴 것이라 제거합니다.
+        """
+        if os.fstat(self._file.fileno()).st_size == self._indexed:
+            return
+        valid_end = self._indexed
+        for offset, digest, _, _, _ in self._iter_records(self._indexed):
+            self._digests.add(digest)
+            valid_end = offset
+        self._indexed = valid_end
+        if valid_end < os.fstat(self._file.fileno()).st_size:
+            self._file.truncate(valid_end)
+
+    def _replaced(self) -> bool:
+        """다른 프로세스의 purge로 파일이 교체되었는지 여부 (열어 둔 파일과 경로의 inode 비교)"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    def _stale(self) -> bool:
+        """다른 프로세스가 레코드를 추가했거나 파일을 교체해 인덱스가 파일보다 뒤처졌는지 여부"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return stat.st_ino != self._inode or stat.st_size != self._indexed
+
+    def _lock_file(self):
+        """
+        추가/압축을 다른 프로세스와 직렬화하도록 현재 파일을 잠금 (_lock 보유 상태에서 호출)
+
+        잠근 뒤에는 다른 프로세스가 추가한 레코드를 인덱스에 반영하고, 파일이 교체되었으면
+        (잠금을 기다리는 동안 포함) 새 파일을 열어 잠그고 다이제스트 인덱스를 처음부터 다시 읽습니다.
+        """
+        reopened = False
+        while True:
+            if self._replaced():
+                self._file.close()
+                self._file = open(self.path, "ab")
+                self._inode = os.fstat(self._file.fileno()).st_ino
+                reopened = True
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            if not self._replaced():
+                break
+            self._unlock_file()
+        if reopened:
+            self._digests = set()
+            self._indexed = 0
+        self._load()
+
+    def _sync(self):
+        """다른 프로세스가 추가하거나 교체한 내용을 인덱스에 반영 (_lock 보유 상태에서 호출)"""
+        if self._stale():
+            self._lock_file()
+            self._unlock_file()
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _iter_records(self, start: int = 0) -> Iterator[Tuple[int, bytes, int, int, str]]:
+        """start 위치부터 (다음 레코드 오프셋, 다이제스트, 사유 코드, 기록 시각, 토큰) 순회"""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            digest, reason, recorded_at, length = _RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _RECORD_HEADER.size + length
+            if end > len(data):
+                break
+            token = data[offset + _RECORD_HEADER.size:end].decode("utf-8")
+            offset = end
+            yield start + offset, digest, reason, recorded_at, token
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __contains__(self, token: str) -> bool:
+        return _digest(token) in self._digests
+
+    def add(self, token: str, reason: str = "MANUAL") -> bool:
+        """
+        토큰을 사용 불가로 기록
+
+        Args:
+            token: 디바이스 토큰
+            reason: 사유 (UNREGISTERED, INVALID_ARGUMENT, NOT_FOUND, MANUAL)
+
+        Returns:
+            bool: 새로 추가되었으면 True
+        """
+        digest = _digest(token)
+        encoded = token.encode("utf-8")
+        record = _RECORD_HEADER.pack(
+            digest, REASON_CODES.get(reason, 0), int(time.time()), len(encoded)
+        ) + encoded
+        with self._lock:
+            # 잠근 뒤 다른 프로세스가 추가한 레코드까지 반영된 인덱스로 중복 확인
+            self._lock_file()
+            try:
+                if digest in self._digests:
+                    return False
+                self._file.write(record)
+                self._file.flush()
+                self._digests.add(digest)
+                self._indexed += len(record)
+            finally:
+                self._unlock_file()
+        return True
+
+    def record(self, token: str, result: SendResult):
+        """
+        전송 결과를 반영 (사용 불가 토큰이면 추가, 성공하면 제거)
+
+        Args:
+            token: 디바이스 토큰
+            result: 전송 결과
+        """
+        if result.success:
+            if self._digests and token in self:
+                self.purge([token])
+        elif is_dead_token_result(result):
+            self.add(token, result.error_code)
+
+    def partition(self, tokens: Sequence[str]) -> Tuple[List[int], List[int]]:
+        """
+        토큰 리스트를 전송 대상과 건너뛸 대상으로 분리
+
+        Args:
+            tokens: 디바이스 토큰 리스트
+
+        Returns:
+            Tuple[List[int], List[int]]: (전송할 인덱스, 건너뛸 인덱스)
+        """
+        # 다른 프로세스가 추가한 토큰도 건너뛰도록 파일 크기가 인덱스 위치와 다르면 뒷부분을 읽음
+        if self._stale():
+            with self._lock:
+                self._sync()
+        if not self._digests:
+            return list(range(len(tokens))), []
+
+        alive, dead = [], []
+        digests = self._digests
+        for i, token in enumerate(tokens):
+            (dead if _digest(token) in digests else alive).append(i)
+        return alive, dead
+
+    def export(self) -> List[Dict]:
+        """
+        기록된 토큰 목록 반환
+
+        Returns:
+            List[Dict]: 토큰, 사유, 기록 시각
+        """
+        with self._lock:
+            self._file.flush()
+            self._sync()
+            return [
+                {"token": token, "reason": REASON_NAMES.get(reason, "MANUAL"), "recordedAt": recorded_at}
+                for _, digest, reason, recorded_at, token in self._iter_records()
+                if digest in self._digests
+            ]
+
+    def purge(self, tokens: Optional[Sequence[str]] = None, older_than: Optional[float] = None) -> int:
+        """
+        토큰을 레지스트리에서 제거하고 파일 압축
+
+        Args:
+            tokens: 제거할 토큰 (없으면 조건에 맞는 전체)
+            older_than: 이 시간(초)보다 오래된 기록만 제거 (선택사항)
+
+        Returns:
+            int: 제거된 토큰 수
+        """
+        targets = {_digest(token) for token in tokens} if tokens is not None else None
+        cutoff = time.time() - older_than if older_than is not None else None
+
+        with self._lock:
+            self._file.flush()
+            # 압축하는 동안 다른 프로세스의 추가가 옛 파일에 쓰여 사라지지 않도록 잠금
+            self._lock_file()
+            try:
+                return self._compact(targets, cutoff)
+            finally:
+                self._unlock_file()
+
+    def _compact(self, targets, cutoff) -> int:
+        """
+        조건에 맞는 레코드를 뺀 새 파일로 교체 (_lock과 파일 잠금 보유 상태에서 호출)
+
+        다른 프로세스가 추가한 레코드도 유지하도록 메모리 인덱스가 아닌 파일 내용을 기준으로 다시 쓰고,
+        인덱스도 새 파일 내용으로 다시 구성합니다.
+        """
+        kept = []
+        kept_digests = set()
+        removed = set()
+        indexed = 0
+        for indexed, digest, reason, recorded_at, token in self._iter_records():
+            if digest in kept_digests or digest in removed:
+                continue
+            matches = (targets is None or digest in targets) and (cutoff is None or recorded_at < cutoff)
+            if matches:
+                removed.add(digest)
+            else:
+                encoded = token.encode("utf-8")
+                kept.append(_RECORD_HEADER.pack(digest, reason, recorded_at, len(encoded)) + encoded)
+                kept_digests.add(digest)
+
+        self._digests = kept_digests
+        if not removed:
+            self._indexed = indexed
+            return 0
+
+        # 임시 파일에 다시 쓴 뒤 교체 (교체 후에 옛 파일을 닫아야 기다리던 프로세스가 교체를 알아챔)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(kept)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file.close()
+        self._file = open(self.path, "ab")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._indexed = sum(len(record) for record in kept)
+        return len(removed)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+로컬 FCM 에뮬레이터
+
+Firebase 자격 증명이나 실제 디바이스 없이 FCMService를 실행할 수 있도록
+`projects/<id>/messages:send`, Instance ID 토픽 구독(`iid/v1:batchAdd`, `batchRemove`)과
+OAuth 2.0 토큰 엔드포인트를 흉내 냅니다.
+지연 시간 분포, 오류 코드별 발생 비율, 429 폭주 구간(Retry-After), 사용 불가 토큰을 설정할 수 있습니다.
+
+사용 예시:
+    python fcm_emulator.py --port 8089 --write-key emulator-key.json \\
+        --latency lognormal:20,0.5 --error UNAVAILABLE=0.01 --burst-every 60 --burst-duration 5
+
+    # 다른 터미널에서
+    FCM_API_URL=http://127.0.0.1:8089 FCM_SERVICE_ACCOUNT_KEY=emulator-key.json python flask_app.py
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+# 오류 코드 -> (HTTP 상태, google.rpc 상태, 메시지)
+ERROR_RESPONSES: Dict[str, Tuple[int, str, str]] = {
+    "UNREGISTERED": (404, "NOT_FOUND", "Requested entity was not found."),
+    "INVALID_ARGUMENT": (400, "INVALID_ARGUMENT", "The registration token is not a valid FCM registration token"),
+    "SENDER_ID_MISMATCH": (403, "PERMISSION_DENIED", "SenderId mismatch"),
+    "QUOTA_EXCEEDED": (429, "RESOURCE_EXHAUSTED", "Quota exceeded for quota metric 'Messages sent'."),
+    "UNAVAILABLE": (503, "UNAVAILABLE", "The service is currently unavailable."),
+    "INTERNAL": (500, "INTERNAL", "Internal error encountered."),
+    "THIRD_PARTY_AUTH_ERROR": (401, "UNAUTHENTICATED", "Auth error from APNS or Web Push Service")
+}
+
+FCM_ERROR_TYPE = "type.googleapis.com/google.firebase.fcm.v1.FcmError"
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    지연 시간 분포 문자열을 초 단위 샘플 함수로 변환 (값은 밀리초)
+
+    constant:MS, uniform:MIN,MAX, normal:MEAN,STDDEV, exponential:MEAN, lognormal:MEDIAN,SIGMA
+
+    Args:
+        spec: 분포 문자열
+        rng: 난수 생성기
+
+    Returns:
+        Callable[[], float]: 호출할 때마다 지연 시간(초)을 반환하는 함수
+    """
+    kind, _, raw = spec.partition(":")
+    try:
+        args = [float(value) for value in raw.split(",")] if raw else []
+    except ValueError:
+        raise ValueError(f"지연 시간 형식이 올바르지 않습니다: {spec}")
+
+    if kind == "constant" and len(args) <= 1:
+        value = (args[0] if args else 0.0) / 1000
+        return lambda: value
+    if kind == "uniform" and len(args) == 2:
+        return lambda: rng.uniform(args[0], args[1]) / 1000
+    if kind == "normal" and len(args) == 2:
+        return lambda: max(0.0, rng.gauss(args[0], args[1])) / 1000
+    if kind == "exponential" and len(args) == 1:
+        return lambda: rng.expovariate(1.0 / args[0]) / 1000 if args[0] > 0 else 0.0
+    if kind == "lognormal" and len(args) == 2:
+        mu = math.log(args[0])
+        return lambda: rng.lognormvariate(mu, args[1]) / 1000
+    raise ValueError(f"지연 시간 형식이 올바르지 않습니다: {spec}")
+
+
+def error_body(status_code: int, status: str, message: str, error_code: Optional[str] = None) -> bytes:
+    """FCM HTTP v1 형식의 오류 응답 본문"""
+    error = {"code": status_code, "message": message, "status": status}
+    if error_code is not None:
+        error["details"] = [{"@type": FCM_ERROR_TYPE, "errorCode": error_code}]
+    return json.dumps({"error": error}).encode("utf-8")
+
+
+def write_service_account_key(
+    path: str,
+    token_uri: str,
+    project_id: str = "emulator-project",
+    key_size: int = 1024
+):
+    """
+    에뮬레이터 토큰 엔드포인트를 가리키는 가짜 서비스 계정 키 파일 생성
+
+    Args:
+        path: 저장할 경로
+        token_uri: 토큰 엔드포인트 URL
+        project_id: 프로젝트 ID
+        key_size: RSA 키 크기 (에뮬레이터는 서명을 검증하지 않으므로 작게 생성)
+    """
+    import rsa
+
+    _, private_key = rsa.newkeys(key_size)
+    key = {
+        "type": "service_account",
+        "project_id": project_id,
+        "private_key_id": uuid.uuid4().hex,
+        "private_key": private_key.save_pkcs1().decode("ascii"),
+        "client_email": f"emulator@{project_id}.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": token_uri
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(key, f, indent=2)
+
+
+class FCMEmulator:
+    """FCM HTTP v1 send/OAuth 토큰 엔드포인트 에뮬레이터
+
+    스레드 기반 HTTP/1.1 keep-alive 서버로, 연결마다 별도 스레드에서 지연 시간을 흉내 냅니다.
+    start()로 백그라운드 실행하거나 serve_forever()로 현재 스레드에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "constant:0",
+        errors: Optional[Dict[str, float]] = None,
+        burst_every: float = 0.0,
+        burst_duration: float = 0.0,
+        retry_after: Optional[float] = None,
+        invalid_token_prefix: str = "invalid",
+        token_lifetime: int = 3600,
+        check_auth: bool = True,
+        seed: Optional[int] = None
+    ):
+        """
+        에뮬레이터 초기화
+
+        Args:
+            host: 바인딩 주소
+            port: 포트 (0이면 빈 포트 자동 선택)
+            latency: 응답 지연 분포 (parse_latency 형식, 밀리초)
+            errors: 오류 코드별 발생 비율 (예: {"UNAVAILABLE": 0.01})
+            burst_every: 429 폭주 구간 주기(초) (0이면 사용 안 함)
+            burst_duration: 주기마다 모든 요청에 429를 반환하는 시간(초)
+            retry_after: 429 응답의 Retry-After(초) (기본값: 폭주 구간의 남은 시간)
+            invalid_token_prefix: 이 접두사로 시작하는 토큰은 UNREGISTERED 응답
+            token_lifetime: 발급하는 액세스 토큰의 유효 시간(초)
+            check_auth: 발급하지 않았거나 만료된 액세스 토큰을 401로 거부할지 여부
+            seed: 난수 시드 (재현 가능한 오류 패턴용)
+        """
+        for code in errors or {}:
+            if code not in ERROR_RESPONSES:
+                raise ValueError(f"지원하지 않는 오류 코드입니다: {code}")
+
+        self.rng = random.Random(seed)
+        self.latency = parse_latency(latency, self.rng)
+        self.errors = dict(errors or {})
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.retry_after = retry_after
+        self.invalid_token_prefix = invalid_token_prefix
+        self.token_lifetime = token_lifetime
+        self.check_auth = check_auth
+
+        self._tokens: Dict[str, float] = {}
+        self._topics: Dict[str, Set[str]] = {}
+        self._message_ids = itertools.count(1)
+        self._stats_lock = threading.Lock()
+        self._responses: Dict[str, int] = {}
+        self._tokens_issued = 0
+        self._started = time.monotonic()
+
+        emulator = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.emulator = emulator
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """FCMService api_url로 사용할 주소"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_uri(self) -> str:
+        """서비스 계정 키의 token_uri로 사용할 주소"""
+        return f"{self.url}/token"
+
+    def start(self) -> "FCMEmulator":
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fcm-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        """서버 종료"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def __enter__(self) -> "FCMEmulator":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, code: str):
+        with self._stats_lock:
+            self._responses[code] = self._responses.get(code, 0) + 1
+
+    def stats(self) -> Dict:
+        """
+        응답 통계 반환
+
+        Returns:
+            Dict: 전체 요청 수, 결과 코드별 응답 수, 발급한 토큰 수
+        """
+        with self._stats_lock:
+            return {
+                "requests": sum(self._responses.values()),
+                "responses": dict(self._responses),
+                "tokensIssued": self._tokens_issued
+            }
+
+    def _burst_remaining(self) -> float:
+        """429 폭주 구간이면 남은 시간(초), 아니면 0"""
+        if self.burst_every <= 0 or self.burst_duration <= 0:
+            return 0.0
+        phase = (time.monotonic() - self._started) % self.burst_every
+        quiet = self.burst_every - self.burst_duration
+        return self.burst_every - phase if phase >= quiet else 0.0
+
+    def issue_token(self, form: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """OAuth 2.0 토큰 엔드포인트 (JWT bearer 그랜트, 서명은 검증하지 않음)"""
+        if form.get("grant_type") != "urn:ietf:params:oauth:grant-type:jwt-bearer" or not form.get("assertion"):
+            return 400, {}, json.dumps({"error": "invalid_grant"}).encode("utf-8")
+
+        token = f"emulator-{uuid.uuid4().hex}"
+        with self._stats_lock:
+            self._tokens[token] = time.time() + self.token_lifetime
+            self._tokens_issued += 1
+        return 200, {}, json.dumps({
+            "access_token": token,
+            "expires_in": self.token_lifetime,
+            "token_type": "Bearer"
+        }).encode("utf-8")
+
+    def _admit(self, authorization: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """설정된 지연 후 인증과 429 폭주 구간 확인 (거부할 때만 응답 반환)"""
+        delay = self.latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.check_auth:
+            token = authorization[7:] if authorization.startswith("Bearer ") else ""
+            expires_at = self._tokens.get(token)
+            if expires_at is None or expires_at < time.time():
+                self._count("UNAUTHENTICATED")
+                return 401, {}, error_body(401, "UNAUTHENTICATED", "Request had invalid authentication credentials.")
+
+        remaining = self._burst_remaining()
+        if remaining > 0:
+            retry_after = self.retry_after if self.retry_after is not None else math.ceil(remaining)
+            return self._error("QUOTA_EXCEEDED", {"Retry-After": str(int(retry_after))})
+        return None
+
+    def _inject_error(self) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """설정된 비율에 따라 주입할 오류 응답 (없으면 None)"""
+        if self.errors:
+            draw = self.rng.random()
+            for code, rate in self.errors.items():
+                if draw < rate:
+                    return self._error(code)
+                draw -= rate
+        return None
+
+    def send(self, project_id: str, authorization: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """messages:send 처리 (설정된 지연 후 성공 또는 주입된 오류 응답)"""
+        rejected = self._admit(authorization)
+        if rejected:
+            return rejected
+
+        try:
+            message = json.loads(body)["message"]
+        except (ValueError, KeyError, TypeError):
+            self._count("INVALID_ARGUMENT")
+            return 400, {}, error_body(400, "INVALID_ARGUMENT", "Invalid JSON payload received.")
+
+        targets = [key for key in ("token", "topic", "condition") if key in message]
+        if len(targets) != 1:
+            self._count("INVALID_ARGUMENT")
+            return 400, {}, error_body(
+                400, "INVALID_ARGUMENT", "Exactly one of token, topic or condition must be set.", "INVALID_ARGUMENT"
+            )
+
+        token = message.get("token")
+        if token is not None:
+            if not isinstance(token, str) or not token or any(c.isspace() for c in token):
+                return self._error("INVALID_ARGUMENT")
+            if self.invalid_token_prefix and token.startswith(self.invalid_token_prefix):
+                return self._error("UNREGISTERED")
+
+        injected = self._inject_error()
+        if injected:
+            return injected
+
+        self._count("OK")
+        name = f"projects/{project_id}/messages/{next(self._message_ids)}"
+        return 200, {}, json.dumps({"name": name}).encode("utf-8")
+
+    def manage_topic(self, operation: str, authorization: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """iid/v1:batchAdd, batchRemove 처리 (토큰별 결과, 사용 불가 토큰은 NOT_FOUND)"""
+        rejected = self._admit(authorization)
+        if rejected:
+            return rejected
+
+        try:
+            request = json.loads(body)
+            topic = request["to"]
+            tokens = request["registration_tokens"]
+        except (ValueError, KeyError, TypeError):
+            self._count("INVALID_ARGUMENT")
+            return 400, {}, json.dumps({"error": "InvalidParameters"}).encode("utf-8")
+        if not isinstance(topic, str) or not topic.startswith("/topics/") or not isinstance(tokens, list) \
+                or not 0 < len(tokens) <= 1000:
+            self._count("INVALID_ARGUMENT")
+            return 400, {}, json.dumps({"error": "InvalidParameters"}).encode("utf-8")
+
+        injected = self._inject_error()
+        if injected:
+            return injected
+
+        results: List[Dict[str, str]] = []
+        with self._stats_lock:
+            members = self._topics.setdefault(topic[len("/topics/"):], set())
+            for token in tokens:
+                if not isinstance(token, str) or not token:
+                    results.append({"error": "INVALID_ARGUMENT"})
+                elif self.invalid_token_prefix and token.startswith(self.invalid_token_prefix):
+                    results.append({"error": "NOT_FOUND"})
+                else:
+                    if operation == "batchAdd":
+                        members.add(token)
+                    else:
+                        members.discard(token)
+                    results.append({})
+        self._count("OK")
+        return 200, {}, json.dumps({"results": results}).encode("utf-8")
+
+    def topic_members(self, topic: str) -> Set[str]:
+        """토픽을 구독 중인 토큰 (구독 관리 결과 확인용)"""
+        with self._stats_lock:
+            return set(self._topics.get(topic, ()))
+
+    def _error(self, code: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        status_code, status, message = ERROR_RESPONSES[code]
+        self._count(code)
+        return status_code, headers or {}, error_body(status_code, status, message, code)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 나눠 쓰므로 Nagle 알고리즘을 끄지 않으면 지연 ACK와 겹쳐 응답마다 ~40ms 지연
+    disable_nagle_algorithm = True
+    emulator: FCMEmulator = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status_code: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        # 커넥션 사전 연결(warmup)용
+        self._reply(200, {}, b"")
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, {}, json.dumps(self.emulator.stats()).encode("utf-8"))
+        else:
+            self._reply(404, {}, error_body(404, "NOT_FOUND", "Not found"))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path == "/token":
+            form = {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
+            self._reply(*self.emulator.issue_token(form))
+            return
+
+        parts = self.path.split("/")
+        # /v1/projects/<id>/messages:send
+        if len(parts) == 5 and parts[1] == "v1" and parts[2] == "projects" and parts[4] == "messages:send":
+            self._reply(*self.emulator.send(parts[3], self.headers.get("Authorization", ""), body))
+        elif self.path in ("/iid/v1:batchAdd", "/iid/v1:batchRemove"):
+            operation = self.path.rsplit(":", 1)[1]
+            self._reply(*self.emulator.manage_topic(operation, self.headers.get("Authorization", ""), body))
+        else:
+            self._reply(404, {}, error_body(404, "NOT_FOUND", "Not found"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 FCM 에뮬레이터 (지연 시간/오류 주입)")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩 주소")
+    parser.add_argument("--port", type=int, default=8089, help="포트")
+    parser.add_argument("--latency", default="constant:0",
+                        help="응답 지연 분포 (밀리초): constant:MS, uniform:MIN,MAX, normal:MEAN,STD, "
+                             "exponential:MEAN, lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error", action="append", default=[], metavar="CODE=RATE",
+                        help=f"오류 코드별 발생 비율 (반복 가능): {', '.join(ERROR_RESPONSES)}")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="429 폭주 구간 주기(초)")
+    parser.add_argument("--burst-duration", type=float, default=0.0, help="폭주 구간 길이(초)")
+    parser.add_argument("--retry-after", type=float, help="429 응답의 Retry-After(초) (기본값: 폭주 구간 남은 시간)")
+    parser.add_argument("--invalid-token-prefix", default="invalid", help="UNREGISTERED로 응답할 토큰 접두사")
+    parser.add_argument("--token-lifetime", type=int, default=3600, help="액세스 토큰 유효 시간(초)")
+    parser.add_argument("--no-auth-check", action="store_true", help="액세스 토큰 검증 안 함")
+    parser.add_argument("--seed", type=int, help="난수 시드")
+    parser.add_argument("--write-key", metavar="PATH", help="에뮬레이터를 가리키는 가짜 서비스 계정 키 파일 생성")
+    args = parser.parse_args()
+
+    errors = {}
+    for item in args.error:
+        code, _, rate = item.partition("=")
+        errors[code] = float(rate)
+
+    emulator = FCMEmulator(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        errors=errors,
+        burst_every=args.burst_every,
+        burst_duration=args.burst_duration,
+        retry_after=args.retry_after,
+        invalid_token_prefix=args.invalid_token_prefix,
+        token_lifetime=args.token_lifetime,
+        check_auth=not args.no_auth_check,
+        seed=args.seed
+    )
+    if args.write_key:
+        write_service_account_key(args.write_key, emulator.token_uri)
+        print(f"🔑 서비스 계정 키 생성: {args.write_key}")
+
+    print(f"🚀 FCM 에뮬레이터 실행 중: {emulator.url} (토큰 엔드포인트: {emulator.token_uri})")
+    try:
+        emulator.serve_forever()
+    except KeyboardInterrupt:
+        print("\n에뮬레이터 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# 오류 분류
+SUCCESS = "success"
+RETRYABLE = "retryable"
+PERMANENT = "permanent"
+AUTH = "auth"
+QUOTA = "quota"
+
+# FCM을 호출하지 않고 실패 처리한 요청의 오류 코드 (회로 차단기)
+CIRCUIT_OPEN = "CIRCUIT_OPEN"
+
+# FCM errorCode / google.rpc 상태별 분류
+# https://firebase.google.com/docs/reference/fcm/rest/v1/ErrorCode
+ERROR_CLASSES: Dict[str, str] = {
+    "UNREGISTERED": PERMANENT,
+    "INVALID_ARGUMENT": PERMANENT,
+    "SENDER_ID_MISMATCH": PERMANENT,
+    "NOT_FOUND": PERMANENT,
+    "FAILED_PRECONDITION": PERMANENT,
+    "QUOTA_EXCEEDED": QUOTA,
+    "RESOURCE_EXHAUSTED": QUOTA,
+    "UNAVAILABLE": RETRYABLE,
+    "INTERNAL": RETRYABLE,
+    "DEADLINE_EXCEEDED": RETRYABLE,
+    "NETWORK": RETRYABLE,
+    "THIRD_PARTY_AUTH_ERROR": AUTH,
+    "UNAUTHENTICATED": AUTH,
+    "PERMISSION_DENIED": AUTH
+}
+
+# 응답 본문에 오류 코드가 없을 때 HTTP 상태 코드로 분류
+STATUS_CLASSES: Dict[int, str] = {
+    400: PERMANENT,
+    401: AUTH,
+    403: AUTH,
+    404: PERMANENT,
+    429: QUOTA,
+    500: RETRYABLE,
+    502: RETRYABLE,
+    503: RETRYABLE,
+    504: RETRYABLE
+}
+
+
+class SendResult:
+    """단일 FCM 전송 결과
+
+    bool로 평가하면 전송 성공 여부가 됩니다.
+    """
+
+    __slots__ = (
+        "success", "status_code", "message_id", "error_code",
+        "error_class", "error_message", "retry_after", "attempts"
+    )
+
+    def __init__(
+        self,
+        success: bool,
+        status_code: int = 0,
+        message_id: Optional[str] = None,
+        error_code: Optional[str] = None,
+        error_class: str = SUCCESS,
+        error_message: Optional[str] = None,
+        retry_after: Optional[float] = None,
+        attempts: int = 1
+    ):
+        self.success = success
+        self.status_code = status_code
+        self.message_id = message_id
+        self.error_code = error_code
+        self.error_class = error_class
+        self.error_message = error_message
+        self.retry_after = retry_after
+        self.attempts = attempts
+
+    def __bool__(self) -> bool:
+        return self.success
+
+    @property
+    def retryable(self) -> bool:
+        """재시도할 가치가 있는 오류인지 여부"""
+        return self.error_class in (RETRYABLE, QUOTA, AUTH)
+
+    def to_dict(self) -> Dict:
+        return {
+            "success": self.success,
+            "statusCode": self.status_code,
+            "messageId": self.message_id,
+            "errorCode": self.error_code,
+            "errorClass": self.error_class,
+            "errorMessage": self.error_message,
+            "attempts": self.attempts
+        }
+
+    def __repr__(self) -> str:
+        if self.success:
+            return f"SendResult(success=True, message_id={self.message_id!r})"
+        return (
+            f"SendResult(success=False, status_code={self.status_code}, "
+            f"error_code={self.error_code!r}, error_class={self.error_class!r})"
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After 헤더를 대기 시간(초)으로 변환
+
+    Args:
+        value: 초 단위 숫자 또는 HTTP-date 문자열
+
+    Returns:
+        Optional[float]: 대기 시간(초), 해석할 수 없으면 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_response(status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None) -> SendResult:
+    """
+    FCM HTTP 응답을 SendResult로 변환
+
+    Args:
+        status_code: HTTP 상태 코드
+        content: 응답 본문
+        headers: 응답 헤더
+
+    Returns:
+        SendResult: 분류된 전송 결과
+    """
+    try:
+        payload = json.loads(content) if content else {}
+    except ValueError:
+        payload = {}
+
+    if status_code == 200:
+        return SendResult(True, status_code, message_id=payload.get("name"))
+
+    error = payload.get("error", {}) if isinstance(payload, dict) else {}
+    if isinstance(error, str):
+        # Instance ID API는 {"error": "InvalidToken"}처럼 문자열로 응답
+        error = {"status": error}
+    error_code = error.get("status")
+    # FcmError 상세 정보가 있으면 더 구체적인 errorCode 사용
+    for detail in error.get("details", []):
+        if detail.get("@type", "").endswith("FcmError") and detail.get("errorCode"):
+            error_code = detail["errorCode"]
+            break
+
+    error_class = ERROR_CLASSES.get(error_code) or STATUS_CLASSES.get(status_code)
+    if error_class is None:
+        error_class = RETRYABLE if status_code >= 500 else PERMANENT
+
+    retry_after = None
+    if headers:
+        retry_after = parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+
+    return SendResult(
+        False,
+        status_code,
+        error_code=error_code or f"HTTP_{status_code}",
+        error_class=error_class,
+        error_message=error.get("message") or (content[:200].decode("utf-8", errors="replace") if content else None),
+        retry_after=retry_after
+    )
+
+
+def classify_exception(exc: Exception) -> SendResult:
+    """
+    전송 중 발생한 예외(연결 실패, 타임아웃 등)를 SendResult로 변환
+
+    Args:
+        exc: 발생한 예외
+
+    Returns:
+        SendResult: 재시도 가능한 네트워크 오류 결과
+    """
+    return SendResult(
+        False,
+        0,
+        error_code="NETWORK",
+        error_class=RETRYABLE,
+        error_message=f"{type(exc).__name__}: {str(exc)}"
+    )
@@ -1,42 +1,949 @@
-import json
-import requests
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
-from typing import Dict, List, Optional
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 import time
+from urllib.parse import urlsplit
+
+from audience import AudiencePlanner
+from bulk_result import BulkResult
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from credentials import CredentialManager
+from dead_tokens import DeadTokenRegistry, skipped_result
+from fcm_errors import AUTH, CIRCUIT_OPEN, SendResult, classify_exception, classify_response
+from job_queue import JobQueue, resolve_run_at
+from message_template import MessageTemplate, dumps
+from metrics import (
+    HTTP_SECONDS, INFLIGHT, LANE_SEND_SECONDS, SENDS_TOTAL, SERIALIZE_SECONDS, TOKEN_SECONDS, TOPIC_MANAGEMENT_SECONDS
+)
+from priority_lanes import BULK, NORMAL, LaneScheduler, lane_rank
+from rate_limiter import RateLimiter
+from retry import RetryPolicy
+from rollout import Rollout
+from topic_management import (
+    BATCH_ADD, BATCH_REMOVE, IID_API_URL, IID_BATCH_URL, MAX_BATCH_TOKENS, TopicManagementResult,
+    build_batch_body, parse_batch_results
+)
+from transport import RequestsTransport, Transport, TransportResponse
+from validation import (
+    ValidationError, invalid_result, is_valid_token, validate_condition, validate_fields, validate_message,
+    validate_token, validate_topic
+)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+FCM_API_URL = "https://fcm.googleapis.com"
+FCM_SEND_URL = "{api_url}/v1/projects/{project_id}/messages:send"
+
+# 재시도 예정 시각이 이 간격(초) 안에 있는 메시지는 한 번에 묶어서 재전송
+RETRY_BATCH_WINDOW = 0.25
+# 다중 전송 작업이 진행 상황을 저장하는 최소 토큰 수 (작업당 최대 약 20회 저장)
+JOB_CHECKPOINT_TOKENS = 1000
+
+
+def notification_fields(
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None,
+    android: bool = True
+) -> Dict:
+    """대상 필드를 제외한 FCM 메시지 내용 구성"""
+    fields = {
+        "notification": {
+            "title": title,
+            "body": body
+        },
+        "data": data or {}
+    }
+    if android:
+        fields["android"] = {
+            "notification": {
+                "channel_id": "notification_channel",
+                "priority": "high"
+            }
+        }
+    return fields
+
+
+def build_token_message(
+    device_token: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None
+) -> Dict:
+    """단일 디바이스용 FCM 메시지 구성"""
+    return {"message": {"token": device_token, **notification_fields(title, body, data)}}
+
+
+def build_topic_message(
+    topic: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None
+) -> Dict:
+    """토픽용 FCM 메시지 구성"""
+    return {"message": {"topic": topic, **notification_fields(title, body, data, android=False)}}
+
+
+def build_condition_message(
+    condition: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None
+) -> Dict:
+    """토픽 조건식용 FCM 메시지 구성"""
+    return {"message": {"condition": condition, **notification_fields(title, body, data, android=False)}}
+
 
 class FCMService:
     """Firebase Cloud Messaging HTTP v1 API를 사용한 푸시 알림 서비스"""
     
-    def __init__(self, project_id: str, service_account_key_path: str):
+    def __init__(
+        self,
+        project_id: str,
+        service_account_key_path: str,
+        credentials: Optional[CredentialManager] = None,
+        transport: Optional[Transport] = None,
+        warmup_connections: int = 0,
+        max_workers: int = 16,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        dead_tokens: Optional[DeadTokenRegistry] = None,
+        processes: int = 1,
+        shard_threshold: int = 10000,
+        job_queue: Optional[JobQueue] = None,
+        api_url: str = FCM_API_URL,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        lanes: Optional[LaneScheduler] = None,
+        iid_url: str = IID_API_URL,
+        rollout_ttl: float = 3600.0
+    ):
         """
         FCM 서비스 초기화
         
         Args:
             project_id: Firebase 프로젝트 ID
             service_account_key_path: 서비스 계정 키 파일 경로
+            credentials: 공유할 자격 증명 관리자 (선택사항, 없으면 새로 생성)
+            transport: HTTP 전송 계층 (선택사항, 기본값: keep-alive 커넥션 풀)
+            warmup_connections: 초기화 시 미리 열어둘 연결 수 (0이면 사전 연결 안 함)
+            max_workers: 다중 전송 시 기본 동시 전송 수 (1이면 순차 전송)
+            retry_policy: 재시도 정책 (선택사항, 기본값: 최대 5회 지수 백오프)
+            rate_limiter: 모든 전송 경로에 적용할 속도 제한기 (선택사항)
+            dead_tokens: 사용 불가 토큰 레지스트리 (선택사항, 다중 전송 시 기록된 토큰은 건너뜀)
+            processes: 대량 전송에 사용할 워커 프로세스 수 (1이면 현재 프로세스에서만 전송)
+            shard_threshold: 다중 전송을 워커 프로세스로 나눌 최소 토큰 수
+            job_queue: 예약 전송을 저장할 영속 큐 (선택사항, JobWorkerPool이 job_handlers()로 전송)
+            api_url: FCM API 주소 (기본값: fcm.googleapis.com, 로컬 에뮬레이터 주소 등)
+            circuit_breaker: FCM 장애 시 즉시 실패 처리할 회로 차단기 (선택사항, 현재 프로세스 전송에만 적용)
+            lanes: 우선순위 레인별로 전송 슬롯을 나누는 스케줄러 (선택사항, 현재 프로세스 전송에만 적용)
+            iid_url: 토픽 구독 관리(Instance ID) API 주소 (기본값: iid.googleapis.com)
+            rollout_ttl: 끝난 롤아웃의 진행률을 보관할 시간(초), 지나면 rollouts에서 제거
         """
         self.project_id = project_id
         self.service_account_key_path = service_account_key_path
-        self.base_url = f"https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+        self.api_url = api_url.rstrip("/")
+        self.base_url = FCM_SEND_URL.format(api_url=self.api_url, project_id=project_id)
+        self.credentials = credentials or CredentialManager(service_account_key_path)
+        self.transport = transport or RequestsTransport()
+        self.max_workers = max_workers
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.dead_tokens = dead_tokens
+        self.templates: Dict[str, MessageTemplate] = {}
+        self.rollouts: Dict[str, Rollout] = {}
+        # 요청 스레드(시작/조회/정리)와 지표 수집이 rollouts를 동시에 읽고 씀
+        self._rollouts_lock = threading.Lock()
+        self.rollout_ttl = rollout_ttl
+        self.processes = processes
+        self.shard_threshold = shard_threshold
+        self.job_queue = job_queue
+        self.circuit_breaker = circuit_breaker
+        self.lanes = lanes
+        self.iid_url = iid_url.rstrip("/")
+        self._sharded = None
+        self._sharded_lock = threading.Lock()
+        self._token_cache_dir: Optional[str] = None
+        
+        if warmup_connections > 0:
+            try:
+                self.transport.warmup(self.base_url, warmup_connections)
+            except Exception as e:
+                # 생성 시 사전 연결은 최선 노력 (첫 전송 때 다시 연결)
+                print(f"연결 사전 생성 실패: {str(e)}")
         
     def _get_access_token(self) -> str:
-        """Google Service Account를 사용하여 OAuth 2.0 액세스 토큰 획득"""
-        credentials = service_account.Credentials.from_service_account_file(
-            self.service_account_key_path,
-            scopes=['https://www.googleapis.com/auth/firebase.messaging']
+        """캐시된 OAuth 2.0 액세스 토큰 획득 (만료 전에는 토큰 엔드포인트를 호출하지 않음)"""
+        return self.credentials.get_token()
+
+    def warmup(self, connections: int = 1) -> Dict[str, float]:
+        """
+        첫 요청이 기다리지 않도록 키 파일 로드, 액세스 토큰 발급, FCM 연결을 미리 수행
+        
+        여러 번 호출해도 되며 이미 발급된 토큰은 재사용합니다.
+        
+        Args:
+            connections: FCM 호스트에 미리 열어둘 연결 수
+        
+        Returns:
+            Dict[str, float]: 단계별 소요 시간(초) (tokenSeconds, connectSeconds, connections)
+        
+        Raises:
+            ConnectionError 등: 토큰 발급에 실패했거나 FCM 호스트에 연결을 하나도 열지 못한 경우
+        """
+        started = time.perf_counter()
+        self._get_access_token()
+        token_done = time.perf_counter()
+        opened = self.transport.warmup(self.base_url, connections)
+        if opened == 0:
+            raise ConnectionError(f"FCM 호스트에 연결을 열지 못했습니다: {self.base_url}")
+        if urlsplit(self.iid_url).netloc != urlsplit(self.api_url).netloc:
+            self.transport.warmup(self.iid_url, 1)
+        return {
+            "tokenSeconds": round(token_done - started, 3),
+            "connectSeconds": round(time.perf_counter() - token_done, 3),
+            "connections": opened
+        }
+
+    def get_token_stats(self) -> Dict[str, float]:
+        """액세스 토큰 캐시 적중/갱신 통계 반환"""
+        return self.credentials.stats()
+
+    def get_rate_limit_stats(self) -> Optional[Dict[str, float]]:
+        """현재 전송 속도 한도 및 스로틀 통계 반환 (속도 제한기가 없으면 None)"""
+        return self.rate_limiter.stats() if self.rate_limiter else None
+
+    def _sharded_sender(self):
+        """워커 프로세스 코디네이터 반환 (처음 호출 시 생성)"""
+        # sharded_sender가 워커에서 FCMService를 만들기 위해 이 모듈을 import하므로 지연 import
+        from sharded_sender import ShardedSender, build_worker_service, private_token_cache_path
+        
+        with self._sharded_lock:
+            if self._sharded is None:
+                token_cache_path = self.credentials.cache_path
+                if token_cache_path is None:
+                    self._token_cache_dir, token_cache_path = private_token_cache_path()
+                rate_limit = self.rate_limiter.shard_config(self.processes) if self.rate_limiter else None
+                self._sharded = ShardedSender(
+                    functools.partial(
+                        build_worker_service,
+                        self.project_id,
+                        self.service_account_key_path,
+                        token_cache_path,
+                        self.max_workers,
+                        self.retry_policy,
+                        rate_limit,
+                        self.api_url,
+                        self.credentials.token_uri
+                    ),
+                    processes=self.processes,
+                    dead_tokens=self.dead_tokens
+                )
+            return self._sharded
+
+    def close(self):
+        """백그라운드 리소스, 진행 중인 롤아웃, 워커 프로세스 및 커넥션 풀 정리"""
+        for rollout in self.list_rollouts():
+            rollout.cancel()
+            rollout.wait(timeout=5.0)
+        if self._sharded is not None:
+            from sharded_sender import remove_token_cache
+            
+            self._sharded.close()
+            self._sharded = None
+            if self._token_cache_dir is not None:
+                remove_token_cache(self._token_cache_dir)
+                self._token_cache_dir = None
+        self.credentials.close()
+        self.transport.close()
+        if self.rate_limiter:
+            self.rate_limiter.close()
+        if self.dead_tokens is not None:
+            self.dead_tokens.close()
+
+    def _fan_out(
+        self,
+        items: Sequence[T],
+        func: Callable[[T], R],
+        max_workers: int,
+        deadline: Optional[float] = None
+    ) -> List[Optional[R]]:
+        """
+        항목들을 제한된 동시성으로 처리하고 입력 순서대로 결과 반환
+        
+        Args:
+            items: 처리할 항목 리스트
+            func: 항목별 처리 함수
+            max_workers: 최대 동시 처리 수
+            deadline: 전체 제한 시간(초), 초과 후 시작되지 않은 항목은 None
+            
+        Returns:
+            List[Optional[R]]: 항목별 결과 (시도하지 않은 항목은 None)
+        """
+        results: List[Optional[R]] = [None] * len(items)
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        
+        if max_workers <= 1 or len(items) <= 1:
+            for i, item in enumerate(items):
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    break
+                results[i] = func(item)
+            return results
+        
+        # 워커들이 공유 인덱스에서 다음 항목을 가져감 (next()는 GIL 하에서 원자적)
+        next_index = itertools.count()
+        
+        def worker():
+            while True:
+                i = next(next_index)
+                if i >= len(items):
+                    return
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    return
+                results[i] = func(items[i])
+        
+        workers = min(max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fcm-send") as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+        
+        return results
+
+    def _post_message(self, body: bytes, access_token: str) -> TransportResponse:
+        """인증 헤더를 붙여 FCM API로 인코딩된 메시지 전송 (커넥션 풀 재사용)"""
+        # HTTP 요청 헤더
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+        
+        # FCM API 호출
+        return self.transport.post(self.base_url, body, headers)
+
+    def _send_once(
+        self,
+        body: bytes,
+        device_token: Optional[str] = None,
+        priority: str = NORMAL
+    ) -> SendResult:
+        """
+        인코딩된 메시지를 한 번 전송하고 응답을 분류 (예외를 던지지 않음)
+        
+        Args:
+            body: 인코딩된 {"message": {...}} 본문
+            device_token: 대상 디바이스 토큰 (사용 불가 토큰 기록용, 선택사항)
+            priority: 우선순위 레인 (레인 스케줄러가 있을 때 전송 슬롯 배분에 사용)
+            
+        Returns:
+            SendResult: 분류된 전송 결과
+        """
+        started = time.perf_counter()
+        try:
+            access_token = self._get_access_token()
+        except Exception as e:
+            SENDS_TOTAL.inc(("TOKEN_ERROR",))
+            return SendResult(False, error_code="TOKEN_ERROR", error_class=AUTH, error_message=str(e))
+        TOKEN_SECONDS.observe(time.perf_counter() - started)
+        
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+            SENDS_TOTAL.inc((CIRCUIT_OPEN,))
+            return self.circuit_breaker.rejected_result()
+        
+        if self.lanes is None:
+            result = self._post_and_classify(body, access_token)
+        else:
+            # 슬롯을 받은 요청만 속도 제한기와 커넥션 풀을 사용
+            started = time.perf_counter()
+            with self.lanes.slot(priority):
+                result = self._post_and_classify(body, access_token)
+            LANE_SEND_SECONDS.observe(time.perf_counter() - started, (priority,))
+        
+        if result.error_class == AUTH:
+            # 토큰이 폐기되었을 수 있으므로 다음 시도에서 새로 발급
+            self.credentials.invalidate()
+        if self.rate_limiter:
+            self.rate_limiter.on_result(result)
+        if self.dead_tokens is not None and device_token:
+            self.dead_tokens.record(device_token, result)
+        return result
+
+    def _post_and_classify(self, body: bytes, access_token: str) -> SendResult:
+        """속도 제한을 적용해 FCM API를 호출하고 응답 분류 (HTTP 지표와 회로 차단기에 기록)"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
+        INFLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = self._post_message(body, access_token)
+        except Exception as e:
+            result = classify_exception(e)
+            code = result.error_code
+        else:
+            result = classify_response(response.status_code, response.content, response.headers)
+            code = "OK" if result.success else (result.error_code or str(result.status_code))
+        finally:
+            INFLIGHT.dec()
+        
+        elapsed = time.perf_counter() - started
+        HTTP_SECONDS.observe(elapsed, (code,))
+        SENDS_TOTAL.inc((code,))
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(result, elapsed)
+        return result
+
+    def _serialize(self, render: Callable[..., bytes], *args) -> bytes:
+        """요청 본문 생성 (직렬화 시간 기록)"""
+        started = time.perf_counter()
+        body = render(*args)
+        SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+        return body
+
+    def _send_with_retry(
+        self,
+        body: bytes,
+        device_token: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        priority: str = NORMAL
+    ) -> SendResult:
+        """재시도 가능한 오류는 백오프 후 재시도하며 전송"""
+        policy = retry_policy or self.retry_policy
+        attempt = 0
+        while True:
+            result = self._send_once(body, device_token, priority)
+            attempt += 1
+            result.attempts = attempt
+            if not policy.should_retry(result, attempt):
+                return result
+            time.sleep(policy.backoff(attempt, result.retry_after))
+
+    def send_message(
+        self,
+        message: Dict,
+        retry_policy: Optional[RetryPolicy] = None,
+        priority: str = NORMAL
+    ) -> SendResult:
+        """
+        FCM 메시지 전송 (재시도 가능한 오류는 백오프 후 재시도)
+        
+        Args:
+            message: {"message": {...}} 형태의 FCM 메시지
+            retry_policy: 재시도 정책 (선택사항, 기본값: 서비스 설정)
+            priority: 우선순위 레인 (high, normal, bulk)
+            
+        Returns:
+            SendResult: 분류된 전송 결과
+        """
+        try:
+            validate_message(message)
+        except ValidationError as e:
+            return invalid_result(e)
+        return self._send_with_retry(
+            self._serialize(dumps, message), message["message"].get("token"), retry_policy, priority
+        )
+
+    def compile_template(
+        self,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        android: bool = True
+    ) -> MessageTemplate:
+        """
+        알림 내용을 한 번만 직렬화한 메시지 템플릿 생성
+        
+        Args:
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+            android: Android 알림 채널 설정 포함 여부
+            
+        Returns:
+            MessageTemplate: 대상만 바꿔 전송할 수 있는 템플릿
+            
+        Raises:
+            ValidationError: 제목/내용/data 형식이 잘못되었거나 페이로드가 4KB를 넘는 경우
+        """
+        fields = notification_fields(title, body, data, android)
+        # 템플릿마다 한 번만 검증하면 토큰별 전송에서는 대상 값만 확인하면 됨
+        validate_fields(fields)
+        return MessageTemplate(fields, title, body, data)
+
+    def register_template(
+        self,
+        name: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None
+    ) -> MessageTemplate:
+        """
+        이름으로 재사용할 템플릿 등록
+        
+        Args:
+            name: 템플릿 이름
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+            
+        Returns:
+            MessageTemplate: 등록된 템플릿
+        """
+        template = self.compile_template(title, body, data)
+        self.templates[name] = template
+        return template
+
+    def _send_bulk(
+        self,
+        items: Sequence[T],
+        send_once: Callable[[T], SendResult],
+        max_workers: int,
+        deadline: Optional[float] = None
+    ) -> List[Optional[SendResult]]:
+        """
+        여러 항목을 동시 전송하고, 재시도 대상은 재시도 시각별로 모아 일괄 재전송
+        
+        워커 스레드는 개별 메시지의 백오프를 기다리지 않으며, 재시도 시각이 된 메시지들을
+        한 번의 팬아웃으로 다시 보냅니다.
+        
+        Args:
+            items: 전송할 항목 리스트
+            send_once: 항목을 한 번 전송하는 함수
+            max_workers: 최대 동시 전송 수
+            deadline: 전체 제한 시간(초) (선택사항)
+            
+        Returns:
+            List[Optional[SendResult]]: 항목별 최종 결과 (시도하지 않은 항목은 None)
+        """
+        policy = self.retry_policy
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        
+        results = self._fan_out(items, send_once, max_workers, deadline)
+        attempts = [0 if result is None else 1 for result in results]
+        
+        # 항목 인덱스 -> 재시도 예정 시각
+        due: Dict[int, float] = {}
+        now = time.monotonic()
+        for i, result in enumerate(results):
+            if result is not None and policy.should_retry(result, 1):
+                due[i] = now + policy.backoff(1, result.retry_after)
+        
+        while due:
+            next_due = min(due.values())
+            if deadline_at is not None and next_due >= deadline_at:
+                break
+            wait = next_due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            
+            cutoff = time.monotonic() + RETRY_BATCH_WINDOW
+            batch = [i for i, at in due.items() if at <= cutoff]
+            for i in batch:
+                del due[i]
+            
+            remaining = deadline_at - time.monotonic() if deadline_at is not None else None
+            retried = self._fan_out([items[i] for i in batch], send_once, max_workers, remaining)
+            
+            now = time.monotonic()
+            for i, result in zip(batch, retried):
+                if result is None:
+                    # 제한 시간 초과로 재시도하지 못한 항목은 마지막 결과 유지
+                    continue
+                attempts[i] += 1
+                result.attempts = attempts[i]
+                results[i] = result
+                if policy.should_retry(result, attempts[i]):
+                    due[i] = now + policy.backoff(attempts[i], result.retry_after)
+        
+        for i, result in enumerate(results):
+            if result is not None:
+                result.attempts = attempts[i]
+        return results
+
+    def _send_to_tokens(
+        self,
+        device_tokens: Sequence[str],
+        render: Callable[[int], bytes],
+        max_workers: int,
+        deadline: Optional[float] = None,
+        priority: str = BULK
+    ) -> List[Optional[SendResult]]:
+        """
+        토큰별 본문을 만들어 동시 전송 (형식이 잘못되었거나 사용 불가로 기록된 토큰은 FCM 호출 없이 실패 처리)
+        
+        Args:
+            device_tokens: 대상 디바이스 토큰 리스트
+            render: 토큰 인덱스를 받아 인코딩된 요청 본문을 반환하는 함수
+            max_workers: 최대 동시 전송 수
+            deadline: 전체 제한 시간(초) (선택사항)
+            priority: 우선순위 레인
+            
+        Returns:
+            List[Optional[SendResult]]: 입력 순서대로의 결과 (시도하지 않은 토큰은 None)
+        """
+        indices: Sequence[int] = range(len(device_tokens))
+        skipped: List[int] = []
+        if self.dead_tokens is not None:
+            indices, skipped = self.dead_tokens.partition(device_tokens)
+            if skipped:
+                print(f"사용 불가로 기록된 토큰 {len(skipped)}개 건너뜀")
+        invalid = [i for i in indices if not is_valid_token(device_tokens[i])]
+        if invalid:
+            rejected = set(invalid)
+            indices = [i for i in indices if i not in rejected]
+            print(f"형식이 잘못된 토큰 {len(invalid)}개 건너뜀")
+        
+        results = self._send_bulk(
+            indices,
+            lambda i: self._send_once(self._serialize(render, i), device_tokens[i], priority),
+            max_workers,
+            deadline
+        )
+        if not skipped and not invalid:
+            return results
+        
+        merged: List[Optional[SendResult]] = [None] * len(device_tokens)
+        for i, result in zip(indices, results):
+            merged[i] = result
+        for i in skipped:
+            merged[i] = skipped_result()
+        for i in invalid:
+            merged[i] = invalid_result(ValidationError(f"device_tokens[{i}]", "공백 없는 비어있지 않은 문자열이어야 합니다."))
+        return merged
+
+    def _log_result(self, result: SendResult, label: str = "FCM"):
+        if result.success:
+            print(f"{label} 전송 성공: {result.message_id}")
+        else:
+            print(
+                f"{label} 전송 실패: {result.status_code} - {result.error_code} "
+                f"({result.error_class}, 시도 {result.attempts}회) {result.error_message}"
+            )
+    
+    def send_template(self, template: MessageTemplate, device_token: str, priority: str = NORMAL) -> bool:
+        """
+        템플릿으로 단일 디바이스에 푸시 알림 전송
+        
+        Args:
+            template: 메시지 템플릿
+            device_token: 대상 디바이스 토큰
+            priority: 우선순위 레인 (high, normal, bulk)
+            
+        Returns:
+            bool: 전송 성공 여부
+        """
+        result = self._send_token(template, device_token, priority)
+        self._log_result(result)
+        return result.success
+
+    def _send_token(self, template: MessageTemplate, device_token: str, priority: str) -> SendResult:
+        """토큰을 확인하고 템플릿으로 전송 (잘못된 토큰은 FCM 호출 없이 실패 처리)"""
+        try:
+            validate_token(device_token, "device_token")
+        except ValidationError as e:
+            return invalid_result(e)
+        return self._send_with_retry(
+            self._serialize(template.render_token, device_token), device_token, priority=priority
+        )
+
+    def _send_target(self, template: MessageTemplate, target: str, value: str, priority: str) -> SendResult:
+        """토픽 이름/조건식 문법을 확인하고 템플릿으로 전송 (잘못된 값은 FCM 호출 없이 실패 처리)"""
+        try:
+            if target == "topic":
+                validate_topic(value)
+            else:
+                validate_condition(value)
+        except ValidationError as e:
+            return invalid_result(e)
+        return self._send_with_retry(self._serialize(template.render, target, value), priority=priority)
+
+    def send_template_to_multiple(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        priority: str = BULK
+    ) -> Dict[str, Optional[bool]]:
+        """
+        템플릿으로 여러 디바이스에 동시 푸시 알림 전송 (토큰별로는 토큰 값만 인코딩)
+        
+        Args:
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            deadline: 전체 제한 시간(초) (선택사항)
+            priority: 우선순위 레인 (기본값: bulk)
+            
+        Returns:
+            Dict[str, Optional[bool]]: 각 토큰별 전송 결과 (입력 순서 유지, 제한 시간 초과로 시도하지 않은 토큰은 None)
+        """
+        results = self._send_template_results(template, device_tokens, max_workers, deadline, priority)
+        
+        outcomes: Dict[str, Optional[bool]] = {}
+        for token, result in zip(device_tokens, results):
+            if result is not None and result.attempts:
+                self._log_result(result)
+            outcomes[token] = None if result is None else result.success
+        return outcomes
+
+    def send_template_bulk(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        priority: str = BULK,
+        keep_message_ids: bool = False
+    ) -> BulkResult:
+        """
+        템플릿으로 여러 디바이스에 동시 전송하고 결과를 압축해서 반환 (토큰별 로그 없이 요약만 출력)
+        
+        Args:
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            deadline: 전체 제한 시간(초) (선택사항)
+            priority: 우선순위 레인 (기본값: bulk)
+            keep_message_ids: 성공한 전송의 FCM 메시지 ID 보관 여부
+            
+        Returns:
+            BulkResult: 성공 수, 실패 인덱스와 오류 코드, 시도하지 않은 인덱스
+        """
+        result = BulkResult.from_results(
+            self._send_template_results(template, device_tokens, max_workers, deadline, priority),
+            keep_message_ids
+        )
+        print(
+            f"다중 전송: {result.total}개 중 {result.success_count}개 성공, {result.failure_count}개 실패 "
+            f"{result.error_counts() or ''}"
         )
+        return result
+
+    def _send_template_results(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        priority: str = BULK
+    ) -> List[Optional[SendResult]]:
+        """토큰 수에 따라 현재 프로세스 또는 워커 프로세스로 전송하고 입력 순서대로 결과 반환"""
+        if self.processes > 1 and deadline is None and len(device_tokens) >= self.shard_threshold:
+            # 토큰이 많으면 워커 프로세스들에 나눠 전송
+            return [
+                result for _, result in self._sharded_sender().send_stream(
+                    ((token, template) for token in device_tokens),
+                    max_workers=max_workers
+                )
+            ]
+        return self._send_to_tokens(
+            device_tokens,
+            lambda i: template.render_token(device_tokens[i]),
+            max_workers or self.max_workers,
+            deadline,
+            priority
+        )
+
+    def send_stream(
+        self,
+        recipients: Iterable[Tuple[str, MessageTemplate]],
+        batch_size: int = 1000,
+        max_workers: Optional[int] = None,
+        priority: str = BULK
+    ) -> Iterator[Tuple[str, SendResult]]:
+        """
+        (토큰, 템플릿) 스트림을 batch_size씩 나눠 전송하고 결과를 입력 순서대로 내보냄
+        
+        한 번에 batch_size개만 메모리에 두므로 대상 수와 관계없이 메모리 사용량이 일정합니다.
+        processes가 2 이상이면 워커 프로세스들에 나눠 전송합니다.
+        
+        Args:
+            recipients: (디바이스 토큰, 메시지 템플릿) 이터러블
+            batch_size: 한 번에 전송할 최대 토큰 수
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정, 워커 프로세스 사용 시 프로세스당)
+            priority: 우선순위 레인 (기본값: bulk, 워커 프로세스로 보낼 때는 적용되지 않음)
+            
+        Yields:
+            Tuple[str, SendResult]: (디바이스 토큰, 전송 결과)
+        """
+        if self.processes > 1:
+            yield from self._sharded_sender().send_stream(recipients, batch_size, max_workers)
+            return
+        
+        workers = max_workers or self.max_workers
+        batch: List[Tuple[str, MessageTemplate]] = []
+        
+        def flush():
+            tokens = [token for token, _ in batch]
+            results = self._send_to_tokens(
+                tokens,
+                lambda i: batch[i][1].render_token(batch[i][0]),
+                workers,
+                priority=priority
+            )
+            return zip(tokens, results)
+        
+        for recipient in recipients:
+            batch.append(recipient)
+            if len(batch) >= batch_size:
+                yield from flush()
+                batch = []
+        if batch:
+            yield from flush()
+
+    def start_rollout(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        duration: Optional[float] = None,
+        rate: Optional[float] = None,
+        ramp_up: float = 0.0,
+        max_workers: Optional[int] = None,
+        priority: str = BULK
+    ) -> Rollout:
+        """
+        여러 디바이스에 일정 속도로 나눠 전송하는 롤아웃 시작 (백그라운드에서 진행)
         
-        request = Request()
-        credentials.refresh(request)
-        return credentials.token
+        Args:
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            duration: 전체 전송에 걸릴 시간(초) (rate와 둘 중 하나)
+            rate: 초당 전송 수 (duration과 둘 중 하나)
+            ramp_up: 속도를 0에서 목표 속도까지 올리는 시간(초)
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            priority: 우선순위 레인 (기본값: bulk)
+            
+        Returns:
+            Rollout: 진행률 조회(progress())와 취소(cancel())가 가능한 롤아웃
+        """
+        rollout = Rollout(self, template, device_tokens, duration, rate, ramp_up, max_workers, priority=priority)
+        self.prune_rollouts()
+        with self._rollouts_lock:
+            self.rollouts[rollout.id] = rollout
+        return rollout.start()
+
+    def get_rollout(self, rollout_id: str) -> Optional[Rollout]:
+        """
+        롤아웃 조회
+        
+        Args:
+            rollout_id: 롤아웃 ID
+            
+        Returns:
+            Optional[Rollout]: 롤아웃 (없거나 보관 시간이 지나 제거되었으면 None)
+        """
+        with self._rollouts_lock:
+            return self.rollouts.get(rollout_id)
+
+    def list_rollouts(self) -> List[Rollout]:
+        """
+        현재 보관 중인 롤아웃 목록 (시작 순서)
+        
+        Returns:
+            List[Rollout]: 롤아웃 목록의 복사본
+        """
+        with self._rollouts_lock:
+            return list(self.rollouts.values())
+
+    def prune_rollouts(self) -> int:
+        """
+        끝난 지 rollout_ttl초가 지난 롤아웃을 rollouts에서 제거
+        
+        Returns:
+            int: 제거한 롤아웃 수
+        """
+        with self._rollouts_lock:
+            expired = [rollout_id for rollout_id, rollout in self.rollouts.items() if rollout.expired(self.rollout_ttl)]
+            for rollout_id in expired:
+                del self.rollouts[rollout_id]
+        return len(expired)
+
+    def send_template_to_topic(self, template: MessageTemplate, topic: str, priority: str = NORMAL) -> bool:
+        """
+        템플릿으로 토픽에 푸시 알림 전송
+        
+        Args:
+            template: 메시지 템플릿
+            topic: 대상 토픽
+            priority: 우선순위 레인 (high, normal, bulk)
+            
+        Returns:
+            bool: 전송 성공 여부
+        """
+        result = self._send_target(template, "topic", topic, priority)
+        self._log_result(result, "토픽 알림")
+        return result.success
+
+    def send_template_to_condition(self, template: MessageTemplate, condition: str, priority: str = NORMAL) -> bool:
+        """
+        템플릿으로 토픽 조건식에 맞는 디바이스에 푸시 알림 전송
+        
+        Args:
+            template: 메시지 템플릿
+            condition: 토픽 조건식 (예: "'a' in topics && 'b' in topics", 최대 5개 토픽)
+            priority: 우선순위 레인 (high, normal, bulk)
+            
+        Returns:
+            bool: 전송 성공 여부
+        """
+        result = self._send_target(template, "condition", condition, priority)
+        self._log_result(result, "조건 알림")
+        return result.success
+
+    def send_template_to_audience(
+        self,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        planner: AudiencePlanner,
+        max_workers: Optional[int] = None,
+        priority: str = BULK
+    ) -> Dict[str, Optional[bool]]:
+        """
+        구독 정보로 토픽/조건 전송과 개별 전송을 조합해 대상 디바이스에 전송
+        
+        대상에 구독자 전체가 포함되는 토픽은 토픽(또는 조건) 전송 한 번으로 보내고 나머지만 토큰별로 보냅니다.
+        
+        Args:
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            planner: 토픽 구독 정보를 가진 플래너
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            priority: 우선순위 레인 (기본값: bulk)
+            
+        Returns:
+            Dict[str, Optional[bool]]: 각 토큰별 전송 결과 (토픽/조건으로 보낸 토큰은 해당 전송의 결과)
+        """
+        plan = planner.plan(device_tokens)
+        print(
+            f"대상 {len(device_tokens)}개: 토픽/조건 전송 {len(plan.targets)}건"
+            f"({sum(len(members) for members in plan.members)}개) + 개별 전송 {len(plan.tokens)}건"
+        )
+        
+        outcomes: Dict[str, Optional[bool]] = {}
+        results = self._fan_out(
+            plan.targets,
+            lambda target: self._send_target(template, *target, priority),
+            max_workers or self.max_workers
+        )
+        for (kind, _), members, result in zip(plan.targets, plan.members, results):
+            self._log_result(result, "토픽 알림" if kind == "topic" else "조건 알림")
+            for token in members:
+                outcomes[token] = result.success
+        
+        if plan.tokens:
+            outcomes.update(self.send_template_to_multiple(template, plan.tokens, max_workers, priority=priority))
+        return {token: outcomes.get(token) for token in device_tokens}
     
     def send_notification(
         self, 
         device_token: str, 
         title: str, 
         body: str, 
-        data: Optional[Dict[str, str]] = None
+        data: Optional[Dict[str, str]] = None,
+        priority: str = NORMAL
     ) -> bool:
         """
         단일 디바이스에 푸시 알림 전송
@@ -46,62 +953,28 @@ class FCMService:
             title: 알림 제목
             body: 알림 내용
             data: 추가 데이터 (선택사항)
+            priority: 우선순위 레인 (high, normal, bulk)
             
         Returns:
-            bool: 전송 성공 여부
+            bool: 전송 성공 여부 (제목/내용/data가 잘못되었으면 전송하지 않고 False)
         """
         try:
-            access_token = self._get_access_token()
-            
-            # FCM 메시지 구성
-            message = {
-                "message": {
-                    "token": device_token,
-                    "notification": {
-                        "title": title,
-                        "body": body
-                    },
-                    "data": data or {},
-                    "android": {
-                        "notification": {
-                            "channel_id": "notification_channel",
-                            "priority": "high"
-                        }
-                    }
-                }
-            }
-            
-            # HTTP 요청 헤더
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            }
-            
-            # FCM API 호출
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                data=json.dumps(message)
-            )
-            
-            if response.status_code == 200:
-                print(f"FCM 전송 성공: {response.json()}")
-                return True
-            else:
-                print(f"FCM 전송 실패: {response.status_code} - {response.text}")
-                return False
-                
-        except Exception as e:
-            print(f"FCM 전송 중 오류 발생: {str(e)}")
+            template = self.compile_template(title, body, data)
+        except ValidationError as e:
+            self._log_result(invalid_result(e))
             return False
+        return self.send_template(template, device_token, priority)
     
     def send_notification_to_multiple(
         self, 
         device_tokens: List[str], 
         title: str, 
         body: str, 
-        data: Optional[Dict[str, str]] = None
-    ) -> Dict[str, bool]:
+        data: Optional[Dict[str, str]] = None,
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        priority: str = BULK
+    ) -> Dict[str, Optional[bool]]:
         """
         여러 디바이스에 동시 푸시 알림 전송
         
@@ -110,24 +983,34 @@ class FCMService:
             title: 알림 제목
             body: 알림 내용
             data: 추가 데이터 (선택사항)
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            deadline: 전체 제한 시간(초) (선택사항)
+            priority: 우선순위 레인 (기본값: bulk)
             
         Returns:
-            Dict[str, bool]: 각 토큰별 전송 결과
+            Dict[str, Optional[bool]]: 각 토큰별 전송 결과 (입력 순서 유지, 제한 시간 초과로 시도하지 않은 토큰은 None,
+                제목/내용/data가 잘못되었으면 전송하지 않고 모두 False)
         """
-        results = {}
-        
-        for token in device_tokens:
-            success = self.send_notification(token, title, body, data)
-            results[token] = success
-            
-        return results
+        try:
+            template = self.compile_template(title, body, data)
+        except ValidationError as e:
+            self._log_result(invalid_result(e))
+            return {token: False for token in device_tokens}
+        return self.send_template_to_multiple(
+            template,
+            device_tokens,
+            max_workers,
+            deadline,
+            priority
+        )
     
     def send_notification_to_topic(
         self, 
         topic: str, 
         title: str, 
         body: str, 
-        data: Optional[Dict[str, str]] = None
+        data: Optional[Dict[str, str]] = None,
+        priority: str = NORMAL
     ) -> bool:
         """
         토픽에 푸시 알림 전송
@@ -137,48 +1020,310 @@ class FCMService:
             title: 알림 제목
             body: 알림 내용
             data: 추가 데이터 (선택사항)
+            priority: 우선순위 레인 (high, normal, bulk)
             
         Returns:
-            bool: 전송 성공 여부
+            bool: 전송 성공 여부 (제목/내용/data가 잘못되었으면 전송하지 않고 False)
         """
         try:
-            access_token = self._get_access_token()
+            template = self.compile_template(title, body, data, android=False)
+        except ValidationError as e:
+            self._log_result(invalid_result(e), "토픽 알림")
+            return False
+        return self.send_template_to_topic(template, topic, priority)
+    
+    def send_notification_to_condition(
+        self,
+        condition: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        priority: str = NORMAL
+    ) -> bool:
+        """
+        토픽 조건식에 맞는 디바이스에 푸시 알림 전송
+        
+        Args:
+            condition: 토픽 조건식 (예: "'news' in topics && ('kr' in topics || 'jp' in topics)")
+            title: 알림 제목
+            body: 알림 내용
+            data: 추가 데이터 (선택사항)
+            priority: 우선순위 레인 (high, normal, bulk)
             
-            # FCM 메시지 구성
-            message = {
-                "message": {
-                    "topic": topic,
-                    "notification": {
-                        "title": title,
-                        "body": body
-                    },
-                    "data": data or {}
-                }
-            }
+        Returns:
+            bool: 전송 성공 여부 (제목/내용/data가 잘못되었으면 전송하지 않고 False)
+        """
+        try:
+            template = self.compile_template(title, body, data, android=False)
+        except ValidationError as e:
+            self._log_result(invalid_result(e), "조건 알림")
+            return False
+        return self.send_template_to_condition(template, condition, priority)
+
+    def subscribe_to_topic(
+        self,
+        device_tokens: List[str],
+        topic: str,
+        max_workers: Optional[int] = None
+    ) -> TopicManagementResult:
+        """
+        디바이스들을 토픽에 구독 (Instance ID batchAdd, 1000개씩 나눠 동시 요청)
+        
+        Args:
+            device_tokens: 구독할 디바이스 토큰 리스트
+            topic: 토픽 이름
+            max_workers: 최대 동시 요청 수 (선택사항, 기본값: 서비스 설정)
             
-            # HTTP 요청 헤더
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            }
+        Returns:
+            TopicManagementResult: 성공/실패 수와 오류 이유별 실패 토큰 인덱스
+        """
+        return self._manage_topic(BATCH_ADD, device_tokens, topic, max_workers)
+    
+    def unsubscribe_from_topic(
+        self,
+        device_tokens: List[str],
+        topic: str,
+        max_workers: Optional[int] = None
+    ) -> TopicManagementResult:
+        """
+        디바이스들의 토픽 구독 해지 (Instance ID batchRemove, 1000개씩 나눠 동시 요청)
+        
+        Args:
+            device_tokens: 구독을 해지할 디바이스 토큰 리스트
+            topic: 토픽 이름
+            max_workers: 최대 동시 요청 수 (선택사항, 기본값: 서비스 설정)
             
-            # FCM API 호출
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                data=json.dumps(message)
-            )
+        Returns:
+            TopicManagementResult: 성공/실패 수와 오류 이유별 실패 토큰 인덱스
+        """
+        return self._manage_topic(BATCH_REMOVE, device_tokens, topic, max_workers)
+    
+    def _manage_topic(
+        self,
+        operation: str,
+        device_tokens: List[str],
+        topic: str,
+        max_workers: Optional[int] = None
+    ) -> TopicManagementResult:
+        """토큰을 MAX_BATCH_TOKENS개씩 나눠 일괄 요청하고, 재시도 가능한 오류로 실패한 묶음은 백오프 후 다시 요청"""
+        validate_topic(topic)
+        url = IID_BATCH_URL.format(iid_url=self.iid_url, operation=operation)
+        offsets = range(0, len(device_tokens), MAX_BATCH_TOKENS)
+        # 묶음 시작 인덱스 -> 토큰별 오류 이유 (요청이 성공한 묶음만)
+        reasons: Dict[int, List[Optional[str]]] = {}
+        
+        def send_chunk(offset: int) -> SendResult:
+            chunk = device_tokens[offset:offset + MAX_BATCH_TOKENS]
+            try:
+                access_token = self._get_access_token()
+            except Exception as e:
+                return SendResult(False, error_code="TOKEN_ERROR", error_class=AUTH, error_message=str(e))
             
-            if response.status_code == 200:
-                print(f"토픽 알림 전송 성공: {response.json()}")
-                return True
+            started = time.perf_counter()
+            try:
+                response = self.transport.post(url, build_batch_body(topic, chunk), {
+                    'Authorization': f'Bearer {access_token}',
+                    'Content-Type': 'application/json',
+                    'access_token_auth': 'true'
+                })
+            except Exception as e:
+                result = classify_exception(e)
             else:
-                print(f"토픽 알림 전송 실패: {response.status_code} - {response.text}")
-                return False
-                
-        except Exception as e:
-            print(f"토픽 알림 전송 중 오류 발생: {str(e)}")
-            return False
+                result = classify_response(response.status_code, response.content, response.headers)
+                if result.success:
+                    reasons[offset] = parse_batch_results(response.content, len(chunk))
+            TOPIC_MANAGEMENT_SECONDS.observe(
+                time.perf_counter() - started, (operation, "OK" if result.success else result.error_code)
+            )
+            if result.error_class == AUTH:
+                self.credentials.invalidate()
+            return result
+        
+        results = self._send_bulk(offsets, send_chunk, max_workers or self.max_workers)
+        
+        outcome = TopicManagementResult()
+        for offset, result in zip(offsets, results):
+            size = min(MAX_BATCH_TOKENS, len(device_tokens) - offset)
+            if offset in reasons:
+                for i, reason in enumerate(reasons[offset]):
+                    if reason is None:
+                        outcome.success_count += 1
+                    else:
+                        outcome.add_failure(offset + i, reason)
+            else:
+                # 재시도 후에도 실패한 묶음은 모든 토큰에 같은 오류
+                for i in range(offset, offset + size):
+                    outcome.add_failure(i, result.error_code)
+        
+        action = "구독" if operation == BATCH_ADD else "구독 해지"
+        print(f"토픽 '{topic}' {action}: {outcome.success_count}개 성공, {outcome.failure_count}개 실패")
+        return outcome
+
+    def job_handlers(self) -> Dict[str, Callable[[Dict, Callable[[Dict], bool]], object]]:
+        """
+        큐 작업 종류별 전송 함수 (JobWorkerPool handlers로 사용)
+        
+        회로가 열려 보내지 못한 메시지는 버리지 않고 CircuitOpenError로 작업을 백로그로 되돌립니다.
+        다중 전송은 토큰을 나눠 보내며 나눈 묶음마다 남은 토큰과 결과를 작업에 저장하므로, 회로 차단이나
+        예외로 다시 처리할 때 이미 보낸 토큰은 다시 보내지 않습니다.
+        
+        Returns:
+            Dict[str, Callable[[Dict, Callable[[Dict], bool]], object]]: send, send-multiple,
+                send-topic(토픽 또는 condition) 처리 함수
+        """
+        return {
+            'send': self._run_send_job,
+            'send-multiple': self._run_send_multiple_job,
+            'send-topic': self._run_send_topic_job
+        }
+    
+    def _check_circuit(self, result: SendResult) -> SendResult:
+        if result.error_code == CIRCUIT_OPEN:
+            raise CircuitOpenError(result.retry_after or 0.0)
+        return result
+    
+    def _run_send_job(self, payload: Dict, checkpoint: Optional[Callable[[Dict], bool]] = None) -> bool:
+        template = self.compile_template(payload['title'], payload['body'], payload.get('data'))
+        device_token = payload['device_token']
+        result = self._check_circuit(self._send_token(template, device_token, payload.get('priority', NORMAL)))
+        self._log_result(result)
+        return result.success
+    
+    def _run_send_topic_job(self, payload: Dict, checkpoint: Optional[Callable[[Dict], bool]] = None) -> bool:
+        template = self.compile_template(payload['title'], payload['body'], payload.get('data'), android=False)
+        # condition이 있으면 토픽 조건식으로 전송
+        target = ("condition", payload['condition']) if payload.get('condition') else ("topic", payload['topic'])
+        result = self._check_circuit(self._send_target(template, *target, payload.get('priority', NORMAL)))
+        self._log_result(result, "토픽 알림" if target[0] == "topic" else "조건 알림")
+        return result.success
+    
+    def _run_send_multiple_job(self, payload: Dict, checkpoint: Optional[Callable[[Dict], bool]] = None) -> Dict:
+        template = self.compile_template(payload['title'], payload['body'], payload.get('data'))
+        priority = payload.get('priority', BULK)
+        deadline = payload.get('deadline')
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        # 이전 시도에서 저장한 진행 상황부터 이어서 전송
+        outcomes: Dict[str, Optional[bool]] = dict(payload.get('outcomes') or {})
+        remaining = list(payload['device_tokens'])
+        chunk_size = max(JOB_CHECKPOINT_TOKENS, self.shard_threshold, -(-len(remaining) // 20))
+        
+        while remaining:
+            time_left = None
+            if deadline_at is not None:
+                time_left = deadline_at - time.monotonic()
+                if time_left <= 0:
+                    break
+            chunk, rest = remaining[:chunk_size], remaining[chunk_size:]
+            results = self._send_template_results(template, chunk, payload.get('max_workers'), time_left, priority)
+            
+            blocked = []
+            for token, result in zip(chunk, results):
+                if result is not None and result.error_code == CIRCUIT_OPEN:
+                    blocked.append(token)
+                    continue
+                if result is not None and result.attempts:
+                    self._log_result(result)
+                outcomes[token] = None if result is None else result.success
+            remaining = blocked + rest
+            if checkpoint is not None:
+                checkpoint({**payload, "device_tokens": remaining, "outcomes": outcomes})
+            if blocked:
+                # 회로가 열리기 전에 보낸 토큰은 저장해 두고 남은 토큰은 작업째 백로그로 되돌림
+                retry_after = max(result.retry_after or 0.0 for result in results if result is not None)
+                print(f"회로 차단으로 보내지 못한 토큰 {len(remaining)}개는 {retry_after:.1f}초 후 다시 전송")
+                raise CircuitOpenError(retry_after)
+        
+        for token in remaining:
+            outcomes[token] = None
+        values = list(outcomes.values())
+        return {
+            "successCount": values.count(True),
+            "failureCount": values.count(False),
+            "notAttempted": values.count(None),
+            "results": outcomes
+        }
+    
+    def schedule(
+        self,
+        kind: str,
+        payload: Dict,
+        send_at: Union[float, str, datetime, None] = None,
+        delay: Optional[float] = None,
+        priority: Optional[str] = None
+    ) -> str:
+        """
+        지정한 시각 또는 지연 후에 전송하도록 작업을 큐에 저장
+        
+        Args:
+            kind: 작업 종류 (send, send-multiple, send-topic)
+            payload: 전송 함수에 전달할 인자
+            send_at: 전송 시각 (Unix 타임스탬프, ISO 8601 문자열 또는 datetime)
+            delay: 지금부터 몇 초 후에 전송할지
+            priority: 우선순위 레인 (선택사항, 기본값: send-multiple은 bulk, 나머지는 normal)
+            
+        Returns:
+            str: 작업 ID
+        """
+        if self.job_queue is None:
+            raise RuntimeError("예약 전송을 사용하려면 job_queue가 필요합니다.")
+        lane = priority or payload.get('priority') or (BULK if kind == 'send-multiple' else NORMAL)
+        return self.job_queue.enqueue(
+            kind, {**payload, "priority": lane}, resolve_run_at(send_at, delay), lane_rank(lane)
+        )
+    
+    def schedule_notification(
+        self,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        send_at: Union[float, str, datetime, None] = None,
+        delay: Optional[float] = None,
+        priority: Optional[str] = None
+    ) -> str:
+        """단일 디바이스 알림 예약 (작업 ID 반환)"""
+        return self.schedule('send', {
+            "device_token": device_token,
+            "title": title,
+            "body": body,
+            "data": data or {}
+        }, send_at, delay, priority)
+    
+    def schedule_notification_to_multiple(
+        self,
+        device_tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        send_at: Union[float, str, datetime, None] = None,
+        delay: Optional[float] = None,
+        priority: Optional[str] = None
+    ) -> str:
+        """다중 디바이스 알림 예약 (작업 ID 반환)"""
+        return self.schedule('send-multiple', {
+            "device_tokens": device_tokens,
+            "title": title,
+            "body": body,
+            "data": data or {}
+        }, send_at, delay, priority)
+    
+    def schedule_notification_to_topic(
+        self,
+        topic: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        send_at: Union[float, str, datetime, None] = None,
+        delay: Optional[float] = None,
+        priority: Optional[str] = None
+    ) -> str:
+        """토픽 알림 예약 (작업 ID 반환)"""
+        return self.schedule('send-topic', {
+            "topic": topic,
+            "title": title,
+            "body": body,
+            "data": data or {}
+        }, send_at, delay, priority)
 
 # 사용 예시
 if __name__ == "__main__":
@@ -1,15 +1,445 @@
-from flask import Flask, request, jsonify
-from fcm_service import FCMService
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from fcm_service import FCM_API_URL, FCMService, notification_fields
+from bulk_result import FULL, SHAPES
+from circuit_breaker import STATE_VALUES as CIRCUIT_STATE_VALUES, CircuitBreaker
+from credentials import CredentialManager
+from dead_tokens import DeadTokenRegistry
+from idempotency import IdempotencyCache, IdempotencyKeyReused
+from message_template import dumps
+from metrics import CONTENT_TYPE, REGISTRY
+from priority_lanes import BULK, LANES, NORMAL, LaneScheduler, lane_rank, parse_weights, resolve_lane
+from rollout import RUNNING as ROLLOUT_RUNNING
+from job_queue import JobQueue, JobWorkerPool, resolve_run_at
+from rate_limiter import RateLimiter
+from topic_management import IID_API_URL
+from validation import (
+    ValidationError, is_valid_token, validate_condition, validate_data, validate_fields, validate_token,
+    validate_topic
+)
+import functools
+import hashlib
+import json
+import math
+import threading
 import time
 import os
 
 app = Flask(__name__)
 
-# FCM 서비스 초기화
+# 전송 속도 제한 (FCM_RATE_LIMIT: 초당 전송 수, FCM_RATE_LIMIT_FILE: 프로세스 간 공유 파일)
+rate_limiter = None
+if os.environ.get('FCM_RATE_LIMIT'):
+    rate_limiter = RateLimiter(
+        rate=float(os.environ['FCM_RATE_LIMIT']),
+        adaptive=os.environ.get('FCM_RATE_LIMIT_ADAPTIVE', '1').lower() in ('1', 'true', 'yes'),
+        shared_path=os.environ.get('FCM_RATE_LIMIT_FILE')
+    )
+
+# 사용 불가 토큰 레지스트리 (FCM_DEAD_TOKENS_FILE에 데이터 디렉터리 안의 경로를 지정하면 사용, 워커 프로세스 간 공유 가능)
+dead_tokens_path = os.environ.get('FCM_DEAD_TOKENS_FILE')
+dead_tokens = DeadTokenRegistry(dead_tokens_path) if dead_tokens_path else None
+
+# 회로 차단기 (FCM_CIRCUIT_BREAKER): FCM 장애 시 요청을 붙잡지 않고 즉시 실패 처리하거나 큐(백로그)에 저장
+circuit_breaker = None
+if os.environ.get('FCM_CIRCUIT_BREAKER', '').lower() in ('1', 'true', 'yes'):
+    circuit_breaker = CircuitBreaker(
+        failure_rate=float(os.environ.get('FCM_CIRCUIT_FAILURE_RATE', 0.5)),
+        slow_call_seconds=float(os.environ.get('FCM_CIRCUIT_SLOW_SECONDS', 5.0)),
+        open_seconds=float(os.environ.get('FCM_CIRCUIT_OPEN_SECONDS', 30.0))
+    )
+
+# 우선순위 레인 (FCM_LANE_CAPACITY: 동시 전송 슬롯 수, FCM_LANE_WEIGHTS: "high=8,normal=3,bulk=1")
+# 대량 전송이 몰려도 high 요청은 전용 슬롯과 가중치 몫으로 바로 전송
+lanes = None
+if os.environ.get('FCM_LANE_CAPACITY'):
+    lanes = LaneScheduler(
+        capacity=int(os.environ['FCM_LANE_CAPACITY']),
+        weights=parse_weights(os.environ.get('FCM_LANE_WEIGHTS', ''))
+    )
+
+# FCM 서비스 초기화 (FCM_API_URL/FCM_TOKEN_URI/FCM_IID_URL: 로컬 에뮬레이터 등 다른 엔드포인트 사용,
+# FCM_IID_URL이 없으면 토픽 구독 관리도 FCM_API_URL로 보냄)
+service_account_key_path = os.environ.get('FCM_SERVICE_ACCOUNT_KEY', 'firebase-service-account-key.json')
 fcm_service = FCMService(
-    project_id="my-notification-4d6dc",
-    service_account_key_path="firebase-service-account-key.json"
+    project_id=os.environ.get('FCM_PROJECT_ID', 'my-notification-4d6dc'),
+    service_account_key_path=service_account_key_path,
+    credentials=CredentialManager(service_account_key_path, token_uri=os.environ.get('FCM_TOKEN_URI')),
+    rate_limiter=rate_limiter,
+    dead_tokens=dead_tokens,
+    api_url=os.environ.get('FCM_API_URL', FCM_API_URL),
+    circuit_breaker=circuit_breaker,
+    lanes=lanes,
+    iid_url=os.environ.get('FCM_IID_URL') or os.environ.get('FCM_API_URL') or IID_API_URL,
+    # 끝난 롤아웃의 진행률 보관 시간(초)
+    rollout_ttl=float(os.environ.get('FCM_ROLLOUT_TTL', 3600))
+)
+
+# 큐 모드: 요청을 로컬 영속 큐에 저장하고 202를 즉시 반환, 백그라운드 워커가 전송
+# 예약 전송(sendAt/delaySeconds)만 사용할 때는 FCM_SCHEDULE_ENABLED로 큐를 켜고 즉시 전송은 그대로 처리
+queue_mode = os.environ.get('FCM_QUEUE_ENABLED', '').lower() in ('1', 'true', 'yes')
+job_queue = None
+if queue_mode or os.environ.get('FCM_SCHEDULE_ENABLED', '').lower() in ('1', 'true', 'yes'):
+    job_queue = JobQueue(os.environ.get('FCM_QUEUE_DB', 'fcm_jobs.db'))
+    fcm_service.job_queue = job_queue
+    job_workers = JobWorkerPool(
+        job_queue,
+        handlers=fcm_service.job_handlers(),
+        workers=int(os.environ.get('FCM_QUEUE_WORKERS', 4)),
+        # 같은 시각에 예약된 작업이 몰려도 초당 이 수만큼만 꺼내서 전송
+        release_rate=float(os.environ['FCM_RELEASE_RATE']) if os.environ.get('FCM_RELEASE_RATE') else None,
+        # 회로가 열려 있는 동안은 작업을 꺼내지 않고, 복구 후 쌓인 작업은 초당 이 수만큼 처리
+        circuit_breaker=circuit_breaker,
+        drain_rate=float(os.environ['FCM_DRAIN_RATE']) if os.environ.get('FCM_DRAIN_RATE') else None
+    )
+    job_workers.start()
+
+# 중복 요청 방지 (Idempotency-Key 헤더, FCM_IDEMPOTENCY_DB로 워커 프로세스 간 공유)
+idempotency_cache = IdempotencyCache(
+    ttl=float(os.environ.get('FCM_IDEMPOTENCY_TTL', 86400)),
+    max_entries=int(os.environ.get('FCM_IDEMPOTENCY_MAX_ENTRIES', 10000)),
+    db_path=os.environ.get('FCM_IDEMPOTENCY_DB')
+)
+# 헤더가 없을 때 요청 본문 해시로 중복을 판단할 시간(초), 0이면 사용 안 함
+idempotency_hash_ttl = float(os.environ.get('FCM_IDEMPOTENCY_HASH_TTL', 0))
+
+# 콜드 스타트 단축 (FCM_WARMUP): 워커 프로세스마다 한 번 토큰 발급과 FCM 연결을 백그라운드에서
+# 미리 수행하고, 끝날 때까지 /ready는 503 반환 (로드 밸런서/readiness probe용)
+# 토큰 발급/연결 실패는 FCM_WARMUP_RETRY_SECONDS부터 간격을 두 배씩(최대 60초) 늘려 FCM_WARMUP_MAX_ATTEMPTS번까지 재시도,
+# 서비스 계정 키를 읽을 수 없으면 재시도 없이 실패로 표시
+warmup_enabled = os.environ.get('FCM_WARMUP', '').lower() in ('1', 'true', 'yes')
+warmup_state = {
+    "enabled": warmup_enabled, "complete": False, "failed": False, "attempts": 0, "error": None, "timings": None
+}
+warmup_done = threading.Event()
+
+def run_warmup(connections, retry_seconds, max_attempts):
+    """토큰 발급과 연결 사전 생성이 성공할 때까지 재시도 (백그라운드 스레드)"""
+    started = time.perf_counter()
+    try:
+        fcm_service.credentials.load()
+    except Exception as e:
+        # 키 파일이 없거나 잘못된 경우는 재시도해도 나아지지 않음
+        warmup_state.update(failed=True, error=f"서비스 계정 키를 읽을 수 없습니다: {str(e)}")
+        print(f"워밍업 실패: {warmup_state['error']}")
+        return
+    
+    while True:
+        warmup_state["attempts"] += 1
+        try:
+            timings = fcm_service.warmup(connections)
+        except Exception as e:
+            warmup_state["error"] = str(e)
+            if warmup_state["attempts"] >= max_attempts:
+                warmup_state["failed"] = True
+                print(f"워밍업 실패 ({max_attempts}회 시도): {str(e)}")
+                return
+            print(f"워밍업 실패 ({retry_seconds:g}초 후 재시도): {str(e)}")
+            time.sleep(retry_seconds)
+            retry_seconds = min(retry_seconds * 2, 60.0)
+            continue
+        timings["totalSeconds"] = round(time.perf_counter() - started, 3)
+        warmup_state.update(complete=True, error=None, timings=timings)
+        warmup_done.set()
+        print(f"워밍업 완료: {timings}")
+        return
+
+if warmup_enabled:
+    threading.Thread(
+        target=run_warmup,
+        args=(
+            int(os.environ.get('FCM_WARMUP_CONNECTIONS', 4)),
+            float(os.environ.get('FCM_WARMUP_RETRY_SECONDS', 5.0)),
+            int(os.environ.get('FCM_WARMUP_MAX_ATTEMPTS', 5))
+        ),
+        name="fcm-warmup",
+        daemon=True
+    ).start()
+else:
+    warmup_done.set()
+
+# 요청 처리 지표 (/metrics)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "엔드포인트별 요청 처리 시간(초)", ("endpoint",)
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total", "엔드포인트별 요청 수", ("endpoint", "method", "status")
+)
+INFLIGHT_REQUESTS = REGISTRY.gauge(
+    "http_inflight_requests", "처리 중인 요청 수"
+)
+REGISTRY.gauge("fcm_queue_depth", "대기 중인 큐 작업 수 (예약 포함)").set_function(
+    lambda: job_queue.depth() if job_queue is not None else None
+)
+REGISTRY.gauge("fcm_rollouts_running", "진행 중인 점진 전송 수").set_function(
+    lambda: sum(1 for rollout in fcm_service.list_rollouts() if rollout.status == ROLLOUT_RUNNING)
+)
+REGISTRY.gauge("fcm_dead_tokens", "사용 불가로 기록된 토큰 수").set_function(
+    lambda: len(dead_tokens) if dead_tokens is not None else None
+)
+REGISTRY.gauge("fcm_rate_limit", "현재 초당 전송 한도").set_function(
+    lambda: rate_limiter.current_rate if rate_limiter is not None else None
 )
+REGISTRY.gauge("fcm_circuit_state", "FCM 회로 상태 (0: 닫힘, 1: 반개방, 2: 열림)").set_function(
+    lambda: CIRCUIT_STATE_VALUES[circuit_breaker.state] if circuit_breaker is not None else None
+)
+REGISTRY.gauge("fcm_lane_waiting", "우선순위 레인별 전송 슬롯 대기 수", ("lane",)).set_function(
+    lambda: {(lane,): count for lane, count in lanes.waiting().items()} if lanes is not None else None
+)
+REGISTRY.gauge("fcm_warmup_complete", "워밍업(토큰 발급, 연결 사전 생성) 완료 여부 (0/1)").set_function(
+    lambda: 1 if warmup_done.is_set() else 0
+)
+REGISTRY.gauge("fcm_access_token_expires_in_seconds", "캐시된 액세스 토큰의 남은 유효 시간(초)").set_function(
+    lambda: fcm_service.get_token_stats().get("expires_in")
+)
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    INFLIGHT_REQUESTS.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - g.metrics_started, (endpoint,))
+    REQUESTS_TOTAL.inc((endpoint, request.method, str(response.status_code)))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if 'metrics_started' in g:
+        INFLIGHT_REQUESTS.dec()
+
+def idempotent(view):
+    """Idempotency-Key가 같은 반복 요청에는 FCM 호출 없이 처음 응답을 반환"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        ttl = None
+        if not key and idempotency_hash_ttl <= 0:
+            return view(*args, **kwargs)
+        
+        # 같은 키로 다른 본문이 오면 처음 응답을 돌려주지 않도록 본문 지문을 함께 저장
+        payload = request.get_json(silent=True)
+        canonical = json.dumps(payload, sort_keys=True).encode('utf-8') if payload is not None else request.get_data()
+        fingerprint = hashlib.sha256(canonical).hexdigest()
+        if not key:
+            key = f"sha256:{fingerprint}"
+            ttl = idempotency_hash_ttl
+        
+        def run():
+            response = app.make_response(view(*args, **kwargs))
+            return response.status_code, response.get_data(as_text=True)
+        
+        try:
+            (status_code, body), replayed = idempotency_cache.get_or_run(
+                f"{request.path}:{key}", run, ttl, fingerprint
+            )
+        except IdempotencyKeyReused:
+            return jsonify({
+                "error": "같은 Idempotency-Key로 다른 요청 본문이 전송되었습니다."
+            }), 422
+        except TimeoutError:
+            return jsonify({
+                "error": "같은 Idempotency-Key의 요청이 아직 처리 중입니다."
+            }), 409
+        
+        response = app.response_class(body, status=status_code, mimetype='application/json')
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+def enqueue_job(kind, payload, run_at=None):
+    """작업을 큐에 저장하고 202 응답 반환 (run_at이 있으면 해당 시각에 전송, 우선순위가 높은 작업부터 꺼냄)"""
+    job_id = job_queue.enqueue(kind, payload, run_at, lane_rank(payload['priority']))
+    scheduled = run_at is not None and run_at > time.time()
+    return jsonify({
+        "message": "알림 전송이 예약되었습니다." if scheduled else "알림 전송 작업이 큐에 등록되었습니다.",
+        "jobId": job_id,
+        "status": "scheduled" if scheduled else "queued",
+        "runAt": run_at,
+        "statusUrl": f"/jobs/{job_id}"
+    }), 202
+
+def circuit_open():
+    """회로 차단 중인지 여부 (큐가 있으면 즉시 전송 대신 백로그에 저장)"""
+    return circuit_breaker is not None and circuit_breaker.is_open()
+
+def circuit_open_response():
+    """큐가 없을 때 회로 차단 중이면 FCM을 호출하지 않고 바로 503 반환"""
+    retry_after = math.ceil(circuit_breaker.retry_after())
+    response = jsonify({
+        "error": "FCM 장애로 전송을 일시 중단했습니다.",
+        "retryAfter": retry_after
+    })
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+TYPE_NAMES = {
+    str: "문자열이어야", list: "배열이어야", dict: "객체여야", int: "정수여야", (int, float): "숫자여야", bool: "true 또는 false여야"
+}
+
+def compile_schema(fields, checks=()):
+    """
+    필드 규칙을 한 번만 해석해 요청 검증 함수 생성 (요청마다 FCM 호출 전에 실행)
+    
+    Args:
+        fields: 필드 이름 -> (타입, 필수 여부, 값 검증 함수 또는 None), 필수 필드는 선언 순서대로 안내
+        checks: 요청 전체를 받아 검증하는 함수들 (ValidationError 발생)
+    
+    Returns:
+        요청 데이터를 받아 오류 메시지(정상이면 None)를 반환하는 함수
+    """
+    required = tuple(name for name, (_, is_required, _) in fields.items() if is_required)
+    rules = tuple(
+        (name, types, TYPE_NAMES[types], check, types is not bool) for name, (types, _, check) in fields.items()
+    )
+    missing_message = f"{', '.join(required)}는 필수입니다." if required else "요청 본문은 JSON 객체여야 합니다."
+    
+    def validate(data):
+        if not isinstance(data, dict) or any(name not in data for name in required):
+            return missing_message
+        try:
+            for name, types, type_name, check, reject_bool in rules:
+                value = data.get(name)
+                if value is None:
+                    continue
+                # bool은 int의 하위 타입이므로 숫자 필드에서 제외
+                if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+                    return f"{name}: {type_name} 합니다."
+                if check is not None:
+                    check(value, name)
+            for check in checks:
+                check(data)
+        except ValidationError as e:
+            return str(e)
+        return None
+    
+    return validate
+
+def check_token_list(tokens, field):
+    """비어있지 않은 토큰 배열인지 확인 (잘못된 토큰은 인덱스와 함께 안내)"""
+    if not tokens:
+        raise ValidationError(field, "비어있지 않은 배열이어야 합니다.")
+    for i, token in enumerate(tokens):
+        if not is_valid_token(token):
+            validate_token(token, f"{field}[{i}]")
+
+def check_positive(value, field):
+    """0보다 큰 유한한 숫자인지 확인 (동시 전송 수, 제한 시간, 전송 속도 등)"""
+    if not math.isfinite(value) or value <= 0:
+        raise ValidationError(field, "0보다 큰 유한한 숫자여야 합니다.")
+
+def check_non_negative(value, field):
+    """0 이상의 유한한 숫자인지 확인 (지연 시간, 증가 구간 등)"""
+    if not math.isfinite(value) or value < 0:
+        raise ValidationError(field, "0 이상의 유한한 숫자여야 합니다.")
+
+def check_payload(data):
+    """알림 제목/내용/data를 인코딩한 페이로드가 4KB 이하인지 확인"""
+    validate_fields(notification_fields(data['title'], data['body'], data.get('data')))
+
+def check_single_target(data):
+    if ('topic' in data) == ('condition' in data):
+        raise ValidationError("topic", "topic 또는 condition 중 하나만 지정해야 합니다.")
+
+def check_purge_target(data):
+    """삭제 조건이 없는 요청(빈 본문 등)으로 전체 레지스트리가 지워지지 않도록 전체 삭제는 all: true로만 허용"""
+    if data.get('deviceTokens') is None and data.get('olderThanSeconds') is None and data.get('all') is not True:
+        raise ValidationError("all", "deviceTokens 또는 olderThanSeconds를 지정하거나, 전체 삭제는 all: true로 요청해야 합니다.")
+
+NOTIFICATION_FIELDS = {
+    "title": (str, True, None),
+    "body": (str, True, None),
+    "data": (dict, False, validate_data)
+}
+SEND_OPTIONS = {
+    "priority": (str, False, None),
+    "delaySeconds": ((int, float), False, check_non_negative)
+}
+
+# 엔드포인트별 요청 스키마 (모듈 로드 시 한 번 컴파일)
+TEMPLATE_SCHEMA = compile_schema({"name": (str, True, None), **NOTIFICATION_FIELDS}, (check_payload,))
+SEND_SCHEMA = compile_schema(
+    {"deviceToken": (str, True, validate_token), **NOTIFICATION_FIELDS, **SEND_OPTIONS},
+    (check_payload,)
+)
+SEND_MULTIPLE_SCHEMA = compile_schema(
+    {
+        "deviceTokens": (list, True, check_token_list),
+        **NOTIFICATION_FIELDS,
+        **SEND_OPTIONS,
+        "maxConcurrency": (int, False, check_positive),
+        "deadlineSeconds": ((int, float), False, check_positive),
+        "resultShape": (str, False, None)
+    },
+    (check_payload,)
+)
+SEND_TOPIC_SCHEMA = compile_schema(
+    {
+        "topic": (str, False, validate_topic),
+        "condition": (str, False, validate_condition),
+        **NOTIFICATION_FIELDS,
+        **SEND_OPTIONS
+    },
+    (check_single_target, check_payload)
+)
+ROLLOUT_SCHEMA = compile_schema(
+    {
+        "deviceTokens": (list, True, check_token_list),
+        **NOTIFICATION_FIELDS,
+        "priority": (str, False, None),
+        "durationSeconds": ((int, float), False, check_positive),
+        "ratePerSecond": ((int, float), False, check_positive),
+        "rampUpSeconds": ((int, float), False, check_non_negative),
+        "maxConcurrency": (int, False, check_positive)
+    },
+    (check_payload,)
+)
+TOPIC_MANAGEMENT_SCHEMA = compile_schema({
+    "topic": (str, True, validate_topic),
+    "deviceTokens": (list, True, check_token_list),
+    "maxConcurrency": (int, False, check_positive)
+})
+DEAD_TOKEN_PURGE_SCHEMA = compile_schema(
+    {
+        "deviceTokens": (list, False, check_token_list),
+        "olderThanSeconds": ((int, float), False, check_non_negative),
+        "all": (bool, False, None)
+    },
+    (check_purge_target,)
+)
+
+def parse_priority(priority, default=NORMAL):
+    """
+    요청의 priority(high, normal, bulk)를 레인 이름으로 변환
+    
+    Returns:
+        (레인 이름 또는 None, 오류 응답 또는 None)
+    """
+    try:
+        return resolve_lane(priority, default), None
+    except ValueError:
+        return None, (jsonify({
+            "error": f"priority는 {', '.join(LANES)} 중 하나여야 합니다."
+        }), 400)
+
+def parse_schedule(data):
+    """
+    요청의 sendAt(Unix 타임스탬프 또는 ISO 8601) / delaySeconds를 전송 시각으로 변환
+    
+    Returns:
+        (전송 시각 또는 None, 오류 응답 또는 None)
+    """
+    try:
+        run_at = resolve_run_at(data.get('sendAt'), data.get('delaySeconds'))
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    if run_at is not None and job_queue is None:
+        return None, (jsonify({
+            "error": "예약 전송이 활성화되어 있지 않습니다. (FCM_SCHEDULE_ENABLED)"
+        }), 400)
+    return run_at, None
 
 @app.route('/')
 def home():
@@ -20,21 +450,94 @@ def home():
         "endpoints": {
             "POST /send": "단일 디바이스 알림 전송",
             "POST /send-multiple": "다중 디바이스 알림 전송", 
-            "POST /send-topic": "토픽 알림 전송",
-            "POST /test": "테스트 알림 전송"
+            "POST /send-stream": "NDJSON 스트림 대량 전송",
+            "POST /send-topic": "토픽/조건식 알림 전송",
+            "POST /subscribe-topic": "디바이스 토픽 일괄 구독",
+            "POST /unsubscribe-topic": "디바이스 토픽 일괄 구독 해지",
+            "POST /rollouts": "일정 속도로 나눠 전송 (점진 전송)",
+            "GET /rollouts/<id>": "점진 전송 진행률 조회",
+            "DELETE /rollouts/<id>": "점진 전송 취소",
+            "POST /test": "테스트 알림 전송",
+            "POST /templates": "메시지 템플릿 등록",
+            "GET /templates": "메시지 템플릿 목록",
+            "GET /jobs/<id>": "큐 모드/예약 작업 상태 조회",
+            "GET /dead-tokens": "사용 불가 토큰 목록 내보내기",
+            "DELETE /dead-tokens": "사용 불가 토큰 삭제",
+            "GET /metrics": "Prometheus 형식 지표",
+            "GET /ready": "준비 상태 (워밍업 완료 여부)"
         }
     }
 
+def apply_template(data):
+    """
+    요청에 template 이름이 있으면 등록된 템플릿의 title/body/data로 채움
+    
+    Returns:
+        (요청 데이터, 템플릿 또는 None, 오류 응답 또는 None)
+    """
+    if not data or 'template' not in data:
+        return data, None, None
+    
+    template = fcm_service.templates.get(data['template'])
+    if template is None:
+        return data, None, (jsonify({
+            "error": f"등록되지 않은 템플릿입니다: {data['template']}"
+        }), 404)
+    
+    data = {**data, 'title': template.title, 'body': template.body, 'data': template.data or {}}
+    return data, template, None
+
+@app.route('/templates', methods=['POST'])
+def register_template():
+    """메시지 템플릿 등록 (알림 내용을 미리 직렬화해 두고 이름으로 재사용)"""
+    try:
+        data = request.get_json()
+        
+        # 필수 필드, 형식, 페이로드 크기 검증
+        error = TEMPLATE_SCHEMA(data)
+        if error:
+            return jsonify({
+                "error": error
+            }), 400
+        
+        fcm_service.register_template(
+            name=data['name'],
+            title=data['title'],
+            body=data['body'],
+            data=data.get('data', {})
+        )
+        
+        return jsonify({
+            "message": f"템플릿 '{data['name']}'이(가) 등록되었습니다."
+        }), 201
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"서버 오류: {str(e)}"
+        }), 500
+
+@app.route('/templates', methods=['GET'])
+def list_templates():
+    """등록된 메시지 템플릿 목록"""
+    return jsonify({
+        name: {"title": template.title, "body": template.body, "data": template.data}
+        for name, template in fcm_service.templates.items()
+    })
+
 @app.route('/send', methods=['POST'])
+@idempotent
 def send_notification():
     """단일 디바이스에 푸시 알림 전송"""
     try:
-        data = request.get_json()
+        data, template, error = apply_template(request.get_json())
+        if error:
+            return error
         
-        # 필수 필드 검증
-        if not data or not all(k in data for k in ('deviceToken', 'title', 'body')):
+        # 필수 필드, 형식, 페이로드 크기 검증 (잘못된 요청은 FCM을 호출하지 않고 거부)
+        error = SEND_SCHEMA(data)
+        if error:
             return jsonify({
-                "error": "deviceToken, title, body는 필수입니다."
+                "error": error
             }), 400
         
         device_token = data['deviceToken']
@@ -42,13 +545,38 @@ def send_notification():
         body = data['body']
         custom_data = data.get('data', {})
         
+        priority, error = parse_priority(data.get('priority'))
+        if error:
+            return error
+        
+        run_at, error = parse_schedule(data)
+        if error:
+            return error
+        
+        spill = circuit_open()
+        if spill and job_queue is None:
+            return circuit_open_response()
+        
+        if queue_mode or run_at is not None or spill:
+            return enqueue_job('send', {
+                "device_token": device_token,
+                "title": title,
+                "body": body,
+                "data": custom_data,
+                "priority": priority
+            }, run_at)
+        
         # FCM 알림 전송
-        success = fcm_service.send_notification(
-            device_token=device_token,
-            title=title,
-            body=body,
-            data=custom_data
-        )
+        if template is not None:
+            success = fcm_service.send_template(template, device_token, priority)
+        else:
+            success = fcm_service.send_notification(
+                device_token=device_token,
+                title=title,
+                body=body,
+                data=custom_data,
+                priority=priority
+            )
         
         if success:
             return jsonify({
@@ -65,15 +593,19 @@ def send_notification():
         }), 500
 
 @app.route('/send-multiple', methods=['POST'])
+@idempotent
 def send_notification_to_multiple():
     """여러 디바이스에 푸시 알림 전송"""
     try:
-        data = request.get_json()
+        data, template, error = apply_template(request.get_json())
+        if error:
+            return error
         
-        # 필수 필드 검증
-        if not data or not all(k in data for k in ('deviceTokens', 'title', 'body')):
+        # 필수 필드, 형식, 토큰, 페이로드 크기 검증 (잘못된 요청은 FCM을 호출하지 않고 거부)
+        error = SEND_MULTIPLE_SCHEMA(data)
+        if error:
             return jsonify({
-                "error": "deviceTokens, title, body는 필수입니다."
+                "error": error
             }), 400
         
         device_tokens = data['deviceTokens']
@@ -81,25 +613,56 @@ def send_notification_to_multiple():
         body = data['body']
         custom_data = data.get('data', {})
         
-        if not isinstance(device_tokens, list) or len(device_tokens) == 0:
+        priority, error = parse_priority(data.get('priority'), BULK)
+        if error:
+            return error
+        
+        # 응답 형태: summary(개수만), failures(실패 인덱스), full(토큰별 상세), 지정하지 않으면 토큰별 성공 여부
+        result_shape = data.get('resultShape')
+        if result_shape is not None and result_shape not in SHAPES:
             return jsonify({
-                "error": "deviceTokens는 비어있지 않은 배열이어야 합니다."
+                "error": f"resultShape는 {', '.join(SHAPES)} 중 하나여야 합니다."
             }), 400
         
-        # FCM 알림 전송
-        results = fcm_service.send_notification_to_multiple(
-            device_tokens=device_tokens,
-            title=title,
-            body=body,
-            data=custom_data
+        run_at, error = parse_schedule(data)
+        if error:
+            return error
+        
+        spill = circuit_open()
+        if spill and job_queue is None:
+            return circuit_open_response()
+        
+        if queue_mode or run_at is not None or spill:
+            return enqueue_job('send-multiple', {
+                "device_tokens": device_tokens,
+                "title": title,
+                "body": body,
+                "data": custom_data,
+                "max_workers": data.get('maxConcurrency'),
+                "deadline": data.get('deadlineSeconds'),
+                "priority": priority
+            }, run_at)
+        
+        # FCM 알림 전송 (한 번 컴파일한 템플릿을 모든 토큰에 재사용)
+        if template is None:
+            template = fcm_service.compile_template(title, body, custom_data)
+        result = fcm_service.send_template_bulk(
+            template,
+            device_tokens,
+            max_workers=data.get('maxConcurrency'),
+            deadline=data.get('deadlineSeconds'),
+            priority=priority,
+            keep_message_ids=result_shape == FULL
         )
         
-        success_count = sum(1 for success in results.values() if success)
-        total_count = len(results)
+        message = f"{result.total}개 중 {result.success_count}개 전송 성공"
+        if result_shape is not None:
+            return jsonify({"message": message, **result.to_dict(result_shape, device_tokens)})
         
         return jsonify({
-            "message": f"{total_count}개 중 {success_count}개 전송 성공",
-            "results": results
+            "message": message,
+            "notAttempted": len(result.not_attempted),
+            "results": result.outcomes(device_tokens)
         })
         
     except Exception as e:
@@ -107,30 +670,160 @@ def send_notification_to_multiple():
             "error": f"서버 오류: {str(e)}"
         }), 500
 
+def iter_stream_recipients(stream, default_template, invalid_lines):
+    """
+    요청 본문을 한 줄씩 읽어 (토큰, 템플릿) 생성
+    
+    각 줄은 토큰 문자열이거나 {"token": ..., "title": ..., "body": ..., "data": ...} JSON입니다.
+    해석할 수 없는 줄은 invalid_lines에 (줄 번호, 오류)로 기록하고 건너뜁니다.
+    """
+    for line_number, raw in enumerate(stream, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        
+        if not line.startswith(b'{'):
+            token, template = line.decode('utf-8'), default_template
+        else:
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                invalid_lines.append((line_number, f"JSON 형식 오류: {str(e)}"))
+                continue
+            token = item.get('token') or item.get('deviceToken')
+            template = default_template
+            if any(k in item for k in ('title', 'body', 'data')):
+                title = item.get('title', default_template.title if default_template else None)
+                body = item.get('body', default_template.body if default_template else None)
+                if title is None or body is None:
+                    invalid_lines.append((line_number, "title, body가 필요합니다."))
+                    continue
+                try:
+                    template = fcm_service.compile_template(title, body, item.get('data', {}))
+                except ValidationError as e:
+                    invalid_lines.append((line_number, str(e)))
+                    continue
+        
+        if not token:
+            invalid_lines.append((line_number, "토큰이 비어 있습니다."))
+        elif not is_valid_token(token):
+            invalid_lines.append((line_number, "토큰은 공백 문자를 포함할 수 없습니다."))
+        elif template is None:
+            invalid_lines.append((line_number, "title, body 또는 template이 필요합니다."))
+        else:
+            yield token, template
+
+@app.route('/send-stream', methods=['POST'])
+def send_notification_stream():
+    """
+    줄 단위(NDJSON) 토큰 스트림으로 대량 전송하고 토큰별 결과를 NDJSON으로 스트리밍
+    
+    쿼리 파라미터: template 또는 title/body, batchSize, maxConcurrency, priority (기본값: bulk)
+    """
+    priority, error = parse_priority(request.args.get('priority'), BULK)
+    if error:
+        return error
+    
+    template = None
+    if 'template' in request.args:
+        template = fcm_service.templates.get(request.args['template'])
+        if template is None:
+            return jsonify({
+                "error": f"등록되지 않은 템플릿입니다: {request.args['template']}"
+            }), 404
+    elif 'title' in request.args and 'body' in request.args:
+        try:
+            template = fcm_service.compile_template(request.args['title'], request.args['body'])
+        except ValidationError as e:
+            return jsonify({
+                "error": str(e)
+            }), 400
+    
+    batch_size = request.args.get('batchSize', 1000, type=int)
+    max_workers = request.args.get('maxConcurrency', type=int)
+    invalid_lines = []
+    recipients = iter_stream_recipients(request.stream, template, invalid_lines)
+    
+    def generate():
+        total = success_count = invalid_count = 0
+        for token, result in fcm_service.send_stream(recipients, batch_size, max_workers, priority):
+            while invalid_lines:
+                line_number, error = invalid_lines.pop(0)
+                invalid_count += 1
+                yield dumps({"line": line_number, "error": error}) + b"\n"
+            total += 1
+            success_count += result.success
+            yield dumps({
+                "token": token,
+                "success": result.success,
+                "messageId": result.message_id,
+                "errorCode": result.error_code
+            }) + b"\n"
+        for line_number, error in invalid_lines:
+            invalid_count += 1
+            yield dumps({"line": line_number, "error": error}) + b"\n"
+        yield dumps({
+            "summary": {
+                "total": total,
+                "success": success_count,
+                "failed": total - success_count,
+                "invalidLines": invalid_count
+            }
+        }) + b"\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/send-topic', methods=['POST'])
+@idempotent
 def send_notification_to_topic():
-    """토픽에 푸시 알림 전송"""
+    """토픽 또는 토픽 조건식(condition)에 푸시 알림 전송"""
     try:
-        data = request.get_json()
+        data, template, error = apply_template(request.get_json())
+        if error:
+            return error
         
-        # 필수 필드 검증
-        if not data or not all(k in data for k in ('topic', 'title', 'body')):
+        # 필수 필드, 토픽 이름/조건식 문법, 페이로드 크기 검증 (잘못된 요청은 FCM을 호출하지 않고 거부)
+        error = SEND_TOPIC_SCHEMA(data)
+        if error:
             return jsonify({
-                "error": "topic, title, body는 필수입니다."
+                "error": error
             }), 400
         
-        topic = data['topic']
+        topic = data.get('topic')
+        condition = data.get('condition')
         title = data['title']
         body = data['body']
         custom_data = data.get('data', {})
         
+        priority, error = parse_priority(data.get('priority'))
+        if error:
+            return error
+        
+        run_at, error = parse_schedule(data)
+        if error:
+            return error
+        
+        spill = circuit_open()
+        if spill and job_queue is None:
+            return circuit_open_response()
+        
+        if queue_mode or run_at is not None or spill:
+            return enqueue_job('send-topic', {
+                "topic": topic,
+                "condition": condition,
+                "title": title,
+                "body": body,
+                "data": custom_data,
+                "priority": priority
+            }, run_at)
+        
         # FCM 알림 전송
-        success = fcm_service.send_notification_to_topic(
-            topic=topic,
-            title=title,
-            body=body,
-            data=custom_data
-        )
+        if template is None:
+            template = fcm_service.compile_template(title, body, custom_data, android=False)
+        if condition is not None:
+            success = fcm_service.send_template_to_condition(template, condition, priority)
+        else:
+            success = fcm_service.send_template_to_topic(template, topic, priority)
         
         if success:
             return jsonify({
@@ -146,6 +839,127 @@ def send_notification_to_topic():
             "error": f"서버 오류: {str(e)}"
         }), 500
 
+def manage_topic(subscribe):
+    """요청의 deviceTokens를 topic에 일괄 구독/해지하고 오류 이유별 실패 인덱스 반환"""
+    try:
+        data = request.get_json()
+        
+        # 필수 필드, 토픽 이름, 토큰 검증
+        error = TOPIC_MANAGEMENT_SCHEMA(data)
+        if error:
+            return jsonify({
+                "error": error
+            }), 400
+        
+        device_tokens = data['deviceTokens']
+        
+        manage = fcm_service.subscribe_to_topic if subscribe else fcm_service.unsubscribe_from_topic
+        result = manage(device_tokens, data['topic'], max_workers=data.get('maxConcurrency'))
+        
+        action = "구독" if subscribe else "구독 해지"
+        return jsonify({
+            "message": f"{len(device_tokens)}개 중 {result.success_count}개 {action} 성공",
+            **result.to_dict()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"서버 오류: {str(e)}"
+        }), 500
+
+@app.route('/subscribe-topic', methods=['POST'])
+@idempotent
+def subscribe_to_topic():
+    """여러 디바이스를 토픽에 구독 (1000개씩 나눠 동시 요청)"""
+    return manage_topic(subscribe=True)
+
+@app.route('/unsubscribe-topic', methods=['POST'])
+@idempotent
+def unsubscribe_from_topic():
+    """여러 디바이스의 토픽 구독 해지 (1000개씩 나눠 동시 요청)"""
+    return manage_topic(subscribe=False)
+
+@app.route('/rollouts', methods=['POST'])
+@idempotent
+def start_rollout():
+    """여러 디바이스에 일정 속도로 나눠 전송 (durationSeconds 또는 ratePerSecond + rampUpSeconds)"""
+    try:
+        data, template, error = apply_template(request.get_json())
+        if error:
+            return error
+        
+        # 필수 필드, 형식, 토큰, 페이로드 크기 검증
+        error = ROLLOUT_SCHEMA(data)
+        if error:
+            return jsonify({
+                "error": error
+            }), 400
+        
+        device_tokens = data['deviceTokens']
+        
+        priority, error = parse_priority(data.get('priority'), BULK)
+        if error:
+            return error
+        
+        if template is None:
+            template = fcm_service.compile_template(data['title'], data['body'], data.get('data', {}))
+        try:
+            rollout = fcm_service.start_rollout(
+                template,
+                device_tokens,
+                duration=data.get('durationSeconds'),
+                rate=data.get('ratePerSecond'),
+                ramp_up=data.get('rampUpSeconds') or 0.0,
+                max_workers=data.get('maxConcurrency'),
+                priority=priority
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": f"durationSeconds 또는 ratePerSecond가 올바르지 않습니다: {str(e)}"
+            }), 400
+        
+        return jsonify({
+            "message": f"{len(device_tokens)}개 토큰에 대한 점진 전송을 시작했습니다.",
+            "rolloutId": rollout.id,
+            "etaSeconds": round(rollout.scheduled_duration(), 1),
+            "statusUrl": f"/rollouts/{rollout.id}"
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"서버 오류: {str(e)}"
+        }), 500
+
+@app.route('/rollouts', methods=['GET'])
+def list_rollouts():
+    """점진 전송 목록과 진행률"""
+    fcm_service.prune_rollouts()
+    return jsonify([rollout.progress() for rollout in fcm_service.list_rollouts()])
+
+@app.route('/rollouts/<rollout_id>', methods=['GET'])
+def get_rollout(rollout_id):
+    """점진 전송 진행률 및 예상 남은 시간 조회"""
+    rollout = fcm_service.get_rollout(rollout_id)
+    if rollout is None:
+        return jsonify({
+            "error": "롤아웃을 찾을 수 없습니다."
+        }), 404
+    
+    return jsonify(rollout.progress())
+
+@app.route('/rollouts/<rollout_id>', methods=['DELETE'])
+def cancel_rollout(rollout_id):
+    """점진 전송의 남은 전송 취소"""
+    rollout = fcm_service.get_rollout(rollout_id)
+    if rollout is None:
+        return jsonify({
+            "error": "롤아웃을 찾을 수 없습니다."
+        }), 404
+    
+    rollout.cancel()
+    rollout.wait(timeout=5.0)
+    return jsonify(rollout.progress())
+
 @app.route('/test', methods=['POST'])
 def send_test_notification():
     """테스트용 - Android 앱에 알림 전송"""
@@ -179,6 +993,73 @@ def send_test_notification():
             "error": f"서버 오류: {str(e)}"
         }), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """큐 모드/예약 작업 상태 조회"""
+    if job_queue is None:
+        return jsonify({
+            "error": "큐 모드 또는 예약 전송이 활성화되어 있지 않습니다."
+        }), 404
+    
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "error": "작업을 찾을 수 없습니다."
+        }), 404
+    
+    return jsonify(job)
+
+@app.route('/dead-tokens', methods=['GET'])
+def export_dead_tokens():
+    """사용 불가로 기록된 토큰 목록 내보내기"""
+    if dead_tokens is None:
+        return jsonify({
+            "error": "사용 불가 토큰 레지스트리가 활성화되어 있지 않습니다."
+        }), 404
+    
+    tokens = dead_tokens.export()
+    return jsonify({
+        "count": len(tokens),
+        "tokens": tokens
+    })
+
+@app.route('/dead-tokens', methods=['DELETE'])
+def purge_dead_tokens():
+    """사용 불가 토큰 삭제 (deviceTokens 또는 olderThanSeconds 지정, 전체 삭제는 {"all": true})"""
+    if dead_tokens is None:
+        return jsonify({
+            "error": "사용 불가 토큰 레지스트리가 활성화되어 있지 않습니다."
+        }), 404
+    
+    data = request.get_json(silent=True)
+    error = DEAD_TOKEN_PURGE_SCHEMA(data)
+    if error:
+        return jsonify({
+            "error": error
+        }), 400
+    removed = dead_tokens.purge(
+        tokens=data.get('deviceTokens'),
+        older_than=data.get('olderThanSeconds')
+    )
+    return jsonify({
+        "message": f"{removed}개 토큰을 삭제했습니다.",
+        "removed": removed
+    })
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """준비 상태 (워밍업이 끝나기 전이나 실패했으면 503, readiness probe용, 실패 원인은 warmup.error)"""
+    ready = warmup_done.is_set()
+    return jsonify({
+        "ready": ready,
+        "warmup": warmup_state
+    }), 200 if ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus 형식 지표 (단계별 지연 시간 히스토그램, 오류 코드별 전송 수, 큐 깊이 등)"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 @app.errorhandler(404)
 def not_found(error):
     """404 에러 핸들러"""
@@ -188,8 +1069,22 @@ def not_found(error):
             "GET /",
             "POST /send",
             "POST /send-multiple", 
+            "POST /send-stream",
             "POST /send-topic",
-            "POST /test"
+            "POST /subscribe-topic",
+            "POST /unsubscribe-topic",
+            "POST /rollouts",
+            "GET /rollouts",
+            "GET /rollouts/<id>",
+            "DELETE /rollouts/<id>",
+            "POST /test",
+            "POST /templates",
+            "GET /templates",
+            "GET /jobs/<id>",
+            "GET /dead-tokens",
+            "DELETE /dead-tokens",
+            "GET /metrics",
+            "GET /ready"
         ]
     }), 404
 
@@ -0,0 +1,300 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# 캐시 값: (HTTP 상태 코드, 응답 본문)
+CachedResponse = Tuple[int, str]
+
+# 공유 저장소 정리 주기 (저장 횟수)
+PRUNE_INTERVAL = 100
+
+
+class IdempotencyKeyReused(Exception):
+    """같은 멱등성 키로 처음과 다른 요청 본문이 들어온 경우"""
+
+    def __init__(self, key: str):
+        super().__init__(f"같은 멱등성 키로 다른 요청 본문이 전송되었습니다: {key}")
+        self.key = key
+
+
+def _check_fingerprint(key: str, stored: Optional[str], fingerprint: Optional[str]):
+    """저장된 요청 지문과 다르면 IdempotencyKeyReused 발생 (어느 한쪽이라도 없으면 비교하지 않음)"""
+    if stored is not None and fingerprint is not None and stored != fingerprint:
+        raise IdempotencyKeyReused(key)
+
+
+class _Flight:
+    """같은 키로 동시에 들어온 요청들이 기다리는 진행 중 전송"""
+
+    __slots__ = ("event", "value", "error", "fingerprint")
+
+    def __init__(self, fingerprint: Optional[str]):
+        self.event = threading.Event()
+        self.value: Optional[CachedResponse] = None
+        self.error: Optional[BaseException] = None
+        self.fingerprint = fingerprint
+
+
+class IdempotencyCache:
+    """Idempotency-Key 중복 요청 캐시 (TTL + LRU, single-flight)
+
+    같은 키의 요청이 TTL 안에 다시 오면 FCM을 호출하지 않고 처음 응답을 돌려주며,
+    동시에 진행 중인 중복 요청은 하나의 전송 결과를 함께 기다립니다.
+    요청 본문의 지문(fingerprint)을 함께 저장해 같은 키로 다른 본문이 오면 IdempotencyKeyReused를 발생시킵니다.
+    db_path를 지정하면 여러 워커 프로세스가 SQLite 파일로 키를 공유합니다.
+    5xx 응답은 재시도할 수 있도록 캐시하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_entries: int = 10000,
+        db_path: Optional[str] = None,
+        wait_timeout: float = 60.0
+    ):
+        """
+        캐시 초기화
+
+        Args:
+            ttl: 기본 보관 시간(초)
+            max_entries: 최대 보관 키 수 (초과 시 가장 오래 사용하지 않은 키부터 제거)
+            db_path: 프로세스 간 공유용 SQLite 파일 경로 (선택사항)
+            wait_timeout: 다른 프로세스가 처리 중인 키를 기다리는 최대 시간(초)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse, Optional[str]]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    key TEXT PRIMARY KEY,
+                    status_code INTEGER,
+                    body TEXT,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    fingerprint TEXT
+                )
+            """)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(idempotency_keys)")]
+            if "fingerprint" not in columns:
+                # 요청 본문 지문 이전에 만든 파일
+                self._db.execute("ALTER TABLE idempotency_keys ADD COLUMN fingerprint TEXT")
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stores_since_prune = 0
+
+    def _get_local(self, key: str, now: float, fingerprint: Optional[str]) -> Optional[CachedResponse]:
+        """메모리 캐시 조회 (lock 보유 상태에서 호출)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        _check_fingerprint(key, entry[2], fingerprint)
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put_local(self, key: str, value: CachedResponse, expires_at: float, fingerprint: Optional[str]):
+        """메모리 캐시에 저장하고 LRU 초과분 제거 (lock 보유 상태에서 호출)"""
+        self._entries[key] = (expires_at, value, fingerprint)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_run(
+        self,
+        key: str,
+        func: Callable[[], CachedResponse],
+        ttl: Optional[float] = None,
+        fingerprint: Optional[str] = None
+    ) -> Tuple[CachedResponse, bool]:
+        """
+        캐시된 응답을 반환하거나, 없으면 func를 한 번만 실행하고 결과 저장
+
+        Args:
+            key: 멱등성 키
+            func: 실제 전송을 수행하고 (상태 코드, 응답 본문)을 반환하는 함수
+            ttl: 이 키의 보관 시간(초) (선택사항, 기본값: 캐시 설정)
+            fingerprint: 요청 본문 지문 (선택사항, 저장된 지문과 다르면 재사용하지 않음)
+
+        Returns:
+            Tuple[CachedResponse, bool]: (응답, 캐시에서 재사용했는지 여부)
+
+        Raises:
+            IdempotencyKeyReused: 같은 키로 저장(또는 처리 중)된 요청과 지문이 다른 경우
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        with self._lock:
+            cached = self._get_local(key, time.time(), fingerprint)
+            if cached is not None:
+                self._hits += 1
+                return cached, True
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = _Flight(fingerprint)
+            else:
+                _check_fingerprint(key, flight.fingerprint, fingerprint)
+                self._coalesced += 1
+
+        if not owner:
+            # 같은 프로세스에서 진행 중인 전송 결과를 기다림
+            if not flight.event.wait(self.wait_timeout):
+                raise TimeoutError(f"진행 중인 중복 요청이 끝나지 않았습니다: {key}")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            replayed = False
+            value = self._claim_shared(key, ttl, fingerprint) if self._db is not None else None
+            if value is not None:
+                replayed = True
+                with self._lock:
+                    self._hits += 1
+            else:
+                with self._lock:
+                    self._misses += 1
+                value = func()
+                self._store(key, value, ttl, fingerprint)
+            flight.value = value
+            return value, replayed
+        except IdempotencyKeyReused as e:
+            # 다른 본문으로 선점된 키는 건드리지 않음
+            flight.error = e
+            raise
+        except BaseException as e:
+            flight.error = e
+            if self._db is not None:
+                self._release_shared(key)
+            raise
+        finally:
+            flight.event.set()
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: str, value: CachedResponse, ttl: float, fingerprint: Optional[str]):
+        """성공/클라이언트 오류 응답만 저장 (5xx는 재시도 가능하도록 키 해제)"""
+        now = time.time()
+        if value[0] >= 500:
+            if self._db is not None:
+                self._release_shared(key)
+            return
+
+        with self._lock:
+            self._put_local(key, value, now + ttl, fingerprint)
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "UPDATE idempotency_keys SET status_code = ?, body = ?, expires_at = ?, accessed_at = ? "
+                    "WHERE key = ?",
+                    (value[0], value[1], now + ttl, now, key)
+                )
+                # 정리는 전체 테이블을 훑으므로 일정 횟수마다 한 번만 수행
+                self._stores_since_prune += 1
+                if self._stores_since_prune >= PRUNE_INTERVAL:
+                    self._stores_since_prune = 0
+                    self._prune_shared(now)
+
+    def _claim_shared(self, key: str, ttl: float, fingerprint: Optional[str]) -> Optional[CachedResponse]:
+        """
+        공유 저장소에서 키 선점 (다른 프로세스의 완료된 응답이 있으면 반환)
+
+        다른 프로세스가 처리 중이면 끝날 때까지 기다리고, wait_timeout보다 오래된
+        선점은 중단된 것으로 보고 이어받습니다.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            now = time.time()
+            with self._db_lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._db.execute(
+                        "SELECT status_code, body, expires_at, accessed_at, fingerprint FROM idempotency_keys "
+                        "WHERE key = ?",
+                        (key,)
+                    ).fetchone()
+                    stale = row is not None and (
+                        row[2] <= now or (row[0] is None and now - row[3] > self.wait_timeout)
+                    )
+                    if row is None or stale:
+                        # status_code가 NULL인 행은 처리 중을 뜻함
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO idempotency_keys "
+                            "(key, status_code, body, expires_at, accessed_at, fingerprint) "
+                            "VALUES (?, NULL, NULL, ?, ?, ?)",
+                            (key, now + ttl, now, fingerprint)
+                        )
+                        self._db.execute("COMMIT")
+                        return None
+                    _check_fingerprint(key, row[4], fingerprint)
+                    if row[0] is not None:
+                        self._db.execute(
+                            "UPDATE idempotency_keys SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.execute("COMMIT")
+                        value = (row[0], row[1])
+                        with self._lock:
+                            self._put_local(key, value, row[2], row[4])
+                        return value
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"다른 프로세스에서 처리 중인 요청이 끝나지 않았습니다: {key}")
+            time.sleep(0.05)
+
+    def _release_shared(self, key: str):
+        """처리 중 표시만 남은 키 삭제"""
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND status_code IS NULL", (key,)
+            )
+
+    def _prune_shared(self, now: float):
+        """만료된 키와 max_entries 초과분 삭제 (_db_lock 보유 상태에서 호출)"""
+        self._db.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM idempotency_keys WHERE key IN ("
+            "SELECT key FROM idempotency_keys ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        캐시 통계 반환
+
+        Returns:
+            Dict[str, int]: 보관 키 수, 재사용/신규 실행/동시 중복 병합 횟수
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced
+            }
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,550 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from circuit_breaker import CLOSED as CIRCUIT_CLOSED, CircuitBreaker, CircuitOpenError
+from rate_limiter import RateLimiter
+from validation import ValidationError
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# 다중 전송 작업에서 일부 토큰만 성공
+PARTIAL = "partial"
+# 조회 시에만 쓰는 상태: 대기 중이지만 예약 시각이 아직 되지 않은 작업
+SCHEDULED = "scheduled"
+
+
+def resolve_run_at(
+    send_at: Union[float, str, datetime, None] = None,
+    delay: Optional[float] = None
+) -> Optional[float]:
+    """
+    예약 전송 시각을 Unix 타임스탬프로 변환
+
+    Args:
+        send_at: 전송 시각 (Unix 타임스탬프, ISO 8601 문자열 또는 datetime, 시간대가 없으면 로컬 시간)
+        delay: 지금부터 몇 초 후에 전송할지
+
+    Returns:
+        Optional[float]: 전송 시각 (둘 다 없으면 None, 즉시 전송)
+    """
+    if send_at is not None and delay is not None:
+        raise ValueError("send_at과 delay는 함께 지정할 수 없습니다.")
+    if delay is not None:
+        if isinstance(delay, bool) or not isinstance(delay, (int, float)) or delay < 0:
+            raise ValueError("delay는 0 이상의 초 단위 숫자여야 합니다.")
+        return time.time() + delay
+    if send_at is None:
+        return None
+    if isinstance(send_at, str):
+        try:
+            send_at = datetime.fromisoformat(send_at.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"send_at 형식이 올바르지 않습니다: {send_at}")
+    if isinstance(send_at, datetime):
+        return send_at.timestamp()
+    if isinstance(send_at, bool) or not isinstance(send_at, (int, float)):
+        raise ValueError("send_at은 Unix 타임스탬프 또는 ISO 8601 문자열이어야 합니다.")
+    return float(send_at)
+
+
+class JobQueue:
+    """SQLite(WAL) 기반 로컬 영속 전송 큐
+
+    동시에 들어온 enqueue 요청은 하나의 트랜잭션으로 묶어 커밋하고(그룹 커밋),
+    꺼내간 작업은 임대(lease) 시간 안에 완료되지 않으면 다시 전달됩니다 (at-least-once).
+    예약 작업은 (status, run_at) 인덱스가 디스크 위의 우선순위 큐 역할을 하므로
+    대기 작업이 수백만 개여도 전송 시각이 된 작업만 인덱스 순서대로 꺼냅니다.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "fcm_jobs.db",
+        lease_timeout: float = 300.0,
+        max_attempts: int = 5
+    ):
+        """
+        큐 초기화
+
+        Args:
+            db_path: SQLite 데이터베이스 파일 경로
+            lease_timeout: 작업 임대 시간(초), 초과 시 다른 워커에게 재전달
+            max_attempts: 작업 처리 중 예외가 발생했을 때 최대 시도 횟수
+        """
+        self.db_path = db_path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._has_jobs = threading.Event()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    lease_until REAL,
+                    run_at REAL,
+                    priority INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "run_at" not in columns:
+                # 예약 전송 이전에 만든 큐 파일
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN run_at REAL")
+                self._conn.execute("UPDATE jobs SET run_at = created_at")
+            if "priority" not in columns:
+                # 우선순위 레인 이전에 만든 큐 파일
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, run_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_lane ON jobs (status, priority, run_at)"
+            )
+
+    def recover(self) -> int:
+        """
+        임대가 만료된 처리 중 작업을 다시 대기 상태로 되돌림 (재시작 시 호출)
+
+        같은 큐 파일을 쓰는 다른 워커 프로세스가 아직 처리 중인(임대가 남은) 작업은 건드리지 않으므로
+        여러 프로세스가 동시에 시작해도 중복 전송하지 않습니다.
+
+        Returns:
+            int: 재전달 대상이 된 작업 수
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (QUEUED, now, RUNNING, now)
+            )
+        if cursor.rowcount:
+            self._has_jobs.set()
+        return cursor.rowcount
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        run_at: Optional[float] = None,
+        priority: int = 0
+    ) -> str:
+        """
+        작업을 영속 저장하고 작업 ID 반환 (커밋된 후 반환)
+
+        Args:
+            kind: 작업 종류 (send, send-multiple, send-topic)
+            payload: 전송 함수에 전달할 인자
+            run_at: 전송 시각 (Unix 타임스탬프, 선택사항, 없으면 즉시)
+            priority: 꺼내는 순서 (작을수록 먼저, 전송 시각이 된 작업끼리 비교)
+
+        Returns:
+            str: 작업 ID
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._pending_lock:
+            self._pending.append(
+                (job_id, kind, json.dumps(payload), QUEUED, now, now, run_at if run_at is not None else now, priority)
+            )
+
+        # 락을 먼저 얻은 스레드가 그 사이에 쌓인 작업을 한 트랜잭션으로 모두 커밋
+        with self._lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at, run_at, priority) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+        self._has_jobs.set()
+        return job_id
+
+    def claim(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        전송 시각이 된 작업을 우선순위, 예약 시각 순으로 임대하여 반환
+
+        Args:
+            limit: 최대 작업 수
+
+        Returns:
+            List[Dict[str, Any]]: 작업 목록 (id, kind, payload, attempts)
+        """
+        # 조회 전에 신호를 지워야 그 사이에 들어온 enqueue 신호를 놓치지 않음
+        self._has_jobs.clear()
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 임대가 만료된 작업을 먼저, 이어서 우선순위별로 전송 시각이 된 작업
+                rows = self._conn.execute(
+                    "SELECT id, kind, payload, attempts FROM jobs "
+                    "WHERE status = ? AND lease_until < ? LIMIT ?",
+                    (RUNNING, now, limit)
+                ).fetchall()
+                # 우선순위마다 (status, priority, run_at) 인덱스 범위만 읽음 (한 쿼리로 ORDER BY priority, run_at을
+                # 하면 run_at 조건이 인덱스에 걸리지 않아 높은 우선순위의 미래 예약 작업을 매번 모두 훑음)
+                next_priority = "SELECT MIN(priority) FROM jobs WHERE status = ?"
+                priority = self._conn.execute(next_priority, (QUEUED,)).fetchone()[0]
+                while priority is not None and len(rows) < limit:
+                    rows += self._conn.execute(
+                        "SELECT id, kind, payload, attempts FROM jobs "
+                        "WHERE status = ? AND priority = ? AND run_at <= ? ORDER BY run_at LIMIT ?",
+                        (QUEUED, priority, now, limit - len(rows))
+                    ).fetchall()
+                    priority = self._conn.execute(
+                        next_priority + " AND priority > ?", (QUEUED, priority)
+                    ).fetchone()[0]
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    [(RUNNING, now + self.lease_timeout, now, row["id"]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if len(rows) == limit:
+            self._has_jobs.set()
+
+        return [
+            {
+                "id": row["id"],
+                "kind": row["kind"],
+                "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] + 1
+            }
+            for row in rows
+        ]
+
+    def complete(
+        self,
+        job_id: str,
+        success: bool,
+        result: Any = None,
+        error: Optional[str] = None,
+        status: Optional[str] = None
+    ):
+        """
+        작업 처리 결과 기록
+
+        Args:
+            job_id: 작업 ID
+            success: 전송 성공 여부
+            result: 전송 결과 (JSON 직렬화 가능 값)
+            error: 오류 메시지
+            status: 기록할 상태 (선택사항, 기본값: success에 따라 succeeded/failed, 일부 성공이면 partial)
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (status or (SUCCEEDED if success else FAILED), json.dumps(result), error, time.time(), job_id)
+            )
+
+    def extend_lease(self, job_id: str) -> bool:
+        """
+        처리 중인 작업의 임대를 lease_timeout만큼 연장 (처리가 임대 시간보다 오래 걸리는 작업의 하트비트)
+
+        Args:
+            job_id: 작업 ID
+
+        Returns:
+            bool: 연장했으면 True (이미 완료되었거나 처리 중이 아니면 False)
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (now + self.lease_timeout, now, job_id, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def checkpoint(self, job_id: str, payload: Dict[str, Any]) -> bool:
+        """
+        처리 중인 작업의 진행 상황을 payload로 저장하고 임대 연장
+
+        예외로 다시 시도하거나(release) 회로 차단으로 되돌린(defer) 작업은 저장된 payload부터 이어서 처리하므로
+        이미 보낸 토큰을 다시 보내지 않습니다.
+
+        Args:
+            job_id: 작업 ID
+            payload: 남은 작업을 나타내는 payload
+
+        Returns:
+            bool: 저장했으면 True (처리 중이 아니면 False)
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET payload = ?, lease_until = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (json.dumps(payload), now + self.lease_timeout, now, job_id, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def release(self, job_id: str, attempts: int, error: str):
+        """
+        처리 중 예외가 난 작업을 다시 대기 상태로 되돌림 (최대 시도 횟수 초과 시 실패 처리)
+
+        Args:
+            job_id: 작업 ID
+            attempts: 지금까지의 시도 횟수
+            error: 오류 메시지
+        """
+        status = FAILED if attempts >= self.max_attempts else QUEUED
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+        if status == QUEUED:
+            self._has_jobs.set()
+
+    def defer(self, job_id: str, run_at: float, error: str):
+        """
+        보내지 못한 작업을 시도 횟수에 포함하지 않고 run_at에 다시 전송하도록 되돌림 (회로 차단 시 백로그)
+
+        Args:
+            job_id: 작업 ID
+            run_at: 다시 전송할 시각 (Unix 타임스탬프)
+            error: 오류 메시지
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, run_at = ?, error = ?, "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (QUEUED, run_at, error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태 조회
+
+        Args:
+            job_id: 작업 ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 작업 정보 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, attempts, result, error, created_at, updated_at, run_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status = row["status"]
+        if status == QUEUED and row["run_at"] > time.time():
+            status = SCHEDULED
+        return {
+            "jobId": row["id"],
+            "kind": row["kind"],
+            "status": status,
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+            "runAt": row["run_at"]
+        }
+
+    def depth(self) -> int:
+        """대기 중인 작업 수 (예약 작업 포함)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+
+    def next_run_at(self) -> Optional[float]:
+        """가장 이른 대기 작업의 전송 시각 (없으면 None)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(run_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+
+    def wait_for_jobs(self, timeout: float) -> bool:
+        """새 작업이 들어오거나 timeout이 지날 때까지 대기"""
+        return self._has_jobs.wait(timeout)
+
+    def notify(self):
+        """대기 중인 워커를 깨움"""
+        self._has_jobs.set()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobWorkerPool:
+    """큐에서 작업을 꺼내 FCMService로 전송하는 백그라운드 워커 풀"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any], Callable[[Dict[str, Any]], bool]], Any]],
+        workers: int = 4,
+        batch_size: int = 4,
+        poll_interval: float = 1.0,
+        release_rate: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        drain_rate: Optional[float] = None
+    ):
+        """
+        워커 풀 초기화
+
+        Args:
+            queue: 작업 큐
+            handlers: 작업 종류별 처리 함수 (payload와 진행 상황 저장 함수를 받아 결과 반환, 결과의 참/거짓으로
+                성공 판단, successCount/failureCount/notAttempted가 있는 딕셔너리면 개수로 판단)
+            workers: 워커 스레드 수
+            batch_size: 한 번에 임대할 작업 수
+            poll_interval: 작업이 없을 때 큐를 다시 확인하는 최대 간격(초)
+            release_rate: 초당 처리할 최대 작업 수 (선택사항, 같은 시각에 예약된 작업이 몰려도 나눠서 전송)
+            circuit_breaker: FCMService와 공유하는 회로 차단기 (선택사항, 열려 있는 동안 작업을 꺼내지 않음)
+            drain_rate: 회로 차단으로 쌓인 백로그를 복구 후 처리할 초당 작업 수 (선택사항)
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._pacer = RateLimiter(rate=release_rate, burst=batch_size) if release_rate else None
+        self.circuit_breaker = circuit_breaker
+        self._drain_pacer = RateLimiter(rate=drain_rate, burst=batch_size) if drain_rate else None
+        # 회로 차단으로 되돌린 작업이 남아 있는 동안 True (drain_rate로 처리)
+        self._draining = False
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """이전 실행에서 처리 중이던 작업을 되돌리고 워커 시작"""
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"재전달 대상 작업 {recovered}개 복구")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"fcm-job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        breaker = self.circuit_breaker
+        while not self._stop_event.is_set():
+            limit = self.batch_size
+            if breaker is not None and breaker.state != CIRCUIT_CLOSED:
+                if breaker.is_open():
+                    # 회로가 열려 있는 동안 작업은 큐(백로그)에 그대로 둠
+                    self._stop_event.wait(min(breaker.retry_after(), self.poll_interval))
+                    continue
+                # 시험 요청 중에는 작업을 하나씩만 처리
+                limit = 1
+
+            jobs = self.queue.claim(limit)
+            if not jobs:
+                self._draining = False
+                self.queue.wait_for_jobs(self._idle_timeout())
+                continue
+
+            # 꺼낸 작업이 모두 끝날 때까지 임대를 연장해 대기 중이거나 오래 걸리는 작업이
+            # 다른 워커에게 다시 전달되지 않도록 함
+            pending = {job["id"] for job in jobs}
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(pending, done), name="fcm-job-heartbeat", daemon=True
+            )
+            heartbeat.start()
+            try:
+                for job in jobs:
+                    pacer = self._drain_pacer if self._draining and self._drain_pacer is not None else self._pacer
+                    if pacer is not None:
+                        pacer.acquire()
+                    self._process(job)
+                    pending.discard(job["id"])
+            finally:
+                done.set()
+                heartbeat.join()
+
+    def _idle_timeout(self) -> float:
+        """다음 예약 작업의 전송 시각까지 대기 (poll_interval보다 오래 기다리지 않음)"""
+        next_run_at = self.queue.next_run_at()
+        if next_run_at is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.01, next_run_at - time.time()))
+
+    def _process(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.queue.complete(job["id"], False, error=f"알 수 없는 작업 종류: {job['kind']}")
+            return
+
+        try:
+            result = handler(job["payload"], lambda payload: self.queue.checkpoint(job["id"], payload))
+        except CircuitOpenError as e:
+            self.queue.defer(job["id"], time.time() + e.retry_after, str(e))
+            self._draining = True
+            return
+        except ValidationError as e:
+            # 잘못된 payload는 다시 시도해도 실패하므로 바로 실패 처리
+            self.queue.complete(job["id"], False, error=str(e))
+            return
+        except Exception as e:
+            print(f"작업 처리 중 오류 발생 ({job['id']}): {str(e)}")
+            self.queue.release(job["id"], job["attempts"], str(e))
+            return
+
+        if isinstance(result, dict) and "failureCount" in result:
+            failed = result["failureCount"] + result.get("notAttempted", 0)
+            status = SUCCEEDED if not failed else PARTIAL if result.get("successCount") else FAILED
+            self.queue.complete(job["id"], status == SUCCEEDED, result=result, status=status)
+        else:
+            self.queue.complete(job["id"], bool(result), result=result)
+
+    def _heartbeat(self, pending: Set[str], done: threading.Event):
+        """작업이 끝날 때까지 lease_timeout의 1/3마다 아직 끝나지 않은 작업의 임대 연장"""
+        interval = max(0.01, self.queue.lease_timeout / 3)
+        while not done.wait(interval):
+            for job_id in list(pending):
+                self.queue.extend_lease(job_id)
+
+    def stop(self, timeout: float = 5.0):
+        """워커 종료 (처리 중인 작업은 끝까지 처리)"""
+        self._stop_event.set()
+        self.queue.notify()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
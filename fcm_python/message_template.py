@@ -0,0 +1,77 @@
+import json
+import re
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 이스케이프 없이 그대로 넣을 수 있는 토큰/토픽 문자
+_SAFE_VALUE = re.compile(r"[A-Za-z0-9_:.~%\-]*\Z")
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON 직렬화 (orjson이 설치되어 있으면 사용)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_string(value: str) -> bytes:
+    """문자열을 JSON 문자열 리터럴로 인코딩 (일반적인 토큰은 이스케이프 생략)"""
+    if _SAFE_VALUE.match(value):
+        return b'"' + value.encode("ascii") + b'"'
+    return dumps(value)
+
+
+class MessageTemplate:
+    """수신 대상만 다른 FCM 메시지를 위한 사전 인코딩 템플릿
+
+    notification/data/android 섹션은 생성 시 한 번만 직렬화하고,
+    전송할 때는 대상(token/topic/condition) 값만 이스케이프하여 앞에 붙입니다.
+    """
+
+    __slots__ = ("title", "body", "data", "fields", "_suffix")
+
+    def __init__(
+        self,
+        fields: Dict[str, Any],
+        title: Optional[str] = None,
+        body: Optional[str] = None,
+        data: Optional[Dict[str, str]] = None
+    ):
+        """
+        템플릿 컴파일
+
+        Args:
+            fields: 대상 필드를 제외한 message 내용 (notification, data, android 등)
+            title: 알림 제목 (큐 저장 등 원래 값이 필요할 때 사용)
+            body: 알림 내용
+            data: 추가 데이터
+        """
+        self.title = title
+        self.body = body
+        self.data = data
+        self.fields = fields
+
+        encoded = dumps(fields)
+        # '{"message":{"token":"..."' 뒤에 이어 붙일 나머지 필드와 닫는 괄호
+        self._suffix = (b"," + encoded[1:] if len(encoded) > 2 else b"}") + b"}"
+
+    def render(self, target: str, value: str) -> bytes:
+        """
+        대상 값을 넣은 요청 본문 생성
+
+        Args:
+            target: 대상 필드 이름 (token, topic, condition)
+            value: 대상 값
+
+        Returns:
+            bytes: 인코딩된 {"message": {...}} 본문
+        """
+        return b'{"message":{"' + target.encode("ascii") + b'":' + encode_string(value) + self._suffix
+
+    def render_token(self, device_token: str) -> bytes:
+        """디바이스 토큰용 요청 본문 생성"""
+        return b'{"message":{"token":' + encode_string(device_token) + self._suffix
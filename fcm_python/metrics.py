@@ -0,0 +1,294 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 지연 시간 히스토그램 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class _Shard:
+    """스레드 하나가 단독으로 쓰는 측정값 저장소 (쓰는 쪽은 락이 필요 없음)"""
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        # (지표 이름, 레이블 값) -> 카운터/게이지 증감 값 또는 히스토그램 [버킷별 개수..., 합계, 개수]
+        self.values: Dict[Tuple[str, Labels], object] = {}
+
+
+class MetricsRegistry:
+    """스레드별로 모아 두었다가 조회할 때 합산하는 Prometheus 형식 지표 저장소
+
+    전송 경로에서는 현재 스레드의 저장소에만 쓰므로 락을 잡지 않습니다.
+    종료된 스레드의 값은 조회 시 별도 저장소로 합쳐 보존합니다.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        self._retired = _Shard()
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead(self):
+        """종료된 스레드의 값을 보존용 저장소로 합침 (lock 보유 상태에서 호출)"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _merge(self._retired.values, shard.values)
+        self._shards = alive
+
+    def _register(self, metric: "_Metric") -> "_Metric":
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> "Counter":
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> "Gauge":
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> "Histogram":
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def collect(self) -> Dict[Tuple[str, Labels], object]:
+        """모든 스레드의 값을 합산"""
+        with self._lock:
+            self._retire_dead()
+            shards = [shard for _, shard in self._shards]
+            totals: Dict[Tuple[str, Labels], object] = {}
+            _merge(totals, self._retired.values)
+        for shard in shards:
+            # 다른 스레드가 쓰는 중일 수 있으므로 복사본을 합침
+            _merge(totals, dict(shard.values))
+        return totals
+
+    def render(self) -> str:
+        """
+        Prometheus 텍스트 형식(0.0.4)으로 출력
+
+        Returns:
+            str: /metrics 응답 본문
+        """
+        totals = self.collect()
+        by_metric: Dict[str, List[Tuple[Labels, object]]] = {}
+        for (name, labels), value in totals.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            samples = by_metric.get(metric.name, [])
+            if metric.function is not None:
+                samples = metric.sample_function()
+            lines.extend(metric.render(sorted(samples, key=lambda sample: sample[0])))
+        return "\n".join(lines) + "\n"
+
+
+def _merge(target: Dict, source: Dict):
+    for key, value in source.items():
+        current = target.get(key)
+        if isinstance(value, list):
+            if current is None:
+                target[key] = list(value)
+            else:
+                for i, item in enumerate(value):
+                    current[i] += item
+        else:
+            target[key] = (current or 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labels: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.function: Optional[Callable[[], object]] = None
+
+    def sample_function(self) -> List[Tuple[Labels, object]]:
+        return []
+
+    def render(self, samples: List[Tuple[Labels, object]]) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in samples
+        ]
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값"""
+
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        values = self.registry._shard().values
+        key = (self.name, labels)
+        values[key] = values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """올라가고 내려가는 현재 값 (inc/dec 또는 조회 시 호출할 함수)"""
+
+    kind = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        values = self.registry._shard().values
+        key = (self.name, labels)
+        values[key] = values.get(key, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+    def set_function(self, function: Callable[[], object]):
+        """
+        조회할 때마다 함수 값을 사용 (큐 깊이처럼 다른 곳에 이미 있는 값)
+
+        Args:
+            function: 레이블이 없으면 숫자, 있으면 {레이블 값 튜플: 숫자}를 반환하는 함수
+        """
+        self.function = function
+
+    def sample_function(self) -> List[Tuple[Labels, object]]:
+        try:
+            value = self.function()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            return list(value.items())
+        return [((), value)]
+
+    @contextmanager
+    def track_inprogress(self, labels: Labels = ()) -> Iterator[None]:
+        """블록 실행 중에만 1 증가"""
+        self.inc(labels)
+        try:
+            yield
+        finally:
+            self.dec(labels)
+
+
+class Histogram(_Metric):
+    """구간별 개수와 합계를 누적하는 분포 (지연 시간 등)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float]
+    ):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()):
+        values = self.registry._shard().values
+        key = (self.name, labels)
+        counts = values.get(key)
+        if counts is None:
+            # 버킷별 개수(+Inf 포함), 합계, 개수
+            counts = values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    @contextmanager
+    def time(self, labels: Labels = ()) -> Iterator[None]:
+        """블록 실행 시간(초) 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, labels)
+
+    def render(self, samples: List[Tuple[Labels, object]]) -> List[str]:
+        lines = []
+        for labels, counts in samples:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                extra = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, extra)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {counts[-1]}")
+        return lines
+
+
+# 기본 저장소와 전송 경로 지표
+REGISTRY = MetricsRegistry()
+
+TOKEN_SECONDS = REGISTRY.histogram(
+    "fcm_access_token_seconds", "액세스 토큰 획득 시간(초)"
+)
+SERIALIZE_SECONDS = REGISTRY.histogram(
+    "fcm_serialize_seconds", "요청 본문 직렬화 시간(초)",
+    buckets=(0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005)
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "fcm_http_seconds", "FCM HTTP 요청 왕복 시간(초)", ("code",)
+)
+SENDS_TOTAL = REGISTRY.counter(
+    "fcm_sends_total", "FCM 전송 시도 수 (결과 코드별)", ("code",)
+)
+INFLIGHT = REGISTRY.gauge(
+    "fcm_inflight_requests", "진행 중인 FCM HTTP 요청 수"
+)
+LANE_WAIT_SECONDS = REGISTRY.histogram(
+    "fcm_lane_wait_seconds", "우선순위 레인별 전송 슬롯 대기 시간(초)", ("lane",)
+)
+LANE_SEND_SECONDS = REGISTRY.histogram(
+    "fcm_lane_send_seconds", "우선순위 레인별 전송 시간(초, 슬롯 대기 포함)", ("lane",)
+)
+TOPIC_MANAGEMENT_SECONDS = REGISTRY.histogram(
+    "fcm_topic_management_seconds", "토픽 구독/해지 일괄 요청 왕복 시간(초)", ("operation", "code")
+)
@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+from metrics import LANE_WAIT_SECONDS
+
+# 우선순위(레인): 튜플 순서가 큐 작업을 꺼내는 순서
+HIGH = "high"
+NORMAL = "normal"
+BULK = "bulk"
+LANES = (HIGH, NORMAL, BULK)
+
+# 모든 레인에 대기 요청이 있을 때 슬롯을 나눠 주는 비율
+DEFAULT_WEIGHTS: Dict[str, float] = {HIGH: 8.0, NORMAL: 3.0, BULK: 1.0}
+
+
+def resolve_lane(priority: Optional[str], default: str = NORMAL) -> str:
+    """
+    요청의 우선순위 값을 레인 이름으로 변환
+
+    Args:
+        priority: high, normal, bulk 또는 None
+        default: 지정하지 않았을 때 사용할 레인
+
+    Returns:
+        str: 레인 이름
+    """
+    if priority is None:
+        return default
+    if priority not in LANES:
+        raise ValueError(f"priority는 {', '.join(LANES)} 중 하나여야 합니다: {priority}")
+    return priority
+
+
+def lane_rank(lane: str) -> int:
+    """큐 정렬용 우선순위 값 (작을수록 먼저)"""
+    return LANES.index(lane)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """
+    "high=8,normal=3,bulk=1" 형식의 가중치 문자열 해석
+
+    Args:
+        spec: 레인=가중치 목록 (쉼표 구분, 빠진 레인은 기본값)
+
+    Returns:
+        Dict[str, float]: 레인별 가중치
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        lane, _, weight = item.partition("=")
+        weights[resolve_lane(lane.strip())] = float(weight)
+    return weights
+
+
+class LaneScheduler:
+    """동시 전송 슬롯을 우선순위 레인별로 가중 공정 분배하는 스케줄러
+
+    capacity개의 슬롯(= 동시에 진행할 FCM 요청 수, 커넥션 풀 크기에 맞춤)을 두고, 슬롯이 부족하면
+    레인별 대기열에 줄을 세웁니다. 슬롯이 반납되면 대기 중인 레인 중 가상 시각(pass)이 가장 작은
+    레인에 넘겨주므로(stride scheduling), 모든 레인이 밀려 있어도 레인별로 가중치 비율만큼 슬롯을 받습니다.
+    reserved 슬롯은 해당 레인만 쓸 수 있어 대량 전송이 모든 연결을 차지해도 높은 우선순위 전송은 바로 시작합니다.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 32,
+        weights: Optional[Dict[str, float]] = None,
+        reserved: Optional[Dict[str, int]] = None
+    ):
+        """
+        스케줄러 초기화
+
+        Args:
+            capacity: 전체 동시 전송 슬롯 수 (전송 계층의 커넥션 풀 크기 이하 권장)
+            weights: 레인별 가중치 (기본값: high 8, normal 3, bulk 1)
+            reserved: 레인별 전용 슬롯 수 (기본값: high에 전체의 1/4, 최소 1개이되 공용 슬롯을 1개 이상 남김)
+        """
+        if capacity < 1:
+            raise ValueError("capacity는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        # capacity가 1이면 전용 슬롯 없이 모든 레인이 하나를 공유
+        self.reserved = reserved if reserved is not None else {HIGH: min(max(1, capacity // 4), capacity - 1)}
+        if sum(self.reserved.values()) >= capacity:
+            raise ValueError("전용 슬롯 합계는 capacity보다 작아야 합니다.")
+
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waiters: Dict[str, Deque[threading.Event]] = {lane: deque() for lane in LANES}
+        self._waiting = 0
+        self._pass: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._vtime = 0.0
+        self._granted: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    def _can_take(self, lane: str) -> bool:
+        """다른 레인의 남은 전용 슬롯을 침범하지 않고 슬롯을 받을 수 있는지 (lock 보유 상태에서 호출)"""
+        free = self.capacity - self._in_use
+        held_for_others = sum(
+            max(0, count - self._active[other])
+            for other, count in self.reserved.items()
+            if other != lane
+        )
+        return free > held_for_others
+
+    def _take(self, lane: str):
+        self._in_use += 1
+        self._active[lane] += 1
+        self._granted[lane] += 1
+        self._vtime = self._pass[lane]
+        self._pass[lane] += 1.0 / self.weights[lane]
+
+    def _dispatch(self):
+        """반납된 슬롯을 대기 중인 레인에 가중치 순서대로 넘겨줌 (lock 보유 상태에서 호출)"""
+        while self._waiting:
+            candidates = [lane for lane in LANES if self._waiters[lane] and self._can_take(lane)]
+            if not candidates:
+                return
+            lane = min(candidates, key=lambda name: self._pass[name])
+            self._take(lane)
+            self._waiting -= 1
+            self._waiters[lane].popleft().set()
+
+    def acquire(self, lane: str) -> float:
+        """
+        레인의 전송 슬롯 획득 (슬롯이 없으면 차례가 올 때까지 대기)
+
+        Args:
+            lane: 레인 이름
+
+        Returns:
+            float: 대기한 시간(초)
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if not self._waiting and self._can_take(lane):
+                self._take(lane)
+                LANE_WAIT_SECONDS.observe(0.0, (lane,))
+                return 0.0
+            if not self._waiters[lane]:
+                # 쉬고 있던 레인이 그동안 쌓인 몫으로 다른 레인을 밀어내지 않도록 현재 가상 시각부터 시작
+                self._pass[lane] = max(self._pass[lane], self._vtime)
+            event = threading.Event()
+            self._waiters[lane].append(event)
+            self._waiting += 1
+            self._dispatch()
+        event.wait()
+        waited = time.perf_counter() - started
+        LANE_WAIT_SECONDS.observe(waited, (lane,))
+        return waited
+
+    def release(self, lane: str):
+        """슬롯 반납 (대기 중인 요청이 있으면 바로 넘겨줌)"""
+        with self._lock:
+            self._in_use -= 1
+            self._active[lane] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, lane: str) -> Iterator[None]:
+        """블록 실행 동안 레인의 전송 슬롯 사용"""
+        self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def waiting(self) -> Dict[str, int]:
+        """레인별 슬롯 대기 수"""
+        with self._lock:
+            return {lane: len(self._waiters[lane]) for lane in LANES}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        레인별 상태 반환
+
+        Returns:
+            Dict[str, Dict[str, int]]: 레인별 사용 중 슬롯, 대기 수, 누적 할당 수
+        """
+        with self._lock:
+            return {
+                lane: {
+                    "active": self._active[lane],
+                    "waiting": len(self._waiters[lane]),
+                    "granted": self._granted[lane]
+                }
+                for lane in LANES
+            }
@@ -0,0 +1,271 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from fcm_errors import QUOTA, SendResult
+
+# 공유 파일 상태: 토큰 수, 마지막 충전 시각, 현재 속도, 마지막 감소 시각, 마지막 증가 시각
+_STATE_FORMAT = "<ddddd"
+_STATE_SIZE = struct.calcsize(_STATE_FORMAT)
+
+# 이 상태 코드는 FCM 측 과부하로 보고 속도를 줄임
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class RateLimiter:
+    """모든 전송 경로 앞에 두는 토큰 버킷 전송 속도 제한기
+
+    adaptive=True이면 AIMD 방식으로 동작합니다. 429/503 응답에는 속도를 곱셈으로 줄이고,
+    성공이 increase_interval 동안 이어지면 increase_step만큼 올려 한도를 탐색합니다.
+    shared_path를 지정하면 같은 호스트의 여러 프로세스가 파일 하나로 버킷을 공유합니다.
+    """
+
+    def __init__(
+        self,
+        rate: float = 500.0,
+        burst: Optional[float] = None,
+        adaptive: bool = False,
+        min_rate: float = 1.0,
+        max_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: Optional[float] = None,
+        increase_interval: float = 5.0,
+        decrease_cooldown: float = 1.0,
+        shared_path: Optional[str] = None
+    ):
+        """
+        속도 제한기 초기화
+
+        Args:
+            rate: 초당 허용 전송 수
+            burst: 버킷 크기 (기본값: 1초 분량)
+            adaptive: AIMD 자동 조절 사용 여부
+            min_rate: 자동 조절 시 최소 속도
+            max_rate: 자동 조절 시 최대 속도 (기본값: 초기 속도의 4배)
+            decrease_factor: 스로틀 응답 시 속도에 곱할 비율
+            increase_step: 성공이 이어질 때 올릴 속도 (기본값: 초기 속도의 5%)
+            increase_interval: 속도를 올리기 전에 필요한 연속 성공 시간(초)
+            decrease_cooldown: 연속된 스로틀 응답에 대해 속도를 다시 줄이기까지의 최소 간격(초)
+            shared_path: 프로세스 간 공유 상태 파일 경로 (선택사항, POSIX 전용)
+        """
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step if increase_step is not None else max(1.0, rate * 0.05)
+        self.increase_interval = increase_interval
+        self.decrease_cooldown = decrease_cooldown
+        self.shared_path = shared_path
+
+        now = time.time()
+        self._lock = threading.Lock()
+        self._state: List[float] = [self.burst, now, rate, 0.0, now]
+        self._fd: Optional[int] = None
+
+        if shared_path is not None:
+            if fcntl is None:
+                raise RuntimeError("프로세스 간 속도 제한 공유는 POSIX 환경에서만 지원됩니다.")
+            self._fd = os.open(shared_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size < _STATE_SIZE:
+                    os.pwrite(self._fd, struct.pack(_STATE_FORMAT, *self._state), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._acquired = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+
+    def _with_state(self, func: Callable[[List[float], float], float]) -> float:
+        """버킷 상태를 잠그고 func(state, now) 실행 (공유 모드면 파일 잠금 후 읽고 씀)"""
+        with self._lock:
+            if self._fd is None:
+                return func(self._state, time.time())
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                state = list(struct.unpack(_STATE_FORMAT, os.pread(self._fd, _STATE_SIZE, 0)))
+                value = func(state, time.time())
+                os.pwrite(self._fd, struct.pack(_STATE_FORMAT, *state), 0)
+                return value
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    async def _with_state_async(self, func: Callable[[List[float], float], float]) -> float:
+        """
+        이벤트 루프를 막지 않고 _with_state 실행
+
+        공유 모드의 파일 잠금은 다른 프로세스가 잠금을 풀 때까지 기다리므로 스레드 풀에서 실행합니다.
+        프로세스 내 모드는 잠금을 잠깐만 잡으므로 바로 실행합니다.
+        """
+        if self._fd is None:
+            return self._with_state(func)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._with_state, func)
+
+    def _try_take(self, state: List[float], now: float) -> float:
+        """토큰 하나를 가져오고, 부족하면 기다려야 할 시간(초) 반환"""
+        tokens, last, rate = state[0], state[1], state[2]
+        tokens = min(self.burst, tokens + max(0.0, now - last) * rate)
+        state[1] = now
+        if tokens >= 1.0:
+            state[0] = tokens - 1.0
+            return 0.0
+        state[0] = tokens
+        return (1.0 - tokens) / rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        전송 허가를 받을 때까지 대기
+
+        Args:
+            timeout: 최대 대기 시간(초) (선택사항, 없으면 무기한 대기)
+
+        Returns:
+            bool: 허가를 받았으면 True, 시간 내에 받지 못하면 False
+        """
+        started = time.monotonic()
+        while True:
+            wait = self._with_state(self._try_take)
+            if wait <= 0:
+                self._record_acquired(started)
+                return True
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """
+        전송 허가를 받을 때까지 이벤트 루프를 막지 않고 대기 (AsyncFCMService용, 버킷은 동기 전송과 공유)
+
+        Args:
+            timeout: 최대 대기 시간(초) (선택사항, 없으면 무기한 대기)
+
+        Returns:
+            bool: 허가를 받았으면 True, 시간 내에 받지 못하면 False
+        """
+        started = time.monotonic()
+        while True:
+            wait = await self._with_state_async(self._try_take)
+            if wait <= 0:
+                self._record_acquired(started)
+                return True
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            await asyncio.sleep(wait)
+
+    def _record_acquired(self, started: float):
+        waited = time.monotonic() - started
+        with self._lock:
+            self._acquired += 1
+            self._wait_seconds += waited
+
+    def on_result(self, result: SendResult):
+        """
+        전송 결과를 반영하여 속도 조절 (adaptive 모드에서만)
+
+        Args:
+            result: 전송 결과
+        """
+        adjust = self._adjuster(result)
+        if adjust is not None and self._with_state(adjust):
+            with self._lock:
+                self._throttled += 1
+
+    async def on_result_async(self, result: SendResult):
+        """
+        이벤트 루프를 막지 않고 전송 결과를 반영 (AsyncFCMService용, on_result와 같은 규칙)
+
+        Args:
+            result: 전송 결과
+        """
+        adjust = self._adjuster(result)
+        if adjust is not None and await self._with_state_async(adjust):
+            with self._lock:
+                self._throttled += 1
+
+    def _adjuster(self, result: SendResult) -> Optional[Callable[[List[float], float], float]]:
+        """전송 결과에 따라 버킷 속도를 바꾸는 함수 반환 (바꿀 필요가 없으면 None, 줄였으면 함수가 1.0 반환)"""
+        if not self.adaptive:
+            return None
+
+        throttled = result.status_code in THROTTLE_STATUS_CODES or result.error_class == QUOTA
+        if not throttled and not result.success:
+            return None
+
+        def _adjust(state: List[float], now: float) -> float:
+            rate, last_decrease, last_change = state[2], state[3], state[4]
+            if throttled:
+                if now - last_decrease >= self.decrease_cooldown:
+                    state[2] = max(self.min_rate, rate * self.decrease_factor)
+                    state[3] = now
+                    state[4] = now
+                    return 1.0
+            elif now - last_change >= self.increase_interval:
+                state[2] = min(self.max_rate, rate + self.increase_step)
+                state[4] = now
+            return 0.0
+
+        return _adjust
+
+    @property
+    def current_rate(self) -> float:
+        """현재 초당 허용 전송 수"""
+        return self._with_state(lambda state, now: state[2])
+
+    def shard_config(self, shards: int) -> Dict:
+        """
+        다른 프로세스에서 같은 한도를 나눠 쓰는 속도 제한기의 생성 인자 반환
+
+        공유 파일을 사용하면 모든 프로세스가 같은 버킷을 쓰고, 그렇지 않으면 한도를 shards로 나눕니다.
+
+        Args:
+            shards: 한도를 나눠 쓸 프로세스 수
+
+        Returns:
+            Dict: RateLimiter(**config)로 넘길 인자
+        """
+        share = 1 if self.shared_path is not None else max(1, shards)
+        return {
+            "rate": self.current_rate / share,
+            "burst": max(1.0, self.burst / share),
+            "adaptive": self.adaptive,
+            "min_rate": self.min_rate / share,
+            "max_rate": self.max_rate / share,
+            "decrease_factor": self.decrease_factor,
+            "increase_step": self.increase_step / share,
+            "increase_interval": self.increase_interval,
+            "decrease_cooldown": self.decrease_cooldown,
+            "shared_path": self.shared_path
+        }
+
+    def stats(self) -> Dict[str, float]:
+        """
+        속도 제한 통계 반환
+
+        Returns:
+            Dict[str, float]: 현재 속도, 허가 수, 속도 감소 횟수, 누적 대기 시간(초)
+        """
+        rate = self.current_rate
+        with self._lock:
+            return {
+                "rate": round(rate, 2),
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "wait_seconds": round(self._wait_seconds, 3)
+            }
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
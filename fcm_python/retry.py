@@ -0,0 +1,73 @@
+import random
+from typing import Optional
+
+from fcm_errors import AUTH, CIRCUIT_OPEN, SendResult
+
+
+class RetryPolicy:
+    """오류 분류 기반 재시도 정책 (지터가 적용된 지수 백오프 + Retry-After 준수)"""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 60.0,
+        multiplier: float = 2.0,
+        max_auth_attempts: int = 2
+    ):
+        """
+        재시도 정책 초기화
+
+        Args:
+            max_attempts: 메시지당 최대 시도 횟수 (첫 시도 포함)
+            base_delay: 첫 재시도 기본 대기 시간(초)
+            max_delay: 최대 대기 시간(초)
+            multiplier: 시도마다 대기 시간에 곱할 배수
+            max_auth_attempts: 인증 오류 시 최대 시도 횟수 (토큰 재발급 후 재시도)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_auth_attempts = max_auth_attempts
+
+    def should_retry(self, result: SendResult, attempt: int) -> bool:
+        """
+        재시도 여부 판단
+
+        Args:
+            result: 마지막 전송 결과
+            attempt: 지금까지의 시도 횟수
+
+        Returns:
+            bool: 재시도해야 하면 True
+        """
+        if result.success or not result.retryable:
+            return False
+        if result.error_code == CIRCUIT_OPEN:
+            # 회로가 열려 있는 동안은 기다리지 않고 바로 실패 처리
+            return False
+        if result.error_class == AUTH:
+            return attempt < self.max_auth_attempts
+        return attempt < self.max_attempts
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        다음 시도까지 대기 시간 계산 (full jitter)
+
+        Args:
+            attempt: 지금까지의 시도 횟수
+            retry_after: 서버가 지정한 Retry-After(초)
+
+        Returns:
+            float: 대기 시간(초)
+        """
+        ceiling = min(self.max_delay, self.base_delay * (self.multiplier ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+# 재시도하지 않는 정책
+NO_RETRY = RetryPolicy(max_attempts=1, max_auth_attempts=1)
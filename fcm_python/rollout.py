@@ -0,0 +1,227 @@
+import math
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from message_template import MessageTemplate
+from priority_lanes import BULK
+
+# 롤아웃 상태
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# 스케줄러가 목표 전송량을 다시 계산하는 간격(초)
+TICK_INTERVAL = 0.2
+
+# 밀린 전송을 따라잡을 때 한 번에 보낼 최대 분량 (TICK_INTERVAL 기준 배수)
+CATCH_UP_TICKS = 5
+
+
+def _finite(value: Any, name: str) -> float:
+    """숫자 인자를 float로 변환 (bool, 문자열, NaN/무한대는 ValueError)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name}: 유한한 숫자여야 합니다 ({value!r}).")
+    return float(value)
+
+
+class Rollout:
+    """토큰 목록을 정해진 속도로 고르게 나눠 보내는 점진 전송
+
+    "30분에 걸쳐 전송"(duration) 또는 "초당 N개, ramp_up초 동안 서서히 증가"(rate) 방식으로
+    시각별 누적 목표량을 정하고, 스케줄러 스레드가 목표에 맞춰 조금씩 전송합니다.
+    전송이 목표보다 밀리면 다음 틱에서 밀린 만큼(최대 max_batch) 더 보내 따라잡습니다.
+    """
+
+    def __init__(
+        self,
+        fcm_service,
+        template: MessageTemplate,
+        device_tokens: List[str],
+        duration: Optional[float] = None,
+        rate: Optional[float] = None,
+        ramp_up: float = 0.0,
+        max_workers: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        priority: str = BULK
+    ):
+        """
+        롤아웃 초기화 (start()로 시작)
+
+        Args:
+            fcm_service: 전송에 사용할 FCMService
+            template: 메시지 템플릿
+            device_tokens: 대상 디바이스 토큰 리스트
+            duration: 전체 전송에 걸릴 시간(초) (rate와 둘 중 하나)
+            rate: 초당 전송 수 (duration과 둘 중 하나)
+            ramp_up: 속도를 0에서 목표 속도까지 올리는 시간(초)
+            max_workers: 최대 동시 전송 수 (선택사항, 기본값: 서비스 설정)
+            max_batch: 한 번에 보낼 최대 토큰 수 (기본값: 목표 속도의 CATCH_UP_TICKS틱 분량)
+            priority: 우선순위 레인 (기본값: bulk)
+        """
+        if (duration is None) == (rate is None):
+            raise ValueError("duration과 rate 중 하나만 지정해야 합니다.")
+        ramp_up = _finite(ramp_up, "ramp_up")
+        if ramp_up < 0:
+            raise ValueError("ramp_up은 0 이상이어야 합니다.")
+        if max_workers is not None and (
+            isinstance(max_workers, bool) or not isinstance(max_workers, int) or max_workers < 1
+        ):
+            raise ValueError(f"max_workers: 1 이상의 정수여야 합니다 ({max_workers!r}).")
+        if duration is not None:
+            duration = _finite(duration, "duration")
+            if duration <= 0:
+                raise ValueError("duration은 0보다 커야 합니다.")
+            ramp_up = min(ramp_up, duration)
+            # 증가 구간에서는 평균 절반 속도이므로 그만큼 목표 속도를 높임
+            rate = max(len(device_tokens), 1) / (duration - ramp_up / 2)
+        elif _finite(rate, "rate") <= 0:
+            raise ValueError("rate는 0보다 커야 합니다.")
+
+        self.id = uuid.uuid4().hex
+        self.fcm_service = fcm_service
+        self.template = template
+        self.total = len(device_tokens)
+        self.rate = float(rate)
+        self.ramp_up = ramp_up
+        self.max_workers = max_workers
+        self.priority = priority
+        self.max_batch = max_batch or max(1, math.ceil(rate * TICK_INTERVAL * CATCH_UP_TICKS))
+
+        self._tokens: Optional[List[str]] = device_tokens
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.status = RUNNING
+        self.error: Optional[str] = None
+        self._sent = 0
+        self._success = 0
+        self._send_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self._started_mono: Optional[float] = None
+        self._finished_mono: Optional[float] = None
+
+    def target(self, elapsed: float) -> float:
+        """시작 후 elapsed초까지 보냈어야 할 누적 토큰 수"""
+        if elapsed <= 0:
+            return 0.0
+        if self.ramp_up > 0 and elapsed < self.ramp_up:
+            return self.rate * elapsed * elapsed / (2 * self.ramp_up)
+        return min(float(self.total), self.rate * (elapsed - self.ramp_up / 2))
+
+    def scheduled_duration(self) -> float:
+        """계획대로라면 전체 전송이 끝나는 시점(시작 후 초)"""
+        ramp_total = self.rate * self.ramp_up / 2
+        if self.total <= ramp_total:
+            return math.sqrt(2 * self.total * self.ramp_up / self.rate)
+        return self.ramp_up + (self.total - ramp_total) / self.rate
+
+    def start(self) -> "Rollout":
+        """스케줄러 스레드 시작"""
+        self._started_at = time.time()
+        self._started_mono = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"fcm-rollout-{self.id[:8]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set() and self._sent < self.total:
+                elapsed = time.monotonic() - self._started_mono
+                due = int(self.target(elapsed)) - self._sent
+                if due <= 0:
+                    self._stop_event.wait(min(TICK_INTERVAL, 1.0 / self.rate))
+                    continue
+
+                batch = self._tokens[self._sent:self._sent + min(due, self.max_batch)]
+                sending_started = time.monotonic()
+                success = sum(
+                    1 for _, result in self.fcm_service.send_stream(
+                        ((token, self.template) for token in batch),
+                        batch_size=len(batch),
+                        max_workers=self.max_workers,
+                        priority=self.priority
+                    )
+                    if result.success
+                )
+                with self._lock:
+                    self._send_seconds += time.monotonic() - sending_started
+                    self._sent += len(batch)
+                    self._success += success
+
+            with self._lock:
+                self.status = CANCELLED if self._sent < self.total else COMPLETED
+        except Exception as e:
+            print(f"롤아웃 전송 중 오류 발생 ({self.id}): {str(e)}")
+            with self._lock:
+                self.status = FAILED
+                self.error = str(e)
+        finally:
+            with self._lock:
+                self._finished_mono = time.monotonic()
+                # 끝난 롤아웃은 진행률만 남기고 토큰 목록은 해제
+                self._tokens = None
+
+    def cancel(self):
+        """남은 전송 중단 (보내는 중인 묶음은 끝까지 전송)"""
+        self._stop_event.set()
+
+    def expired(self, ttl: float) -> bool:
+        """끝난 지 ttl초가 지났는지 여부 (진행 중인 롤아웃은 False)"""
+        finished = self._finished_mono
+        return finished is not None and time.monotonic() - finished >= ttl
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """롤아웃이 끝날 때까지 대기 (끝났으면 True)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status != RUNNING
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        진행률과 예상 남은 시간 반환
+
+        목표보다 밀려 있으면 지금까지의 실제 전송 처리량으로 남은 시간을 추정합니다.
+
+        Returns:
+            Dict[str, Any]: 상태, 전송/성공/실패 수, 목표 대비 밀린 수, 현재 목표 속도, 남은 예상 시간(초)
+        """
+        with self._lock:
+            now = self._finished_mono or time.monotonic()
+            elapsed = now - self._started_mono if self._started_mono is not None else 0.0
+            sent, success, send_seconds = self._sent, self._success, self._send_seconds
+            status = self.status
+
+        remaining = self.total - sent
+        behind = max(0, int(self.target(elapsed)) - sent) if status == RUNNING else 0
+        eta = 0.0
+        if status == RUNNING:
+            eta = max(0.0, self.scheduled_duration() - elapsed)
+            if behind and sent and send_seconds > 0:
+                # 목표를 따라가지 못하는 중이면 실제 처리량 기준으로 추정
+                eta = max(eta, remaining / (sent / send_seconds))
+
+        if self.ramp_up > 0 and elapsed < self.ramp_up:
+            current_rate = self.rate * elapsed / self.ramp_up
+        else:
+            current_rate = self.rate
+
+        return {
+            "rolloutId": self.id,
+            "status": status,
+            "total": self.total,
+            "sent": sent,
+            "success": success,
+            "failed": sent - success,
+            "remaining": remaining,
+            "behind": behind,
+            "targetRate": round(current_rate if status == RUNNING else 0.0, 2),
+            "actualRate": round(sent / elapsed, 2) if elapsed > 0 else 0.0,
+            "elapsedSeconds": round(elapsed, 1),
+            "etaSeconds": round(eta, 1),
+            "startedAt": self._started_at,
+            "error": self.error
+        }
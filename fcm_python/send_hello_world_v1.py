@@ -17,6 +17,12 @@ SENDER_ID = "587467948856"
 # FCM v1 API 스코프
 SCOPES = ['https://www.googleapis.com/auth/firebase.messaging']
 
+# 연결/읽기 타임아웃(초)
+REQUEST_TIMEOUT = (3.05, 10)
+
+# 요청 간 TCP/TLS 연결을 재사용하는 세션
+_session = requests.Session()
+
 def get_access_token_from_service_account(service_account_file_path):
     """
     Service Account JSON 파일로부터 OAuth 2.0 액세스 토큰 생성
@@ -73,7 +79,7 @@ def send_fcm_v1_notification(access_token, device_token, title, body):
     print(f"📦 페이로드: {json.dumps(payload, indent=2)}")
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = _session.post(url, headers=headers, data=json.dumps(payload), timeout=REQUEST_TIMEOUT)
         
         print(f"/n📊 응답 상태 코드: {response.status_code}")
         print(f"📄 응답 헤더: {dict(response.headers)}")
@@ -0,0 +1,281 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from credentials import CredentialManager
+from dead_tokens import DeadTokenRegistry, skipped_result
+from fcm_errors import SendResult
+from message_template import MessageTemplate
+from rate_limiter import RateLimiter
+from retry import RetryPolicy
+
+# 프로세스 간에 주고받는 결과: SendResult 필드 순서의 튜플 (시도하지 않은 토큰은 None)
+PackedResult = Optional[Tuple]
+
+# 결과 대기 중 워커 프로세스 생존 여부를 확인하는 간격(초)
+WORKER_CHECK_INTERVAL = 1.0
+
+
+def pack_result(result: Optional[SendResult]) -> PackedResult:
+    if result is None:
+        return None
+    return tuple(getattr(result, name) for name in SendResult.__slots__)
+
+
+def unpack_result(packed: PackedResult) -> Optional[SendResult]:
+    if packed is None:
+        return None
+    return SendResult(*packed)
+
+
+def build_worker_service(
+    project_id: str,
+    service_account_key_path: str,
+    token_cache_path: str,
+    max_workers: int = 16,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limit: Optional[Dict] = None,
+    api_url: Optional[str] = None,
+    token_uri: Optional[str] = None
+):
+    """
+    워커 프로세스용 FCM 서비스 생성 (프로세스별 커넥션 풀 + 공유 토큰 캐시)
+
+    Args:
+        project_id: Firebase 프로젝트 ID
+        service_account_key_path: 서비스 계정 키 파일 경로
+        token_cache_path: 프로세스 간 토큰 공유 파일 경로
+        max_workers: 프로세스당 동시 전송 수
+        retry_policy: 재시도 정책 (선택사항)
+        rate_limit: RateLimiter 생성 인자 (선택사항, RateLimiter.shard_config 결과)
+        api_url: FCM API 주소 (선택사항, 기본값: fcm.googleapis.com)
+        token_uri: 토큰 엔드포인트 URL (선택사항, 기본값: 키 파일의 token_uri)
+
+    Returns:
+        FCMService: 워커 프로세스에서 사용할 서비스
+    """
+    from fcm_service import FCM_API_URL, FCMService
+
+    return FCMService(
+        project_id=project_id,
+        service_account_key_path=service_account_key_path,
+        credentials=CredentialManager(service_account_key_path, cache_path=token_cache_path, token_uri=token_uri),
+        max_workers=max_workers,
+        retry_policy=retry_policy,
+        rate_limiter=RateLimiter(**rate_limit) if rate_limit else None,
+        api_url=api_url or FCM_API_URL
+    )
+
+
+def _worker_main(service_factory: Callable, tasks, results):
+    """워커 프로세스: 작업 큐에서 토큰 묶음을 받아 전송하고 결과를 돌려보냄"""
+    service = service_factory()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            chunk_id, fields, tokens, max_workers = task
+            try:
+                template = MessageTemplate(fields)
+                sent = service._send_to_tokens(
+                    tokens,
+                    lambda i: template.render_token(tokens[i]),
+                    max_workers or service.max_workers
+                )
+                results.put((chunk_id, [pack_result(result) for result in sent], None))
+            except Exception as e:
+                results.put((chunk_id, None, str(e)))
+    finally:
+        service.close()
+
+
+class ShardedSender:
+    """토큰 스트림을 여러 워커 프로세스에 나눠 전송하는 코디네이터
+
+    JSON 인코딩, TLS, 응답 파싱이 한 프로세스의 GIL에 묶이지 않도록 토큰을 chunk_size 단위로
+    나눠 워커 프로세스들이 공유 작업 큐에서 가져가게 합니다. 각 워커는 자체 커넥션 풀을 가지며
+    액세스 토큰은 공유 파일로 함께 사용합니다. 결과는 입력 순서대로 다시 모아 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable,
+        processes: Optional[int] = None,
+        chunk_size: int = 500,
+        dead_tokens: Optional[DeadTokenRegistry] = None
+    ):
+        """
+        코디네이터 초기화 (워커 프로세스는 첫 전송 시 시작)
+
+        Args:
+            service_factory: 워커 프로세스에서 FCMService를 만드는 함수 (pickle 가능해야 함)
+            processes: 워커 프로세스 수 (기본값: CPU 코어 수)
+            chunk_size: 워커에 한 번에 넘길 토큰 수
+            dead_tokens: 사용 불가 토큰 레지스트리 (선택사항, 코디네이터에서 건너뛰고 결과를 기록)
+        """
+        self.service_factory = service_factory
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.dead_tokens = dead_tokens
+
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List = []
+        self._tasks = None
+        self._results = None
+        # 결과 큐를 하나만 쓰므로 전송 호출은 한 번에 하나씩 처리
+        self._lock = threading.Lock()
+        self._chunk_ids = itertools.count()
+
+    def start(self):
+        """워커 프로세스 시작 (이미 실행 중이면 무시)"""
+        if self._workers:
+            return
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        for i in range(self.processes):
+            worker = self._context.Process(
+                target=_worker_main,
+                args=(self.service_factory, self._tasks, self._results),
+                name=f"fcm-shard-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _receive(self) -> Tuple[int, Optional[List[PackedResult]], Optional[str]]:
+        """결과 하나를 기다림 (워커가 비정상 종료되면 예외)"""
+        while True:
+            try:
+                return self._results.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                dead = [worker.name for worker in self._workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"전송 워커 프로세스가 종료되었습니다: {', '.join(dead)}")
+
+    def _chunks(
+        self,
+        recipients: Iterable[Tuple[str, MessageTemplate]],
+        chunk_size: int
+    ) -> Iterator[Tuple[MessageTemplate, List[str]]]:
+        """같은 템플릿이 이어지는 토큰들을 chunk_size 단위로 묶음"""
+        template: Optional[MessageTemplate] = None
+        tokens: List[str] = []
+        for token, recipient_template in recipients:
+            if tokens and (recipient_template is not template or len(tokens) >= chunk_size):
+                yield template, tokens
+                tokens = []
+            template = recipient_template
+            tokens.append(token)
+        if tokens:
+            yield template, tokens
+
+    def send_stream(
+        self,
+        recipients: Iterable[Tuple[str, MessageTemplate]],
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[str, SendResult]]:
+        """
+        (토큰, 템플릿) 스트림을 워커 프로세스들에 나눠 전송하고 결과를 입력 순서대로 내보냄
+
+        프로세스 수의 두 배만큼의 묶음만 동시에 진행하므로 메모리 사용량이 일정합니다.
+
+        Args:
+            recipients: (디바이스 토큰, 메시지 템플릿) 이터러블
+            chunk_size: 워커에 한 번에 넘길 토큰 수 (선택사항, 기본값: 코디네이터 설정)
+            max_workers: 프로세스당 동시 전송 수 (선택사항, 기본값: 워커 서비스 설정)
+
+        Yields:
+            Tuple[str, SendResult]: (디바이스 토큰, 전송 결과)
+        """
+        with self._lock:
+            self.start()
+            chunks = self._chunks(recipients, chunk_size or self.chunk_size)
+            max_pending = self.processes * 2
+
+            # 묶음 ID -> (토큰, 워커에 보낸 인덱스) / 입력 순서를 기다리는 완료 묶음
+            inflight: Dict[int, Tuple[List[str], List[int]]] = {}
+            ready: Dict[int, Tuple[List[str], List[Optional[SendResult]]]] = {}
+            order: List[int] = []
+            exhausted = False
+
+            while True:
+                while not exhausted and len(inflight) + len(ready) < max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    template, tokens = chunk
+                    chunk_id = next(self._chunk_ids)
+                    order.append(chunk_id)
+
+                    alive, skipped = list(range(len(tokens))), []
+                    if self.dead_tokens is not None:
+                        alive, skipped = self.dead_tokens.partition(tokens)
+                    if alive:
+                        self._tasks.put((chunk_id, template.fields, [tokens[i] for i in alive], max_workers))
+                        inflight[chunk_id] = (tokens, alive)
+                    else:
+                        ready[chunk_id] = (tokens, [skipped_result() for _ in tokens])
+
+                while order and order[0] in ready:
+                    tokens, results = ready.pop(order.pop(0))
+                    yield from zip(tokens, results)
+
+                if not inflight:
+                    if exhausted and not order:
+                        return
+                    continue
+
+                chunk_id, packed, error = self._receive()
+                if chunk_id not in inflight:
+                    # 이전에 중단된 호출의 결과
+                    continue
+                tokens, alive = inflight.pop(chunk_id)
+                if error is not None:
+                    raise RuntimeError(f"워커 프로세스 전송 실패: {error}")
+
+                results: List[Optional[SendResult]] = [None] * len(tokens)
+                if len(alive) < len(tokens):
+                    results = [skipped_result() for _ in tokens]
+                for i, item in zip(alive, packed):
+                    result = unpack_result(item)
+                    results[i] = result
+                    if self.dead_tokens is not None and result is not None:
+                        self.dead_tokens.record(tokens[i], result)
+                ready[chunk_id] = (tokens, results)
+
+    def close(self):
+        """워커 프로세스 종료"""
+        if not self._workers:
+            return
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        self._tasks.close()
+        self._results.close()
+
+
+def private_token_cache_path() -> Tuple[str, str]:
+    """
+    워커 프로세스들이 공유할 토큰 파일 경로 생성 (소유자만 접근 가능한 임시 디렉터리)
+
+    Returns:
+        Tuple[str, str]: (임시 디렉터리, 토큰 파일 경로)
+    """
+    directory = tempfile.mkdtemp(prefix="fcm-shard-")
+    return directory, os.path.join(directory, "access_token.json")
+
+
+def remove_token_cache(directory: str):
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,84 @@
+import json
+from typing import Dict, List, Optional, Sequence
+
+from message_template import dumps
+
+IID_API_URL = "https://iid.googleapis.com"
+IID_BATCH_URL = "{iid_url}/iid/v1:{operation}"
+
+# Instance ID 일괄 구독 API 작업
+BATCH_ADD = "batchAdd"
+BATCH_REMOVE = "batchRemove"
+
+# 요청 하나에 넣을 수 있는 최대 토큰 수
+MAX_BATCH_TOKENS = 1000
+
+# 응답의 results 개수가 토큰 수와 맞지 않을 때 사용하는 오류
+UNKNOWN_ERROR = "UNKNOWN_ERROR"
+
+
+def topic_path(topic: str) -> str:
+    """토픽 이름을 IID API의 to 값(/topics/<이름>)으로 변환"""
+    return topic if topic.startswith("/topics/") else f"/topics/{topic}"
+
+
+def build_batch_body(topic: str, device_tokens: Sequence[str]) -> bytes:
+    """batchAdd/batchRemove 요청 본문 생성"""
+    return dumps({"to": topic_path(topic), "registration_tokens": list(device_tokens)})
+
+
+def parse_batch_results(content: bytes, count: int) -> List[Optional[str]]:
+    """
+    batchAdd/batchRemove 성공 응답을 토큰별 오류로 변환
+
+    Args:
+        content: {"results": [{}, {"error": "NOT_FOUND"}, ...]} 응답 본문
+        count: 요청한 토큰 수
+
+    Returns:
+        List[Optional[str]]: 토큰별 오류 이유 (성공이면 None)
+    """
+    try:
+        results = json.loads(content).get("results") or []
+    except (ValueError, AttributeError):
+        results = []
+    if len(results) != count:
+        return [UNKNOWN_ERROR] * count
+    return [result.get("error") if isinstance(result, dict) else UNKNOWN_ERROR for result in results]
+
+
+class TopicManagementResult:
+    """토픽 구독/해지 결과
+
+    토큰 문자열 대신 입력 리스트의 인덱스를 오류 이유별로 모아 두므로
+    백만 개 토큰을 처리해도 결과는 실패한 토큰 수만큼의 정수만 차지합니다.
+    """
+
+    __slots__ = ("success_count", "failure_count", "errors")
+
+    def __init__(self, success_count: int = 0, failure_count: int = 0, errors: Optional[Dict[str, List[int]]] = None):
+        """
+        Args:
+            success_count: 성공한 토큰 수
+            failure_count: 실패한 토큰 수
+            errors: 오류 이유 -> 실패한 토큰의 입력 인덱스 리스트
+        """
+        self.success_count = success_count
+        self.failure_count = failure_count
+        self.errors = errors if errors is not None else {}
+
+    def add_failure(self, index: int, reason: str):
+        self.failure_count += 1
+        self.errors.setdefault(reason, []).append(index)
+
+    def failed_tokens(self, device_tokens: Sequence[str]) -> Dict[str, List[str]]:
+        """오류 이유별 실패한 토큰 (요청한 토큰 리스트로 인덱스를 변환)"""
+        return {reason: [device_tokens[i] for i in indices] for reason, indices in self.errors.items()}
+
+    def to_dict(self) -> Dict:
+        """JSON 응답용 딕셔너리"""
+        return {
+            "successCount": self.success_count,
+            "failureCount": self.failure_count,
+            "errors": self.errors
+        }
@@ -0,0 +1,216 @@
+import itertools
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TransportResponse:
+    """전송 계층 공통 HTTP 응답"""
+
+    __slots__ = ("status_code", "content", "headers")
+
+    def __init__(self, status_code: int, content: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Transport:
+    """FCM 요청을 보내는 전송 계층 인터페이스
+
+    HTTP/1.1 커넥션 풀, HTTP/2 멀티플렉싱, 테스트/벤치마크용 인메모리 가짜 구현 등을
+    FCMService 변경 없이 교체할 수 있도록 최소한의 메서드만 정의합니다.
+    """
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> TransportResponse:
+        """
+        POST 요청 전송
+
+        Args:
+            url: 요청 URL
+            body: 인코딩된 요청 본문
+            headers: HTTP 요청 헤더
+
+        Returns:
+            TransportResponse: 응답
+        """
+        raise NotImplementedError
+
+    def warmup(self, url: str, connections: int = 1) -> Optional[int]:
+        """
+        대상 호스트로 미리 연결을 열어 첫 요청의 DNS/TCP/TLS 비용 제거 (선택 구현)
+
+        Returns:
+            Optional[int]: 연 연결 수 (사전 연결을 지원하지 않으면 None)
+
+        Raises:
+            requests.RequestException 등: 연결을 하나도 열지 못한 경우
+        """
+        return None
+
+    def close(self):
+        """열린 연결 정리 (선택 구현)"""
+
+
+class RequestsTransport(Transport):
+    """requests.Session 기반 HTTP/1.1 keep-alive 커넥션 풀"""
+
+    def __init__(
+        self,
+        pool_size: int = 32,
+        pool_connections: int = 4,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0
+    ):
+        """
+        커넥션 풀 초기화
+
+        Args:
+            pool_size: 호스트당 유지할 최대 연결 수
+            pool_connections: 풀을 유지할 호스트 수
+            pool_block: 풀이 가득 찼을 때 새 연결을 만들지 않고 대기할지 여부
+            keep_alive: 응답 후 연결 재사용 여부
+            connect_timeout: 연결 타임아웃(초)
+            read_timeout: 응답 읽기 타임아웃(초)
+        """
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_size,
+            pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> TransportResponse:
+        response = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def warmup(self, url: str, connections: int = 1) -> int:
+        """
+        연결 사전 생성
+
+        Args:
+            url: 대상 URL (호스트만 사용)
+            connections: 동시에 열어둘 연결 수 (pool_size 이하)
+
+        Returns:
+            int: 연 연결 수
+
+        Raises:
+            requests.RequestException: 연결을 하나도 열지 못한 경우
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}/"
+        opened: List[bool] = []
+        errors: List[requests.RequestException] = []
+
+        def _open():
+            try:
+                # 응답 코드와 무관하게 연결이 풀에 남음
+                self.session.head(origin, timeout=self.timeout)
+                opened.append(True)
+            except requests.RequestException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_open) for _ in range(max(1, min(connections, self.pool_size)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if not opened:
+            raise errors[0]
+        return len(opened)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport(Transport):
+    """httpx 기반 HTTP/2 멀티플렉싱 전송 계층 (여러 스레드가 소수의 연결을 공유)"""
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        http2: bool = True,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0
+    ):
+        """
+        Args:
+            max_connections: 호스트로 열어둘 최대 연결 수
+            http2: HTTP/2 사용 여부
+            connect_timeout: 연결 타임아웃(초)
+            read_timeout: 응답 읽기 타임아웃(초)
+        """
+        import httpx
+
+        self.client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> TransportResponse:
+        response = self.client.post(url, content=body, headers=headers)
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def warmup(self, url: str, connections: int = 1) -> int:
+        parts = urlsplit(url)
+        # HTTP/2는 연결 하나로 충분하므로 한 번만 요청 (실패하면 예외 전달)
+        self.client.head(f"{parts.scheme}://{parts.netloc}/")
+        return 1
+
+    def close(self):
+        self.client.close()
+
+
+class InMemoryTransport(Transport):
+    """네트워크 없이 응답을 돌려주는 테스트/벤치마크용 가짜 전송 계층"""
+
+    def __init__(
+        self,
+        handler: Optional[Callable[[str, bytes, Dict[str, str]], TransportResponse]] = None,
+        record: bool = False
+    ):
+        """
+        Args:
+            handler: 요청별 응답을 만드는 함수 (없으면 항상 200 성공)
+            record: 보낸 요청을 requests 리스트에 기록할지 여부
+        """
+        self.handler = handler
+        self.record = record
+        self.requests: List[Tuple[str, bytes, Dict[str, str]]] = []
+        self._counter = itertools.count(1)
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> TransportResponse:
+        if self.record:
+            self.requests.append((url, body, headers))
+        if self.handler is not None:
+            return self.handler(url, body, headers)
+
+        project_path = url.split("/messages:send")[0].split("/v1/")[-1]
+        name = f"{project_path}/messages/{next(self._counter)}"
+        return TransportResponse(200, json.dumps({"name": name}).encode("utf-8"))
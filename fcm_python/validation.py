@@ -0,0 +1,156 @@
+import re
+from typing import Any, Dict
+
+from fcm_errors import PERMANENT, SendResult
+from message_template import dumps
+
+# FCM 메시지 페이로드(notification + data) 최대 크기
+MAX_PAYLOAD_BYTES = 4096
+
+# condition 하나에 넣을 수 있는 최대 토픽 수
+MAX_CONDITION_TOPICS = 5
+
+# data에 쓸 수 없는 키
+RESERVED_DATA_KEYS = frozenset(("from", "notification", "message_type"))
+RESERVED_DATA_PREFIXES = ("google", "gcm")
+
+# 로컬 검증에서 거부한 요청의 오류 코드 (FCM이 같은 요청에 돌려줄 코드)
+INVALID_ARGUMENT = "INVALID_ARGUMENT"
+
+_TOKEN = re.compile(r"\S+\Z")
+_TOPIC_NAME = re.compile(r"(?:/topics/)?[a-zA-Z0-9\-_.~%]{1,900}\Z")
+_CONDITION_TOPIC = re.compile(r"'([^']*)'\s+in\s+topics")
+# 토픽 식을 지운 뒤 남아도 되는 문자 (연산자, 괄호, 공백)
+_CONDITION_REST = re.compile(r"(?:&&|\|\||[!()\s])*\Z")
+_TARGETS = ("token", "topic", "condition")
+
+
+class ValidationError(ValueError):
+    """FCM에 보내기 전에 로컬에서 찾은 요청 오류"""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(f"{field}: {message}")
+        self.field = field
+
+
+def invalid_result(error: ValidationError) -> SendResult:
+    """로컬 검증에서 거부한 요청의 결과 (FCM을 호출하지 않았으므로 재시도하지 않음)"""
+    return SendResult(
+        False,
+        0,
+        error_code=INVALID_ARGUMENT,
+        error_class=PERMANENT,
+        error_message=str(error),
+        attempts=0
+    )
+
+
+def is_valid_token(token: Any) -> bool:
+    """디바이스 토큰이 공백 없는 비어있지 않은 문자열인지 여부 (대량 토큰 확인용)"""
+    return isinstance(token, str) and _TOKEN.match(token) is not None
+
+
+def validate_token(token: Any, field: str = "token"):
+    """디바이스 토큰이 공백 없는 비어있지 않은 문자열인지 확인"""
+    if not isinstance(token, str) or not token:
+        raise ValidationError(field, "비어있지 않은 문자열이어야 합니다.")
+    if not _TOKEN.match(token):
+        raise ValidationError(field, "공백 문자를 포함할 수 없습니다.")
+
+
+def validate_topic(topic: Any, field: str = "topic"):
+    """토픽 이름 문법 확인 ([a-zA-Z0-9-_.~%] 1~900자, /topics/ 접두사 허용)"""
+    if not isinstance(topic, str) or not _TOPIC_NAME.match(topic):
+        raise ValidationError(field, f"토픽 이름은 영문자, 숫자, -_.~% 1~900자여야 합니다: {topic!r}")
+
+
+def validate_condition(condition: Any, field: str = "condition"):
+    """토픽 조건식 문법 확인 ('토픽' in topics를 &&, ||, !, 괄호로 조합, 최대 5개 토픽)"""
+    if not isinstance(condition, str) or not condition.strip():
+        raise ValidationError(field, "비어있지 않은 문자열이어야 합니다.")
+    topics = _CONDITION_TOPIC.findall(condition)
+    if not topics:
+        raise ValidationError(field, "'토픽' in topics 형태의 식이 필요합니다.")
+    if len(topics) > MAX_CONDITION_TOPICS:
+        raise ValidationError(field, f"토픽은 최대 {MAX_CONDITION_TOPICS}개까지 사용할 수 있습니다 ({len(topics)}개).")
+    for topic in topics:
+        validate_topic(topic, field)
+    rest = _CONDITION_TOPIC.sub("", condition)
+    if not _CONDITION_REST.match(rest):
+        raise ValidationError(field, "&&, ||, !, 괄호 외의 문자가 있습니다.")
+    depth = 0
+    for c in rest:
+        depth += 1 if c == "(" else -1 if c == ")" else 0
+        if depth < 0:
+            break
+    if depth != 0:
+        raise ValidationError(field, "괄호 짝이 맞지 않습니다.")
+
+
+def validate_data(data: Any, field: str = "data"):
+    """data가 문자열 키/값만 가진 객체이고 예약된 키를 쓰지 않는지 확인"""
+    if not isinstance(data, dict):
+        raise ValidationError(field, "객체여야 합니다.")
+    for key, value in data.items():
+        if not isinstance(key, str) or not key:
+            raise ValidationError(field, f"키는 비어있지 않은 문자열이어야 합니다: {key!r}")
+        if key in RESERVED_DATA_KEYS or key.lower().startswith(RESERVED_DATA_PREFIXES):
+            raise ValidationError(f"{field}.{key}", "예약된 키는 사용할 수 없습니다.")
+        if not isinstance(value, str):
+            raise ValidationError(f"{field}.{key}", f"값은 문자열이어야 합니다 ({type(value).__name__}).")
+
+
+def validate_fields(fields: Dict[str, Any]) -> int:
+    """
+    대상 필드를 제외한 message 내용 검증 (템플릿마다 한 번)
+
+    Args:
+        fields: notification, data, android 등
+
+    Returns:
+        int: 인코딩된 페이로드(notification + data) 크기(바이트)
+    """
+    notification = fields.get("notification")
+    if notification is not None:
+        if not isinstance(notification, dict):
+            raise ValidationError("notification", "객체여야 합니다.")
+        for key in ("title", "body", "image"):
+            value = notification.get(key)
+            if value is not None and not isinstance(value, str):
+                raise ValidationError(f"notification.{key}", f"문자열이어야 합니다 ({type(value).__name__}).")
+    if fields.get("data") is not None:
+        validate_data(fields["data"])
+
+    notification_size = len(dumps(notification)) if notification else 0
+    data_size = len(dumps(fields["data"])) if fields.get("data") else 0
+    size = notification_size + data_size
+    if size > MAX_PAYLOAD_BYTES:
+        raise ValidationError(
+            "payload",
+            f"{size}바이트로 FCM 제한({MAX_PAYLOAD_BYTES}바이트)을 초과합니다 "
+            f"(notification {notification_size}바이트, data {data_size}바이트)."
+        )
+    return size
+
+
+def validate_message(message: Any):
+    """
+    {"message": {...}} 형태의 전체 FCM 메시지 검증
+
+    Args:
+        message: FCM 메시지
+    """
+    if not isinstance(message, dict) or not isinstance(message.get("message"), dict):
+        raise ValidationError("message", '{"message": {...}} 형태의 객체여야 합니다.')
+    body = message["message"]
+    targets = [target for target in _TARGETS if target in body]
+    if len(targets) != 1:
+        raise ValidationError("message", "token, topic, condition 중 정확히 하나가 필요합니다.")
+    target = targets[0]
+    if target == "token":
+        validate_token(body["token"])
+    elif target == "topic":
+        validate_topic(body["topic"])
+    else:
+        validate_condition(body["condition"])
+    validate_fields(body)